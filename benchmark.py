@@ -0,0 +1,247 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from bitboard import BitQuarto
+from heuristics import state_eval_abs
+from minmax import (SearchContext, negamax_complete, negamax_placement_specialized,
+                    negamax_selection_specialized, minmax1, minmax2)
+
+# Micro-benchmarks des noyaux de recherche et de l'évaluation, sur un corpus figé de positions.
+# Pour chaque searcher : noeuds, noeuds/s et temps pour atteindre chaque profondeur (1, 2, ... max),
+# sans table de transposition ni ordonnancement (on mesure le noyau, pas les caches).
+# Pour state_eval_abs : évaluations/s.
+# Les résultats sont écrits en JSON (baseline) ; --compare relance la mesure et signale les régressions.
+#
+#   poetry run python benchmark.py --out bench_baseline.json
+#   poetry run python benchmark.py --compare bench_baseline.json
+
+# Corpus figé : (nom, placements (pièce, x, y) dans l'ordre, pièce en attente ou None en phase de sélection).
+# Aucune position n'est déjà gagnée. Ne pas modifier : les baselines ne seraient plus comparables
+# (CORPUS_VERSION est écrit dans chaque fichier).
+CORPUS_VERSION = 1
+CORPUS = (
+    ('early-0', ((8, 2, 1), (0, 1, 3), (1, 0, 3), (14, 0, 0)), 7),
+    ('early-1', ((0, 3, 1), (4, 1, 0), (7, 0, 2), (3, 1, 1)), None),
+    ('early-2', ((8, 2, 3), (0, 3, 3), (4, 3, 0), (11, 2, 2)), 2),
+    ('early-3', ((0, 0, 2), (14, 2, 1), (6, 1, 1), (2, 0, 3)), None),
+    ('mid-0', ((6, 1, 3), (14, 2, 3), (15, 0, 1), (11, 2, 1), (7, 3, 1), (5, 0, 3), (4, 1, 1)), 2),
+    ('mid-1', ((2, 0, 1), (12, 2, 1), (0, 1, 3), (15, 2, 3), (1, 0, 2), (5, 1, 2), (4, 2, 2)), None),
+    ('mid-2', ((1, 3, 0), (10, 3, 3), (3, 2, 2), (11, 0, 1), (2, 1, 1), (4, 0, 2), (14, 3, 2)), 5),
+    ('mid-3', ((3, 1, 2), (4, 3, 2), (1, 2, 0), (8, 3, 1), (10, 0, 2), (15, 0, 3), (12, 1, 3)), None),
+    ('late-0', ((7, 3, 3), (5, 0, 0), (3, 1, 0), (10, 1, 1), (0, 2, 3), (14, 3, 2), (15, 2, 1), (2, 0, 1),
+                (8, 0, 2), (6, 3, 0)), 4),
+    ('late-1', ((0, 2, 1), (11, 3, 3), (13, 3, 2), (7, 2, 0), (1, 1, 0), (2, 1, 1), (14, 0, 3), (9, 0, 1),
+                (3, 0, 0), (10, 0, 2)), None),
+    ('late-2', ((0, 3, 0), (9, 2, 3), (6, 0, 1), (15, 2, 2), (5, 1, 3), (13, 3, 2), (14, 0, 2), (7, 1, 0),
+                (3, 2, 1), (12, 3, 3)), 1),
+    ('late-3', ((11, 3, 0), (5, 1, 1), (2, 3, 3), (8, 3, 2), (13, 0, 0), (7, 2, 2), (15, 1, 3), (3, 2, 1),
+                (10, 2, 0), (0, 0, 1)), None),
+)
+
+# Profondeur maximale mesurée par searcher (celle de MinMax.get_depth + 1, les joueurs appelant
+# le noyau après avoir joué le coup de la racine)
+SEARCHERS = {
+    "negamax_complete": (negamax_complete, 4),
+    "negamax_placement_specialized": (negamax_placement_specialized, 5),
+    "negamax_selection_specialized": (negamax_selection_specialized, 5),
+    "minmax1": (minmax1, 5),
+    "minmax2": (minmax2, 5),
+}
+
+EVAL_REPEATS = 2000
+THRESHOLD = 0.10  # variation relative au-delà de laquelle --compare signale une régression
+
+
+def build_position(placements, pending) -> BitQuarto:
+    game = BitQuarto()
+    for piece, x, y in placements:
+        game.select(piece)
+        game.place(x, y)
+    if pending is not None:
+        game.select(pending)
+    game.current_tour = len(placements) + 1
+    return game
+
+
+def game_phase(name: str) -> str:
+    """Étape de la partie d'une position du corpus : early, mid ou late."""
+    return name.split("-")[0]
+
+
+def _run_search(searcher, game, depth, phase):
+    """Une recherche à profondeur fixe : (secondes, noeuds)."""
+    random.seed(0)  # minmax2 et les negamax spécialisés tirent des coups au hasard : arbres reproductibles
+    ctx = SearchContext()
+    start = time.perf_counter()
+    if searcher in (minmax1, minmax2):
+        searcher(game, depth, phase == "placement", phase, ctx=ctx)
+    else:
+        searcher(game, depth, phase, ctx=ctx)
+    return time.perf_counter() - start, ctx.nodes
+
+
+def bench_search(name: str, max_depth: int = None, repeats: int = 3) -> dict:
+    """
+    Noeuds et temps de 'name' sur tout le corpus, profondeur par profondeur (meilleur temps sur
+    'repeats' passes). time_to_depth[d-1] : temps cumulé des profondeurs 1 à d, comme un
+    approfondissement itératif sans table de transposition.
+    """
+    searcher, default_depth = SEARCHERS[name]
+    max_depth = max_depth or default_depth
+    result = {"max_depth": max_depth, "nodes": 0, "seconds": 0.0, "time_to_depth": [], "by_phase": {}}
+    elapsed_total = 0.0
+    for depth in range(1, max_depth + 1):
+        for pos_name, placements, pending in CORPUS:
+            game = build_position(placements, pending)
+            phase = "placement" if pending is not None else "selection"
+            seconds, nodes = min(_run_search(searcher, game, depth, phase) for _ in range(repeats))
+            elapsed_total += seconds
+            if depth == max_depth:
+                bucket = result["by_phase"].setdefault(game_phase(pos_name), {"nodes": 0, "seconds": 0.0})
+                bucket["nodes"] += nodes
+                bucket["seconds"] += seconds
+                result["nodes"] += nodes
+                result["seconds"] += seconds
+        result["time_to_depth"].append(elapsed_total)
+    for bucket in [result, *result["by_phase"].values()]:
+        bucket["nodes_per_sec"] = bucket["nodes"] / bucket["seconds"] if bucket["seconds"] else 0.0
+    return result
+
+
+def bench_eval(repeats: int = EVAL_REPEATS) -> dict:
+    """Évaluations par seconde de state_eval_abs, par étape de partie et sur tout le corpus."""
+    result = {"evals": 0, "seconds": 0.0, "by_phase": {}}
+    for pos_name, placements, pending in CORPUS:
+        game = build_position(placements, pending)
+        phase = "placement" if pending is not None else "selection"
+        start = time.perf_counter()
+        for _ in range(repeats):
+            state_eval_abs(game, phase, pending, 0)
+        seconds = time.perf_counter() - start
+        bucket = result["by_phase"].setdefault(game_phase(pos_name), {"evals": 0, "seconds": 0.0})
+        for b in (result, bucket):
+            b["evals"] += repeats
+            b["seconds"] += seconds
+    for bucket in [result, *result["by_phase"].values()]:
+        bucket["evals_per_sec"] = bucket["evals"] / bucket["seconds"] if bucket["seconds"] else 0.0
+    return result
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(depths: dict = None, repeats: int = 3, eval_repeats: int = EVAL_REPEATS) -> dict:
+    """Tous les benchmarks ; depths : searcher -> profondeur maximale (None : tous, profondeurs de SEARCHERS)."""
+    depths = depths or dict.fromkeys(SEARCHERS)
+    return {
+        "meta": {
+            "corpus_version": CORPUS_VERSION,
+            "positions": len(CORPUS),
+            "repeats": repeats,
+            "eval_repeats": eval_repeats,
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "search": {name: bench_search(name, depth, repeats) for name, depth in depths.items()},
+        "eval": {"state_eval_abs": bench_eval(eval_repeats)},
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> list:
+    """
+    Liste de (niveau, message) : "REGRESSION" si le débit baisse (ou le temps augmente) de plus de
+    'threshold', ou si le nombre de noeuds augmente (élagage moins efficace) ; "changed" si le nombre
+    de noeuds diminue ; "improved" si le débit progresse de plus de 'threshold'.
+    """
+    report = []
+    if baseline["meta"]["corpus_version"] != current["meta"]["corpus_version"]:
+        return [("REGRESSION", "corpus différent : baselines non comparables")]
+
+    def rate(level_name, old, new, higher_is_better=True):
+        if not old:
+            return
+        change = (new - old) / old
+        if not higher_is_better:
+            change = -change
+        if change < -threshold:
+            report.append(("REGRESSION", f"{level_name} : {old:.4g} -> {new:.4g} ({change:+.1%})"))
+        elif change > threshold:
+            report.append(("improved", f"{level_name} : {old:.4g} -> {new:.4g} ({change:+.1%})"))
+
+    for name, new in current["search"].items():
+        old = baseline["search"].get(name)
+        if old is None or old["max_depth"] != new["max_depth"]:
+            continue
+        if new["nodes"] > old["nodes"]:
+            report.append(("REGRESSION", f"{name} : {old['nodes']} -> {new['nodes']} noeuds"))
+        elif new["nodes"] < old["nodes"]:
+            report.append(("changed", f"{name} : {old['nodes']} -> {new['nodes']} noeuds"))
+        rate(f"{name} noeuds/s", old["nodes_per_sec"], new["nodes_per_sec"])
+        for phase, bucket in new["by_phase"].items():
+            if phase in old["by_phase"]:
+                rate(f"{name} [{phase}] noeuds/s", old["by_phase"][phase]["nodes_per_sec"], bucket["nodes_per_sec"])
+        for depth, (t_old, t_new) in enumerate(zip(old["time_to_depth"], new["time_to_depth"]), 1):
+            rate(f"{name} temps jusqu'à la profondeur {depth}", t_old, t_new, higher_is_better=False)
+    for name, new in current["eval"].items():
+        old = baseline["eval"].get(name)
+        if old is not None:
+            rate(f"{name} évaluations/s", old["evals_per_sec"], new["evals_per_sec"])
+    return report
+
+
+def print_results(results: dict) -> None:
+    for name, r in results["search"].items():
+        ttd = ", ".join(f"{t:.3f}" for t in r["time_to_depth"])
+        print(f"{name:32s} profondeur {r['max_depth']} : {r['nodes']:9d} noeuds, "
+              f"{r['nodes_per_sec']:10.0f} noeuds/s, temps par profondeur (s) : {ttd}")
+    for name, r in results["eval"].items():
+        print(f"{name:32s} {r['evals_per_sec']:10.0f} évaluations/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks des searchers et de l'évaluation sur un corpus figé.")
+    parser.add_argument("--out", type=str, default=None, help="Fichier JSON où écrire les résultats (baseline).")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="Baseline JSON : relance la mesure et signale les régressions (code de sortie 1).")
+    parser.add_argument("--searchers", nargs="+", choices=list(SEARCHERS), default=None)
+    parser.add_argument("--max-depth", type=int, default=None,
+                        help="Profondeur maximale de tous les searchers (par défaut celle de SEARCHERS).")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes par mesure de recherche (on garde la meilleure).")
+    parser.add_argument("--eval-repeats", type=int, default=EVAL_REPEATS)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    baseline = None
+    depths = {name: args.max_depth for name in (args.searchers or SEARCHERS)}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        # mêmes searchers et mêmes profondeurs que la baseline, sauf options explicites
+        depths = {name: args.max_depth or r["max_depth"] for name, r in baseline["search"].items()
+                  if args.searchers is None or name in args.searchers}
+
+    results = run_benchmarks(depths, args.repeats, args.eval_repeats)
+    print_results(results)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        report = compare(baseline, results, args.threshold)
+        for level, message in report:
+            print(f"{level:10s} {message}")
+        if not report:
+            print("Aucune variation au-delà du seuil.")
+        sys.exit(1 if any(level == "REGRESSION" for level, _ in report) else 0)
@@ -0,0 +1,347 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from transposition import ZOBRIST_CELL, ZOBRIST_SELECTED
+
+# Représentation compacte d'une partie de Quarto :
+# - occupied : masque 16 bits, le bit c vaut 1 si la case c = 4*y + x est occupée
+# - pieces   : 16 quartets (nibbles), le quartet c contient l'indice de la pièce posée en c
+# - used     : masque 16 bits des pièces déjà posées
+# - selected : indice de la pièce sélectionnée (-1 si aucune)
+# - zobrist  : hash de Zobrist du plateau et de la pièce en attente, mis à jour à chaque coup
+# - wins     : matrice pièce x case "poser cette pièce ici gagne", un masque de 16 cases par pièce,
+#              mise à jour à chaque placement (seules les lignes de la case jouée changent)
+# - line_state : suivi des 10 lignes (nombre de pièces, attributs communs), voir place_in_lines
+# Tout est stocké dans des entiers Python : une copie ne coûte presque rien,
+# contrairement aux tableaux NumPy et aux 16 objets Piece de partie.Quarto.
+
+BOARD_SIDE = 4
+N_CELLS = 16
+FULL_MASK = 0xFFFF
+
+
+def cell_index(x: int, y: int) -> int:
+    """Indice de la case (x, y) dans l'ordre ligne par ligne (même ordre que board.ravel())."""
+    return y * BOARD_SIDE + x
+
+
+# Lignes : 4 lignes + 4 colonnes + 2 diagonales = 10 (même ordre que heuristics.LINES)
+LINE_CELLS = (
+    tuple(tuple(cell_index(x, y) for x in range(4)) for y in range(4))
+    + tuple(tuple(cell_index(x, y) for y in range(4)) for x in range(4))
+    + (tuple(cell_index(i, i) for i in range(4)),
+       tuple(cell_index(i, 3 - i) for i in range(4)))
+)
+
+# Masque d'occupation de chaque ligne
+LINE_MASKS = tuple(sum(1 << c for c in line) for line in LINE_CELLS)
+
+# Pour chaque case, indices des lignes qui la traversent (ligne, colonne et éventuellement diagonales)
+CELL_LINES = tuple(
+    tuple(i for i, line in enumerate(LINE_CELLS) if c in line) for c in range(N_CELLS))
+
+
+def piece_at(pieces: int, cell: int) -> int:
+    """Indice de la pièce stockée dans le quartet 'cell'."""
+    return (pieces >> (4 * cell)) & 0xF
+
+
+def is_quarto_pieces(a: int, b: int, c: int, d: int) -> bool:
+    """
+    Quatre pièces forment un quarto si au moins un bit est commun à toutes :
+    ET des indices (attribut à 1 partout) ou ET des compléments (attribut à 0 partout).
+    """
+    return bool((a & b & c & d) or (~a & ~b & ~c & ~d & 0xF))
+
+
+# Suivi incrémental des lignes : pour chaque ligne un entier count << 8 | and1 << 4 | and0, avec
+# count = nombre de pièces posées, and1 = bits à 1 communs à ces pièces, and0 = bits à 0 communs (NOR).
+# Ligne vide : count = 0 et and1 = and0 = 0xF (élément neutre du ET).
+EMPTY_LINE = 0xFF
+EMPTY_LINES = (EMPTY_LINE,) * len(LINE_CELLS)
+
+
+def line_count(state: int) -> int:
+    return state >> 8
+
+
+def line_common(state: int) -> int:
+    """Attributs partagés par toutes les pièces de la ligne (0 : ligne morte). 0xF si la ligne est vide."""
+    return ((state >> 4) | state) & 0xF
+
+
+def place_in_lines(lines: tuple, c: int, piece: int) -> tuple:
+    """État des lignes après avoir posé 'piece' en c (seules les 2 à 4 lignes de la case changent)."""
+    lines = list(lines)
+    for l in CELL_LINES[c]:
+        state = lines[l]
+        lines[l] = (((state >> 8) + 1) << 8) | ((state >> 4) & piece) << 4 | (state & ~piece & 0xF)
+    return tuple(lines)
+
+
+# SHARING_PIECES[c1][c0] : pièces qui complètent une ligne de trois pièces dont les bits communs
+# à 1 sont c1 et les bits communs à 0 sont c0
+SHARING_PIECES = tuple(
+    tuple(tuple(p for p in range(16) if (p & c1) or (~p & c0 & 0xF)) for c0 in range(16))
+    for c1 in range(16))
+
+EMPTY_WINS = (0,) * 16
+
+
+def compute_win_matrix(occupied: int, pieces: int) -> tuple:
+    """Matrice des placements gagnants calculée entièrement : wins[p] = masque des cases gagnantes pour p."""
+    wins = [0] * 16
+    for line, line_mask in zip(LINE_CELLS, LINE_MASKS):
+        free = line_mask & ~occupied
+        if free and not free & (free - 1):  # une seule case vide sur la ligne
+            a, b, c = (piece_at(pieces, k) for k in line if (occupied >> k) & 1)
+            for p in SHARING_PIECES[a & b & c][~a & ~b & ~c & 0xF]:
+                wins[p] |= free
+    return tuple(wins)
+
+
+class WinMatrixCache:
+    """Cache LRU des matrices de placements gagnants, indexé par le hash de Zobrist du plateau."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, board_hash: int, occupied: int, pieces: int) -> tuple:
+        wins = self.entries.get(board_hash)
+        if wins is not None:
+            self.hits += 1
+            self.entries.move_to_end(board_hash)
+            return wins
+        self.misses += 1
+        wins = compute_win_matrix(occupied, pieces)
+        self.entries[board_hash] = wins
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return wins
+
+
+WIN_MATRIX_CACHE = WinMatrixCache()
+
+
+class BitQuarto(object):
+    """
+    Backend compact de l'état de jeu, avec la même API que partie.Quarto
+    (select / place / check_winner / check_finished / get_board_status ...).
+    Pensé pour la recherche : pas d'observateurs, pas de NumPy dans l'état.
+    """
+
+    MAX_PLAYERS = 2
+    BOARD_SIDE = BOARD_SIDE
+
+    __slots__ = ("occupied", "pieces", "used", "selected", "_current_player", "current_tour",
+                 "last_cell", "zobrist", "wins", "line_state",
+                 "_undo_stack")
+
+    def __init__(self) -> None:
+        self.occupied = 0
+        self.pieces = 0
+        self.used = 0
+        self.selected = -1
+        self._current_player = 0
+        self.current_tour = 1
+        self.last_cell = -1  # -1 : inconnue, check_winner balaie alors tout le plateau
+        self.zobrist = 0
+        self.wins = EMPTY_WINS
+        self.line_state = EMPTY_LINES
+        self._undo_stack = []
+
+    @classmethod
+    def from_game(cls, game) -> "BitQuarto":
+        """Construit l'état compact à partir de n'importe quel objet ayant l'API de Quarto."""
+        new_game = cls()
+        board = game.get_board_status()
+        for y in range(BOARD_SIDE):
+            for x in range(BOARD_SIDE):
+                piece = int(board[y, x])
+                if piece >= 0:
+                    c = cell_index(x, y)
+                    new_game.occupied |= 1 << c
+                    new_game.pieces |= piece << (4 * c)
+                    new_game.used |= 1 << piece
+                    new_game.line_state = place_in_lines(new_game.line_state, c, piece)
+        new_game.selected = int(game.get_selected_piece())
+        new_game._current_player = game.get_current_player()
+        new_game.current_tour = game.check_tour()
+        new_game.zobrist = new_game.compute_zobrist()
+        new_game.wins = WIN_MATRIX_CACHE.get(new_game.board_hash, new_game.occupied, new_game.pieces)
+        return new_game
+
+    def compute_zobrist(self) -> int:
+        """Hash de Zobrist recalculé entièrement (l'état le maintient incrémentalement)."""
+        h = 0
+        for c in range(N_CELLS):
+            if (self.occupied >> c) & 1:
+                h ^= ZOBRIST_CELL[c][piece_at(self.pieces, c)]
+        if self.selected >= 0 and not (self.used >> self.selected) & 1:
+            h ^= ZOBRIST_SELECTED[self.selected]
+        return h
+
+    def __deepcopy__(self, memo):
+        """Copie : uniquement des entiers, aucune allocation de tableau."""
+        new_game = BitQuarto.__new__(BitQuarto)
+        new_game.occupied = self.occupied
+        new_game.pieces = self.pieces
+        new_game.used = self.used
+        new_game.selected = self.selected
+        new_game._current_player = self._current_player
+        new_game.current_tour = self.current_tour
+        new_game.last_cell = self.last_cell
+        new_game.zobrist = self.zobrist
+        new_game.wins = self.wins
+        new_game.line_state = self.line_state
+        new_game._undo_stack = list(self._undo_stack)
+        return new_game
+
+    def get_current_player(self) -> int:
+        return self._current_player
+
+    def select(self, pieceIndex: int) -> bool:
+        '''
+        select a piece. Returns True on success
+        '''
+        if 0 <= pieceIndex < N_CELLS and not (self.used >> pieceIndex) & 1:
+            selected = self.selected
+            if selected >= 0 and not (self.used >> selected) & 1:
+                self.zobrist ^= ZOBRIST_SELECTED[selected]
+            self.zobrist ^= ZOBRIST_SELECTED[pieceIndex]
+            self.selected = pieceIndex
+            return True
+        return False
+
+    def place(self, x: int, y: int) -> bool:
+        '''
+        Place piece in coordinates (x, y). Returns true on success
+        '''
+        if y < 0 or x < 0 or x > 3 or y > 3 or self.selected < 0:
+            return False
+        c = cell_index(x, y)
+        if (self.occupied >> c) & 1:
+            return False
+        piece = self.selected
+        if not (self.used >> piece) & 1:
+            self.zobrist ^= ZOBRIST_SELECTED[piece]
+        self.zobrist ^= ZOBRIST_CELL[c][piece]
+        self.occupied |= 1 << c
+        self.pieces |= piece << (4 * c)
+        self.used |= 1 << piece
+        self.last_cell = c
+        self.line_state = place_in_lines(self.line_state, c, piece)
+        self.update_wins(c)
+        return True
+
+    def update_wins(self, c: int) -> None:
+        """
+        Mise à jour incrémentale de la matrice des placements gagnants après un placement en c :
+        la case c n'est plus jouable, et les lignes passant par c qui n'ont plus qu'une case vide
+        deviennent gagnantes pour les pièces qui partagent un attribut avec leurs trois pièces.
+        """
+        occupied, pieces = self.occupied, self.pieces
+        bit = 1 << c
+        wins = [m & ~bit for m in self.wins]
+        for line in CELL_LINES[c]:
+            free = LINE_MASKS[line] & ~occupied
+            if free and not free & (free - 1):
+                a, b, d = (piece_at(pieces, k) for k in LINE_CELLS[line] if (occupied >> k) & 1)
+                for p in SHARING_PIECES[a & b & d][~a & ~b & ~d & 0xF]:
+                    wins[p] |= free
+        self.wins = tuple(wins)
+
+    # Make/unmake : chaque entrée de la pile est (-1, ancienne sélection, dernière case, hash, matrice, lignes)
+    # ou (case, pièce posée, puis dernière case, hash, matrice et lignes avant le coup)
+    def push_select(self, pieceIndex: int) -> bool:
+        entry = (-1, self.selected, self.last_cell, self.zobrist, self.wins, self.line_state)
+        if self.select(pieceIndex):
+            self._undo_stack.append(entry)
+            return True
+        return False
+
+    def push_place(self, x: int, y: int) -> bool:
+        entry = (self.last_cell, self.zobrist, self.wins, self.line_state)
+        if self.place(x, y):
+            self._undo_stack.append((cell_index(x, y), self.selected) + entry)
+            return True
+        return False
+
+    def pop(self) -> None:
+        c, piece, self.last_cell, self.zobrist, self.wins, self.line_state = self._undo_stack.pop()
+        if c < 0:
+            self.selected = piece
+        else:
+            self.occupied &= ~(1 << c)
+            self.pieces &= ~(0xF << (4 * c))
+            self.used &= ~(1 << piece)
+
+    @property
+    def ply(self) -> int:
+        """Nombre de demi-coups joués avec push_* depuis la racine de la recherche."""
+        return len(self._undo_stack)
+
+    @property
+    def board_hash(self) -> int:
+        """Hash de Zobrist du plateau seul (sans la pièce en attente)."""
+        selected = self.selected
+        if selected >= 0 and not (self.used >> selected) & 1:
+            return self.zobrist ^ ZOBRIST_SELECTED[selected]
+        return self.zobrist
+
+    def winning_cells(self, piece: int) -> int:
+        """Masque des cases vides où poser 'piece' complète une ligne gagnante."""
+        return self.wins[piece]
+
+    def get_board_status(self) -> np.ndarray:
+        '''
+        Get the current board status (pieces are represented by index)
+        '''
+        occupied, pieces = self.occupied, self.pieces
+        return np.array(
+            [(pieces >> (4 * c)) & 0xF if (occupied >> c) & 1 else -1 for c in range(N_CELLS)],
+            dtype=int).reshape(BOARD_SIDE, BOARD_SIDE)
+
+    @property
+    def _board(self) -> np.ndarray:
+        # Compatibilité avec le code qui lit directement game._board
+        return self.get_board_status()
+
+    def get_selected_piece(self) -> int:
+        return self.selected
+
+    def check_tour(self):
+        return self.current_tour
+
+    def check_winner(self) -> int:
+        '''
+        Check who is the winner (only the lines through the last placed cell)
+        '''
+        c = self.last_cell
+        if c < 0:
+            return self.check_winner_full()
+        occupied, pieces = self.occupied, self.pieces
+        for line in CELL_LINES[c]:
+            mask = LINE_MASKS[line]
+            if occupied & mask == mask and is_quarto_pieces(
+                    *(piece_at(pieces, k) for k in LINE_CELLS[line])):
+                return self._current_player
+        return -1
+
+    def check_winner_full(self) -> int:
+        '''
+        Check who is the winner by scanning the 10 lines
+        '''
+        occupied, pieces = self.occupied, self.pieces
+        for line, mask in zip(LINE_CELLS, LINE_MASKS):
+            if occupied & mask == mask and is_quarto_pieces(
+                    *(piece_at(pieces, c) for c in line)):
+                return self._current_player
+        return -1
+
+    def check_finished(self) -> bool:
+        return self.occupied == FULL_MASK
@@ -0,0 +1,341 @@
+import argparse
+import collections
+import ipaddress
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import secrets
+import socket
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import game_pool
+from game_pool import TaskPool, play_game
+
+# Parties réparties sur plusieurs machines : un coordinateur et des workers reliés par socket.
+# - Le coordinateur (BrokerPool, lancé par main.py --broker ADRESSE) garde la file des paquets de parties
+#   et reçoit les résultats ; c'est un pool de game_pool (submit / stream) : les séries, le tournoi,
+#   les checkpoints et le journal des parties de main.py tournent dessus sans changement.
+# - Un worker (python broker.py ADRESSE --processes N) se connecte, demande un paquet, le joue avec
+#   game_pool.play_game, renvoie les résultats et recommence. Les classes de joueurs voyagent par pickle :
+#   les workers doivent avoir le même code, et l'authkey (HMAC de multiprocessing.connection) protège
+#   des connexions inconnues, qui pourraient faire exécuter n'importe quoi par pickle. La clé par défaut
+#   (AUTHKEY) est publique : elle n'est acceptée que sur la machine même (loopback, socket Unix) ; sur
+#   le réseau, le coordinateur tire une clé s'il n'en a pas reçu et l'affiche, à passer aux workers (--authkey).
+# Un paquet donné à un worker est un bail (lease) : renouvelé par les battements du worker pendant qu'il
+# joue, il est remis en tête de file si la connexion tombe ou si le bail expire (worker bloqué).
+# Le premier résultat reçu pour un paquet compte, les suivants (worker qu'on croyait mort) sont ignorés.
+# Un worker déconnecté se reconnecte seul et renvoie d'abord le paquet qu'il venait de finir, s'il vient
+# du même coordinateur : chaque coordinateur tire un identifiant de session, envoyé au worker à la connexion
+# et repris dans les ids de paquets (session, numéro), pour qu'un coordinateur relancé, dont les numéros
+# repartent de 0, ne prenne pas le résultat d'un ancien paquet pour celui d'un nouveau.
+#
+# Adresse : "hôte:port" (TCP) ou chemin d'une socket Unix.
+# Messages (tuples picklés), worker -> coordinateur : ("hello", nom), ("get",), ("heartbeat",),
+# ("done", id, résultats), ("error", id, exception) ; coordinateur -> worker : ("task", id, tâche, nombre)
+# ou ("wait",) s'il n'y a rien à jouer pour l'instant, et ("lease", secondes, session) en réponse à "hello"
+# (le worker envoie un battement tous les quarts de bail).
+
+AUTHKEY = b"quarto"      # clé publique : adresses locales seulement
+LEASE_SEC = 60.0          # durée d'un bail sans battement du worker
+IDLE_WAIT_SEC = 1.0       # attente d'un paquet côté coordinateur avant de répondre "wait"
+MAX_ATTEMPTS = 3          # un paquet qui a perdu autant de workers est rendu en erreur
+RECONNECT_SEC = (0.5, 10.0)  # attente avant de se reconnecter : au début, puis au plus
+
+
+def parse_address(spec: str):
+    """(adresse, famille) pour multiprocessing.connection : "hôte:port" ou chemin d'une socket Unix."""
+    host, sep, port = spec.rpartition(":")
+    if sep and "/" not in spec and port.isdigit():
+        return (host or "localhost", int(port)), "AF_INET"
+    return spec, "AF_UNIX"
+
+
+def is_local(address, family: str) -> bool:
+    """Adresse joignable seulement depuis cette machine : socket Unix ou interface loopback."""
+    if family == "AF_UNIX":
+        return True
+    host = address[0]
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # nom d'hôte
+
+
+def check_authkey(address, family: str, authkey: bytes) -> None:
+    if authkey == AUTHKEY and not is_local(address, family):
+        raise ValueError(f"clé par défaut refusée sur une adresse réseau ({address[0]}) : passer --authkey")
+
+
+class BrokerPool(TaskPool):
+    """
+    Coordinateur : pool de parties joué par les workers connectés (with BrokerPool("0.0.0.0:5000") as pool).
+    workers : nombre de parties que l'on s'attend à voir jouées en même temps (workers lancés) ;
+    il règle seulement la taille des paquets et le nombre de paquets en cours (stream, play_tournament).
+    authkey : clé partagée avec les workers ; None : AUTHKEY sur une adresse locale, sinon une clé tirée et affichée.
+    """
+
+    def __init__(self, address: str, workers: int = None, authkey: bytes = None,
+                 lease: float = LEASE_SEC) -> None:
+        self.workers = workers or os.cpu_count()
+        self.lease = lease
+        address, family = parse_address(address)
+        if authkey is None:
+            if is_local(address, family):
+                authkey = AUTHKEY
+            else:
+                authkey = secrets.token_hex(16).encode()
+                print(f"[broker] clé des workers : --authkey {authkey.decode()}")
+        check_authkey(address, family, authkey)
+        if family == "AF_UNIX" and os.path.exists(address):
+            os.unlink(address)  # socket d'un coordinateur précédent
+        self.listener = Listener(address, family, backlog=64, authkey=authkey)
+        self.family, self.authkey = family, authkey
+        self.address = self.listener.address
+        self.lock = threading.Condition()
+        self.session = secrets.token_hex(8)
+        self.ids = itertools.count()
+        self.tasks = {}                      # id -> [tâche, nombre, file des résultats, tag, essais]
+        self.pending = collections.deque()   # ids à donner
+        self.leases = {}                     # id -> (connexion, échéance)
+        self.connections = {}                # connexion -> nom du worker
+        self.closed = False
+        self.accepting = threading.Thread(target=self._accept, daemon=True)
+        self.accepting.start()
+        threading.Thread(target=self._reap, daemon=True).start()
+
+    def submit(self, task, count: int, results: queue.Queue, tag=None) -> None:
+        with self.lock:
+            task_id = (self.session, next(self.ids))
+            self.tasks[task_id] = [task, count, results, tag, 0]
+            self.pending.append(task_id)
+            self.lock.notify()
+
+    def cancel(self, results: queue.Queue) -> int:
+        with self.lock:
+            dropped = [task_id for task_id, item in self.tasks.items()
+                       if item[2] is results and task_id not in self.leases]
+            for task_id in dropped:
+                del self.tasks[task_id]  # son id dans self.pending est ignoré par _next_task
+        return len(dropped)
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn = self.listener.accept()
+            except (OSError, EOFError, mp.AuthenticationError):
+                continue  # authentification refusée
+            if self.closed:  # connexion de close() pour débloquer accept
+                conn.close()
+                self.listener.close()
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _next_task(self, conn):
+        """Prochain paquet pour 'conn' (bail pris), ou None après IDLE_WAIT_SEC sans paquet."""
+        with self.lock:
+            deadline = time.monotonic() + IDLE_WAIT_SEC
+            while not self.closed:
+                while self.pending:
+                    task_id = self.pending.popleft()
+                    if task_id in self.tasks and task_id not in self.leases:
+                        self.leases[task_id] = (conn, time.monotonic() + self.lease)
+                        self.tasks[task_id][4] += 1
+                        return task_id, self.tasks[task_id]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.lock.wait(remaining)
+            return None
+
+    def _finish(self, task_id: tuple, outcome) -> None:
+        """Premier résultat (liste) ou exception reçu pour le paquet : rendu au demandeur."""
+        with self.lock:
+            item = self.tasks.pop(task_id, None)  # paquet déjà rendu, ou d'une autre session
+            self.leases.pop(task_id, None)
+        if item is not None:
+            item[2].put((item[3], outcome))
+
+    def _release(self, conn, why: str) -> None:
+        """Remet en tête de file les paquets en bail chez 'conn' (ou rendus en erreur après MAX_ATTEMPTS)."""
+        failed = []
+        with self.lock:
+            lost = [task_id for task_id, (c, _) in self.leases.items() if c is conn]
+            for task_id in lost:
+                del self.leases[task_id]
+                if self.tasks[task_id][4] >= MAX_ATTEMPTS:
+                    failed.append(task_id)
+                else:
+                    self.pending.appendleft(task_id)
+            self.lock.notify_all()
+        for task_id in failed:
+            self._finish(task_id, RuntimeError(f"paquet {task_id[1]} : {MAX_ATTEMPTS} workers perdus"))
+        if lost:
+            print(f"[broker] {self.connections.get(conn, '?')} {why} : {len(lost)} paquet(s) remis en file.")
+
+    def _serve(self, conn) -> None:
+        """Dialogue avec un worker jusqu'à la fin de la connexion."""
+        try:
+            _, name = conn.recv()
+            conn.send(("lease", self.lease, self.session))
+            self.connections[conn] = name
+            print(f"[broker] worker connecté : {name}")
+            while not self.closed:
+                msg = conn.recv()
+                kind = msg[0]
+                if kind == "get":
+                    found = self._next_task(conn)
+                    if found is None:
+                        conn.send(("wait",))
+                    else:
+                        task_id, (task, count, *_) = found
+                        conn.send(("task", task_id, task, count))
+                elif kind == "heartbeat":
+                    with self.lock:
+                        for task_id, (c, _) in list(self.leases.items()):
+                            if c is conn:
+                                self.leases[task_id] = (conn, time.monotonic() + self.lease)
+                elif kind in ("done", "error"):
+                    self._finish(msg[1], msg[2])
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._release(conn, "déconnecté")
+            self.connections.pop(conn, None)
+            conn.close()
+
+    def _reap(self) -> None:
+        """Baux expirés (worker connecté mais muet) : paquets remis en file."""
+        while not self.closed:
+            time.sleep(1.0)
+            now = time.monotonic()
+            with self.lock:
+                expired = {c for c, deadline in self.leases.values() if deadline < now}
+            for conn in expired:
+                self._release(conn, "sans nouvelles")
+
+    def close(self) -> None:
+        """Arrête d'accepter et de servir les workers (ils attendent le prochain coordinateur)."""
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+        try:
+            # débloque accept ; refusée si un worker reconnecté l'a déjà débloqué (listener fermé)
+            Client(self.address, self.family, authkey=self.authkey).close()
+        except (OSError, EOFError):
+            pass
+        self.accepting.join()
+        for conn in list(self.connections):
+            _shutdown(conn)
+
+
+def _shutdown(conn) -> None:
+    """Coupe la socket d'une connexion : le recv bloqué du fil qui la sert se termine (EOFError)."""
+    try:
+        with socket.socket(fileno=os.dup(conn.fileno())) as s:
+            s.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def _play_with_heartbeat(conn, send_lock: threading.Lock, interval: float, task, count: int) -> list:
+    """Joue le paquet ; un fil envoie un battement toutes les 'interval' secondes pour garder le bail."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(interval):
+            try:
+                with send_lock:
+                    conn.send(("heartbeat",))
+            except OSError:
+                return
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        return [play_game(task) for _ in range(count)]
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_worker(address: str, authkey: bytes = None, warm: bool = True, retry_for: float = None) -> None:
+    """
+    Boucle d'un worker : se connecte (et se reconnecte) au coordinateur et joue ses paquets.
+    authkey : clé du coordinateur (None : AUTHKEY, seulement pour une adresse locale).
+    warm : caches des joueurs gardés d'une partie à l'autre, comme dans GamePool.
+    retry_for : abandonne après autant de secondes sans coordinateur joignable (None : jamais).
+    """
+    address, family = parse_address(address)
+    authkey = authkey or AUTHKEY
+    check_authkey(address, family, authkey)
+    game_pool._init_worker(warm)
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    unsent = None  # résultat fini mais pas encore reçu par le coordinateur
+    delay = RECONNECT_SEC[0]
+    lost_since = None
+    while True:
+        try:
+            conn = Client(address, family, authkey=authkey)
+        except OSError:
+            lost_since = lost_since or time.monotonic()
+            if retry_for is not None and time.monotonic() - lost_since > retry_for:
+                return
+            time.sleep(delay)
+            delay = min(2 * delay, RECONNECT_SEC[1])
+            continue
+        delay, lost_since = RECONNECT_SEC[0], None
+        send_lock = threading.Lock()
+        try:
+            conn.send(("hello", name))
+            _, lease, session = conn.recv()
+            if unsent is not None and unsent[1][0] == session:
+                conn.send(unsent)
+            unsent = None  # paquet d'un autre coordinateur : il ne l'attend plus
+            while True:
+                conn.send(("get",))
+                msg = conn.recv()
+                if msg[0] != "task":
+                    continue
+                _, task_id, task, count = msg
+                try:
+                    unsent = ("done", task_id, _play_with_heartbeat(conn, send_lock, lease / 4, task, count))
+                except Exception as e:
+                    unsent = ("error", task_id, RuntimeError(f"{type(e).__name__}: {e}"))
+                with send_lock:
+                    conn.send(unsent)
+                unsent = None
+        except (EOFError, OSError):
+            conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Worker : joue les parties d'un coordinateur (main.py --broker).")
+    parser.add_argument("address", help="hôte:port ou chemin de la socket Unix du coordinateur.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Workers lancés sur cette machine.")
+    parser.add_argument("--authkey", default=None,
+                        help="Clé affichée par le coordinateur (obligatoire si son adresse n'est pas locale).")
+    parser.add_argument("--cold", action="store_true", help="Pas de cache partagé entre les parties.")
+    parser.add_argument("--retry-for", type=float, default=None,
+                        help="Arrête un worker après autant de secondes sans coordinateur (par défaut : jamais).")
+    args = parser.parse_args()
+
+    authkey = args.authkey.encode() if args.authkey else None
+    try:
+        check_authkey(*parse_address(args.address), authkey or AUTHKEY)
+    except ValueError as e:
+        parser.error(str(e))
+    worker_args = (args.address, authkey, not args.cold, args.retry_for)
+    processes = [mp.Process(target=run_worker, args=worker_args) for _ in range(args.processes)]
+    for p in processes:
+        p.start()
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        for p in processes:
+            p.terminate()
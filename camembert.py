@@ -3,8 +3,12 @@ import matplotlib.pyplot as plt
 import os
 
 def tracer_camembert(json_path, dossier_sortie="resultats_graphes"):
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # json_path : fichier de résultats, ou directement une vue (game_store.GameStore.summary())
+    if isinstance(json_path, dict):
+        data = json_path
+    else:
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
     # On ne garde que les clés principales (pas les "meta")
     for match, infos in data.items():
@@ -45,4 +49,5 @@ def tracer_camembert(json_path, dossier_sortie="resultats_graphes"):
         print(f"Graphique sauvegardé dans {fichier_sortie}")
 
 
-tracer_camembert("resultats.json")
+if __name__ == "__main__":
+    tracer_camembert("resultats.json")
@@ -0,0 +1,193 @@
+from bitboard import BitQuarto, FULL_MASK, N_CELLS
+
+# Solveur exact de fin de partie : quand il reste peu de cases vides, l'arbre restant est assez petit
+# pour être résolu entièrement (victoire / nulle / défaite), au lieu d'être évalué par state_eval_abs
+# à profondeur fixe. Le résultat est prouvé et accompagné de la distance au mat (en demi-coups :
+# une sélection ou un placement).
+#
+# Score interne d'une position, du point de vue du joueur qui doit jouer
+# (celui qui place en phase de placement, celui qui choisit en phase de sélection) :
+#   victoire en d demi-coups -> MATE - d, nulle -> 0, défaite en d demi-coups -> -(MATE - d)
+
+MATE = 100
+WIN, DRAW, LOSS = 1, 0, -1
+
+# Meilleurs scores possibles, pour arrêter une boucle dès qu'on ne peut plus faire mieux
+BEST_PLACEMENT = MATE - 5   # (hors victoire immédiate) placer, choisir, l'adversaire place, l'adversaire choisit, placer en gagnant
+BEST_SELECTION = MATE - 4   # choisir, l'adversaire place, l'adversaire choisit, placer en gagnant
+
+
+def _ply(score: int) -> int:
+    """Score vu depuis le demi-coup précédent joué par le même joueur (distance + 1)."""
+    if score > 0:
+        return score - 1
+    if score < 0:
+        return score + 1
+    return 0
+
+
+def _unply(bound: int) -> int:
+    """Inverse de _ply pour les bornes de la fenêtre : _ply(s) <= b  <=>  s <= _unply(b)."""
+    if bound > 0:
+        return bound + 1
+    if bound < 0:
+        return bound - 1
+    return 0
+
+
+def result_of(score: int) -> tuple:
+    """(résultat, distance) : résultat = WIN, DRAW ou LOSS, distance en demi-coups (0 pour une nulle)."""
+    if score > 0:
+        return WIN, MATE - score
+    if score < 0:
+        return LOSS, MATE + score
+    return DRAW, 0
+
+
+def empty_cells(game) -> int:
+    return N_CELLS - bin(game.occupied).count("1")
+
+
+class EndgameSolver:
+    """
+    Résolution exacte sous un seuil de cases vides (threshold), avec une table dédiée
+    (position compacte -> bornes basse et haute du score, alpha-beta) conservée d'un coup à l'autre.
+    La table est vidée quand elle dépasse max_entries.
+    """
+
+    def __init__(self, threshold: int = 6, max_entries: int = 2_000_000) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.memo = {}
+        self.hits = 0
+        self.nodes = 0
+
+    def applies(self, game) -> bool:
+        return empty_cells(game) <= self.threshold
+
+    @staticmethod
+    def _key(game, pending: int) -> int:
+        # 64 bits de pièces, 16 bits d'occupation, pièce en attente (-1 en phase de sélection)
+        return (game.pieces << 21) | (game.occupied << 5) | (pending + 1)
+
+    def _probe(self, key, alpha, beta):
+        """Comme minmax.tt_probe : (score ou None, alpha, beta) avec les bornes (basse, haute) mémorisées."""
+        entry = self.memo.get(key)
+        if entry is not None:
+            lower, upper = entry
+            if lower == upper or lower >= beta or upper <= alpha:
+                self.hits += 1
+                return (lower if lower >= beta or lower == upper else upper), alpha, beta
+            alpha, beta = max(alpha, lower), min(beta, upper)
+        return None, alpha, beta
+
+    def _store(self, key, best, alpha, beta) -> int:
+        lower, upper = self.memo.get(key, (-MATE, MATE))
+        if best > alpha:
+            lower = max(lower, best)
+        if best < beta:
+            upper = min(upper, best)
+        if len(self.memo) >= self.max_entries:
+            self.memo.clear()
+        self.memo[key] = (lower, upper)
+        return best
+
+    def _placement(self, game, alpha=-MATE, beta=MATE) -> int:
+        """Score du joueur qui doit poser game.selected (alpha-beta en échec doux)."""
+        piece = game.selected
+        empty = ~game.occupied & FULL_MASK
+        if game.wins[piece] & empty:
+            return MATE - 1
+        key = self._key(game, piece)
+        score, alpha, beta = self._probe(key, alpha, beta)
+        if score is not None:
+            return score
+        self.nodes += 1
+        alpha_orig, best = alpha, -MATE
+        for c in range(N_CELLS):
+            if (empty >> c) & 1:
+                game.push_place(c % 4, c // 4)
+                if game.occupied == FULL_MASK:
+                    score = 0
+                else:
+                    score = _ply(self._selection(game, _unply(alpha), _unply(beta)))
+                game.pop()
+                if score > best:
+                    best = score
+                    alpha = max(alpha, best)
+                    if best >= beta or best >= BEST_PLACEMENT:
+                        break
+        return self._store(key, best, alpha_orig, beta)
+
+    def _selection(self, game, alpha=-MATE, beta=MATE) -> int:
+        """Score du joueur qui doit choisir la pièce de l'adversaire (alpha-beta en échec doux)."""
+        key = self._key(game, -1)
+        score, alpha, beta = self._probe(key, alpha, beta)
+        if score is not None:
+            return score
+        self.nodes += 1
+        empty = ~game.occupied & FULL_MASK
+        alpha_orig, best = alpha, None
+        for piece in range(16):
+            if (game.used >> piece) & 1:
+                continue
+            if game.wins[piece] & empty:
+                score = -(MATE - 2)  # l'adversaire gagne en la posant
+            else:
+                game.push_select(piece)
+                score = -_ply(self._placement(game, -_unply(beta), -_unply(alpha)))
+                game.pop()
+            if best is None or score > best:
+                best = score
+                alpha = max(alpha, best)
+                if best >= beta or best >= BEST_SELECTION:
+                    break
+        return self._store(key, 0 if best is None else best, alpha_orig, beta)
+
+    def solve(self, game, phase: str) -> tuple:
+        """(résultat, distance au mat) de la position pour le joueur qui doit jouer la phase donnée."""
+        game = BitQuarto.from_game(game)
+        score = self._placement(game) if phase == "placement" else self._selection(game)
+        return result_of(score)
+
+    def best_move(self, game):
+        """Meilleur placement de la pièce sélectionnée : ((x, y), résultat, distance)."""
+        game = BitQuarto.from_game(game)
+        piece = game.selected
+        best, best_score = None, None
+        for c in range(N_CELLS):
+            if (game.occupied >> c) & 1:
+                continue
+            if (game.wins[piece] >> c) & 1:
+                score = MATE - 1
+            else:
+                game.push_place(c % 4, c // 4)
+                alpha = -MATE if best_score is None else best_score
+                score = 0 if game.occupied == FULL_MASK else _ply(self._selection(game, _unply(alpha), MATE))
+                game.pop()
+            if best_score is None or score > best_score:
+                best, best_score = (c % 4, c // 4), score
+        return (best,) + result_of(best_score)
+
+    def best_piece(self, game):
+        """Meilleure pièce à donner à l'adversaire : (pièce, résultat, distance)."""
+        game = BitQuarto.from_game(game)
+        empty = ~game.occupied & FULL_MASK
+        best, best_score = None, None
+        for piece in range(16):
+            if (game.used >> piece) & 1:
+                continue
+            if game.wins[piece] & empty:
+                score = -(MATE - 2)
+            else:
+                game.push_select(piece)
+                alpha = -MATE if best_score is None else best_score
+                score = -_ply(self._placement(game, -MATE, -_unply(alpha)))
+                game.pop()
+            if best_score is None or score > best_score:
+                best, best_score = piece, score
+        return (best,) + result_of(best_score)
+
+    def stats(self) -> dict:
+        return {"threshold": self.threshold, "entries": len(self.memo),
+                "hits": self.hits, "nodes": self.nodes}
@@ -0,0 +1,126 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+# Événements d'une partie (sélection, placement, changement de joueur, fin de tour, fin de partie),
+# envoyés par Quarto à un "sink" configurable à la place des print et des observateurs :
+# - NullSink     : rien (parties en lot dans run_matchup). enabled = False : Quarto ne construit même pas
+#                  le dictionnaire de l'événement, le chemin désactivé ne coûte qu'un test d'attribut
+# - ConsoleSink  : les messages affichés jusqu'ici dans la console
+# - RingBufferSink : les derniers événements en mémoire (débogage, tests)
+# - JSONLSink    : un événement JSON par ligne dans un fichier
+# - ObserverSink : rappel (event_type, data), par exemple QuartoGUI.on_update
+# Un événement = (event_type, data) avec data un dictionnaire sérialisable.
+
+
+class EventSink(ABC):
+    enabled = True
+
+    @abstractmethod
+    def emit(self, event_type: str, data: dict) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class NullSink(EventSink):
+    enabled = False
+
+    def emit(self, event_type: str, data: dict) -> None:
+        pass
+
+
+NULL_SINK = NullSink()
+
+
+class ConsoleSink(EventSink):
+    """Affichage console des parties interactives (mêmes messages qu'avant)."""
+
+    def emit(self, event_type: str, data: dict) -> None:
+        if event_type == "select":
+            print("La pièce choisie est la numéro : ", data["piece"])
+        elif event_type == "place":
+            print("La pièce a été positionné à la position :", (data["x"], data["y"]))
+        elif event_type == "next_player":
+            print(f'Joueur actuel: {data["player"]}')
+        elif event_type == "tour":
+            print("Nous avons terminé le tour numéro : ", data["tour"])
+        elif event_type == "end":
+            print(data["winner"])
+
+
+class RingBufferSink(EventSink):
+    """Garde les 'maxlen' derniers événements : (instant, event_type, data)."""
+
+    def __init__(self, maxlen: int = 1024) -> None:
+        self.events = deque(maxlen=maxlen)
+
+    def emit(self, event_type: str, data: dict) -> None:
+        self.events.append((time.time(), event_type, data))
+
+
+def _scalar(value):
+    """Entiers NumPy (indices de pièces lus dans le plateau) -> types Python pour json."""
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class JSONLSink(EventSink):
+    """Ajoute chaque événement au fichier 'path', une ligne JSON par événement."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def emit(self, event_type: str, data: dict) -> None:
+        self.file.write(json.dumps({"t": time.time(), "event": event_type, **data}, default=_scalar) + "\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ObserverSink(EventSink):
+    def __init__(self, callback) -> None:
+        self.callback = callback
+
+    def emit(self, event_type: str, data: dict) -> None:
+        self.callback(event_type, data)
+
+
+class MultiSink(EventSink):
+    """Envoie chaque événement à plusieurs sinks (les sinks désactivés sont ignorés)."""
+
+    def __init__(self, sinks) -> None:
+        self.sinks = [s for s in sinks if s.enabled]
+        self.enabled = bool(self.sinks)
+
+    def emit(self, event_type: str, data: dict) -> None:
+        for sink in self.sinks:
+            sink.emit(event_type, data)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+def combine(*sinks) -> EventSink:
+    """Un seul sink pour tous ceux donnés (NULL_SINK s'ils sont tous désactivés)."""
+    sinks = [s for s in sinks if s.enabled]
+    if not sinks:
+        return NULL_SINK
+    return sinks[0] if len(sinks) == 1 else MultiSink(sinks)
+
+
+def make_sink(spec: str) -> EventSink:
+    """Sink à partir d'une option de ligne de commande : none, console, ring[:taille], jsonl:chemin."""
+    kind, _, arg = spec.partition(":")
+    if kind == "none":
+        return NULL_SINK
+    if kind == "console":
+        return ConsoleSink()
+    if kind == "ring":
+        return RingBufferSink(int(arg)) if arg else RingBufferSink()
+    if kind == "jsonl":
+        return JSONLSink(arg)
+    raise ValueError(f"sink inconnu : {spec}")
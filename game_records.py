@@ -0,0 +1,339 @@
+import argparse
+import gzip
+import io
+import json
+import os
+import struct
+import time
+
+import partie
+from events import NULL_SINK
+
+# Parties enregistrées en binaire compact, pour garder des millions de parties d'auto-jeu sur le disque.
+# Une partie de Quarto se résume à ses placements : (pièce donnée, case où elle est posée), au plus 16.
+# Le joueur 0 choisit la première pièce ; la pièce du placement i est choisie par le joueur i % 2
+# et posée par l'autre.
+#
+# Fichier binaire :
+#   en-tête  : magic, longueur puis liste JSON des noms d'affrontements (l'étiquette d'une partie
+#              est sa position dans cette liste)
+#   parties  : 2 octets d'en-tête fixe puis un octet par placement (pièce << 4 | case 4*y + x)
+#              - octet 0 : nombre de placements (bits 0 à 4) | résultat << 5
+#                (0 / 1 : victoire du joueur 0 / 1, 2 : nulle, 3 : inconnu)
+#              - octet 1 : étiquette de l'affrontement
+# Soit 18 octets au plus par partie, contre ~1 Ko dans le journal JSON (game_store.py), mais sans
+# les temps, les noeuds ni la graine. Le tout peut être compressé par gzip ou zstd (module zstandard,
+# facultatif) ; le format est reconnu à la lecture. Un fichier existant est complété (nouveau membre
+# gzip ou nouvelle trame zstd, lus à la suite), l'en-tête n'est écrit qu'une fois.
+
+MAGIC = b"QGR1"
+HEADER = struct.Struct("<4sH")
+RECORD_HEADER_BYTES = 2
+RESULT_CODES = {0: 0, 1: 1, -1: 2, None: 3}
+RESULTS = (0, 1, -1, None)
+DEFAULT_PATH = "parties.qgr"
+READ_BLOCK = 1 << 16
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def pack_game(moves, winner: int = None, tag: int = 0) -> bytes:
+    """Partie -> octets ; moves : suite de (pièce, case 4*y + x), winner : 0, 1, -1 (nulle) ou None."""
+    data = bytearray((0, tag))
+    for piece, cell in moves:
+        data.append(piece << 4 | cell)
+    n = len(data) - RECORD_HEADER_BYTES
+    if n > 16:
+        raise ValueError(f"{n} placements : une partie en a au plus 16")
+    data[0] = n | RESULT_CODES[winner] << 5
+    return bytes(data)
+
+
+def unpack_moves(data: bytes) -> tuple:
+    """Octets des placements -> ((pièce, case), ...)."""
+    return tuple((b >> 4, b & 15) for b in data)
+
+
+def record_moves(record: dict) -> list:
+    """Placements (pièce, case) d'une description de game_pool.game_record ou d'une ligne du journal."""
+    pieces = [m[1] for m in record["moves"] if m[0] == "s"]
+    cells = [m[1] for m in record["moves"] if m[0] == "p"]
+    return list(zip(pieces, cells))
+
+
+def _detect(path: str) -> str:
+    """Compression d'un fichier existant : "gzip", "zstd" ou None."""
+    with open(path, "rb") as f:
+        start = f.read(4)
+    if start.startswith(GZIP_MAGIC):
+        return "gzip"
+    if start == ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("compression zstd : le module zstandard n'est pas installé (pip install zstandard)")
+    return zstandard
+
+
+def _open_write(path: str, compression: str):
+    if compression is None:
+        return open(path, "ab")
+    if compression == "gzip":
+        return gzip.open(path, "ab")
+    if compression == "zstd":
+        raw = open(path, "ab")
+        return _zstandard().ZstdCompressor().stream_writer(raw, closefd=True)
+    raise ValueError(f"compression inconnue : {compression}")
+
+
+def _open_read(path: str):
+    compression = _detect(path)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        raw = open(path, "rb")
+        return io.BufferedReader(_zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True,
+                                                                              closefd=True))
+    return open(path, "rb")
+
+
+class GameRecord:
+    """Partie lue : étiquette, nom de l'affrontement, vainqueur et placements (pièce, case)."""
+    __slots__ = ("tag", "matchup", "winner", "moves")
+
+    def __init__(self, tag: int, matchup: str, winner: int, moves: tuple) -> None:
+        self.tag = tag
+        self.matchup = matchup
+        self.winner = winner
+        self.moves = moves
+
+    @property
+    def tours(self) -> int:
+        """Tour atteint, comme Quarto.check_tour en fin de partie."""
+        return len(self.moves) + 1
+
+    def __repr__(self) -> str:
+        return f"GameRecord({self.matchup!r}, winner={self.winner}, moves={self.moves})"
+
+
+class GameRecordWriter:
+    """
+    Écriture en flux (with GameRecordWriter(path, matchups) as w: w.write(moves, winner, matchup)).
+    Un fichier existant est complété avec sa propre compression et sa liste d'affrontements.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, matchups=(), compression: str = None) -> None:
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            existing = _detect(path)
+            if compression is not None and compression != existing:
+                raise ValueError(f"{path} est déjà écrit avec la compression {existing}")
+            compression = existing
+            with GameRecordReader(path) as reader:
+                self.matchups = list(reader.matchups)
+            missing = [m for m in matchups if m not in self.matchups]
+            if missing:
+                raise ValueError(f"affrontements absents de l'en-tête de {path} : {missing}")
+            header = b""
+        else:
+            self.matchups = list(matchups)
+            if len(self.matchups) > 256:
+                raise ValueError("au plus 256 affrontements par fichier")
+            names = json.dumps(self.matchups, ensure_ascii=False).encode("utf-8")
+            header = HEADER.pack(MAGIC, len(names)) + names
+        self.compression = compression
+        self.tags = {name: i for i, name in enumerate(self.matchups)}
+        self.file = _open_write(path, compression)
+        self.file.write(header)
+        self.count = 0
+
+    def write(self, moves, winner: int = None, matchup: str = None) -> None:
+        """Ajoute une partie (matchup : un nom de l'en-tête, ou None pour l'étiquette 0)."""
+        tag = 0 if matchup is None else self.tags[matchup]
+        self.file.write(pack_game(moves, winner, tag))
+        self.count += 1
+
+    def append_results(self, matchup: str, results) -> None:
+        """Ajoute des résultats de game_pool.play_game joués avec record (même appel que GameStore)."""
+        for winner, _, _, _, record in results:
+            if record is not None:
+                self.write(record_moves(record), winner, matchup)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GameRecordReader:
+    """Lecture en flux des parties (for record in GameRecordReader(path)), par blocs de READ_BLOCK octets."""
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self.path = path
+        self.file = _open_read(path)
+        magic, size = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} n'est pas un fichier de parties")
+        self.matchups = json.loads(self.file.read(size).decode("utf-8"))
+
+    def __iter__(self):
+        names = self.matchups
+        buf = b""
+        pos = 0
+        while True:
+            block = self.file.read(READ_BLOCK)
+            if not block:
+                break
+            buf = buf[pos:] + block
+            pos = 0
+            end = len(buf)
+            while pos + RECORD_HEADER_BYTES <= end:
+                head = buf[pos]
+                n = head & 31
+                stop = pos + RECORD_HEADER_BYTES + n
+                if stop > end:
+                    break
+                tag = buf[pos + 1]
+                yield GameRecord(tag, names[tag] if tag < len(names) else None, RESULTS[head >> 5],
+                                 unpack_moves(buf[pos + RECORD_HEADER_BYTES:stop]))
+                pos = stop
+        if pos < len(buf):
+            raise ValueError(f"{self.path} : dernière partie tronquée")
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_records(path: str = DEFAULT_PATH, matchup: str = None):
+    """Parcourt les parties du fichier (éventuellement d'un seul affrontement)."""
+    with GameRecordReader(path) as reader:
+        for record in reader:
+            if matchup is None or record.matchup == matchup:
+                yield record
+
+
+def replay(moves, game: partie.Quarto = None):
+    """
+    Rejoue les placements et génère la partie (partie.Quarto) après chacun, au fil de la lecture :
+    c'est le même objet, mis à jour sur place (copy.deepcopy pour garder une position).
+    game : partie neuve à utiliser (avec ses observateurs), sinon une partie sans événements.
+    Mêmes événements que Quarto.run, vainqueur compris ("end") si les placements vont jusqu'au bout.
+    """
+    if game is None:
+        game = partie.Quarto(NULL_SINK)
+    winner = -1
+    for piece, cell in moves:
+        if not game.select(piece):
+            raise ValueError(f"tour {game.current_tour} : la pièce {piece} est déjà posée")
+        game._current_player = (game._current_player + 1) % game.MAX_PLAYERS
+        if game.events.enabled:
+            game.notify("next_player", {"player": game._current_player, "piece": piece})
+        if not game.place(cell % 4, cell // 4):
+            raise ValueError(f"tour {game.current_tour} : la case {cell} est déjà occupée")
+        if game.events.enabled:
+            game.notify("tour", {"tour": game.current_tour})
+        game.current_tour += 1
+        winner = game.check_winner()
+        yield game
+        if winner >= 0:
+            break
+    if winner >= 0 or game.check_finished():
+        game.notify("end", {"winner": winner, "tour": game.current_tour})
+
+
+def position(moves, plies: int):
+    """Partie après les 'plies' premiers placements (partie initiale si plies = 0)."""
+    game = partie.Quarto(NULL_SINK)
+    if plies > 0:
+        for i, _ in enumerate(replay(moves, game)):
+            if i + 1 == plies:
+                break
+    return game
+
+
+def replay_winner(moves) -> int:
+    """Vainqueur recalculé en rejouant la partie (-1 : nulle ou partie inachevée)."""
+    game = None
+    for game in replay(moves):
+        pass
+    return -1 if game is None else game.check_winner()
+
+
+def show_game(moves, delay: float = 1.0, image_folder: str = "images_pieces") -> None:
+    """Rejoue une partie enregistrée dans QuartoGUI, un placement toutes les 'delay' secondes."""
+    from quarto_gui import QuartoGUI  # Pillow et tkinter ne servent qu'ici
+
+    game = partie.Quarto(NULL_SINK)
+    gui = QuartoGUI(game, image_folder=image_folder)
+    game.add_observer(gui.on_update)
+    for _ in replay(moves, game):
+        time.sleep(delay)
+    gui.start()
+
+
+def convert_store(store_path: str, out_path: str, compression: str = None) -> int:
+    """Convertit le journal JSON des parties (game_store.py) ; renvoie le nombre de parties écrites."""
+    from game_store import read_games
+
+    matchups = list(dict.fromkeys(r["matchup"] for r in read_games(store_path)))
+    with GameRecordWriter(out_path, matchups, compression) as writer:
+        for record in read_games(store_path):
+            if record.get("moves"):
+                writer.write(record_moves(record), record["winner"], record["matchup"])
+        return writer.count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Parties enregistrées en binaire compact.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="Convertit le journal JSON des parties (game_store.py).")
+    convert.add_argument("store", nargs="?", default="parties.jsonl")
+    convert.add_argument("--out", default=DEFAULT_PATH)
+    convert.add_argument("--compression", choices=("gzip", "zstd"), default=None)
+    summary = sub.add_parser("summary", help="Nombre de parties et résultats par affrontement.")
+    summary.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    show = sub.add_parser("show", help="Rejoue une partie dans la gui.")
+    show.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    show.add_argument("--game", type=int, default=0, help="Numéro de la partie dans le fichier.")
+    show.add_argument("--matchup", default=None)
+    show.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        n = convert_store(args.store, args.out, args.compression)
+        print(f"{n} parties écrites dans {args.out} ({os.path.getsize(args.out)} octets)")
+    elif args.command == "summary":
+        totals = {}
+        for record in read_records(args.path):
+            t = totals.setdefault(record.matchup, {"games": 0, "wins": 0, "draws": 0, "tours_total": 0})
+            t["games"] += 1
+            t["wins"] += record.winner == 1
+            t["draws"] += record.winner == -1
+            t["tours_total"] += record.tours
+        for name, t in totals.items():
+            print(f"{name} : {t['games']} parties, {t['wins']} victoires, {t['draws']} nulles, "
+                  f"{t['tours_total'] / t['games']:.2f} tours en moyenne")
+    else:
+        for i, record in enumerate(read_records(args.path, args.matchup)):
+            if i == args.game:
+                print(record)
+                show_game(record.moves, args.delay)
+                break
+        else:
+            print("partie introuvable")
@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import time
+
+# Journal des parties : une ligne JSON par partie, ajoutée à la fin du fichier et jamais réécrite
+# (contrairement à resultats.json, réécrit à chaque batch et où seuls les totaux survivent).
+#   {"matchup": "minmax1 vs negamax_complete", "seed": ..., "winner": 1, "tours": 12, "plies": 11,
+#    "time_sec": 42.1, "t": ..., "moves": [["s", 3, 0, 0.0001, null], ["p", 5, 1, 12.3, 18211], ...]}
+# (coups : voir game_pool.game_record ; les noeuds ne sont connus que pour les joueurs instrumentés)
+#
+# GameStore tient à jour une vue agrégée par affrontement (mêmes clés que resultats.json : games, wins,
+# draws, tours_total, total_time_sec, plus plies_total et nodes_total) en ne lisant que les lignes
+# ajoutées depuis la dernière lecture. La vue et la position de lecture peuvent être sauvegardées
+# (save_summary) : à la relance, seule la fin du journal est relue. Avec un summary_path, la vue est
+# sauvegardée à chaque checkpoint (append_results) et à la fermeture ; main.py utilise summary_path_for.
+#
+# Les totaux d'un affrontement joué avant le journal (fichier de résultats du mode IC) y sont repris une fois
+# par une ligne de totaux {"matchup": ..., "imported": {"games": ..., ...}} (seed) : comptée dans la vue,
+# ignorée par read_games, qui ne rend que des parties.
+
+GAMES_PATH = "parties.jsonl"
+
+
+def summary_path_for(path: str) -> str:
+    """Fichier de la vue associé à un journal : parties.jsonl -> parties.summary.json."""
+    return os.path.splitext(path)[0] + ".summary.json"
+
+
+def new_bucket() -> dict:
+    return {"games": 0, "wins": 0, "draws": 0, "tours_total": 0.0, "total_time_sec": 0.0,
+            "plies_total": 0, "nodes_total": 0}
+
+
+def add_game(bucket: dict, record: dict) -> dict:
+    """Ajoute une partie du journal aux totaux d'un affrontement (wins : victoires du joueur d'indice 1)."""
+    bucket["games"] += 1
+    bucket["wins"] += record["winner"] == 1
+    bucket["draws"] += record["winner"] == -1
+    bucket["tours_total"] += record["tours"]
+    bucket["total_time_sec"] += record["time_sec"]
+    bucket["plies_total"] += record.get("plies", 0)
+    bucket["nodes_total"] += sum(m[4] for m in record.get("moves", ()) if m[4] is not None)
+    return bucket
+
+
+def add_record(bucket: dict, record: dict) -> dict:
+    """Ajoute une ligne du journal : une partie, ou des totaux repris (seed)."""
+    imported = record.get("imported")
+    if imported is None:
+        return add_game(bucket, record)
+    for name, value in imported.items():
+        bucket[name] += value
+    return bucket
+
+
+class GameStore:
+    """Journal append-only des parties et vue agrégée incrémentale (summary)."""
+
+    def __init__(self, path: str = GAMES_PATH, summary_path: str = None) -> None:
+        self.path = path
+        self.summary_path = summary_path
+        self.offset = 0       # octets du journal déjà agrégés
+        self.view = {}        # affrontement -> totaux (new_bucket)
+        if summary_path and os.path.exists(summary_path):
+            with open(summary_path, encoding="utf-8") as f:
+                saved = json.load(f)
+            # journal remplacé ou tronqué depuis la sauvegarde : on relit tout
+            if os.path.exists(path) and os.path.getsize(path) >= saved["offset"]:
+                self.offset, self.view = saved["offset"], saved["matchups"]
+        self.file = open(path, "a", encoding="utf-8")
+
+    def append(self, matchup: str, winner: int, tours: int, time_sec: float, record: dict = None) -> None:
+        """Ajoute une partie (record : description de game_pool.game_record, ou None)."""
+        line = {"matchup": matchup, "winner": winner, "tours": tours, "time_sec": time_sec, "t": time.time()}
+        line.update(record or {})
+        self.file.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    def seed(self, matchup: str, totals: dict) -> None:
+        """Reprend les totaux d'un affrontement déjà joué hors du journal (mêmes clés que new_bucket)."""
+        imported = {name: totals[name] for name in new_bucket() if totals.get(name)}
+        line = {"matchup": matchup, "imported": imported, "t": time.time()}
+        self.file.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self.flush()
+
+    def append_results(self, matchup: str, results) -> None:
+        """Ajoute des résultats de game_pool.play_game et les écrit sur le disque (checkpoint)."""
+        for winner, tour, time_taken, _, record in results:
+            self.append(matchup, winner, tour, time_taken, record)
+        self.flush()
+        if self.summary_path:
+            self.save_summary()
+
+    def flush(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def refresh(self) -> dict:
+        """Agrège les parties ajoutées depuis la dernière lecture ; renvoie la vue à jour."""
+        self.file.flush()
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # ligne en cours d'écriture (ou interrompue) : relue la prochaine fois
+                self.offset += len(line)
+                record = json.loads(line)
+                add_record(self.view.setdefault(record["matchup"], new_bucket()), record)
+        return self.view
+
+    def summary(self) -> dict:
+        """Vue au format de resultats.json (sans section meta), lue par camembert.tracer_camembert."""
+        return {name: dict(bucket) for name, bucket in self.refresh().items()}
+
+    def bucket(self, matchup: str) -> dict:
+        """Totaux d'un affrontement (games, wins, draws, ...) pour la logique d'arrêt (IC, SPRT)."""
+        return dict(self.refresh().get(matchup, new_bucket()))
+
+    def save_summary(self, path: str = None) -> None:
+        """Sauvegarde la vue et la position de lecture (écriture atomique)."""
+        path = path or self.summary_path
+        self.refresh()
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"offset": self.offset, "matchups": self.view}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    def close(self) -> None:
+        if self.summary_path:
+            self.save_summary()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_games(path: str = GAMES_PATH, matchup: str = None):
+    """Parcourt les parties du journal (éventuellement d'un seul affrontement)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.endswith("\n"):
+                record = json.loads(line)
+                if "imported" in record:
+                    continue
+                if matchup is None or record["matchup"] == matchup:
+                    yield record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vue agrégée du journal des parties.")
+    parser.add_argument("path", nargs="?", default=GAMES_PATH)
+    parser.add_argument("--summary", default=None,
+                        help="Fichier de la vue (relu puis mis à jour : seules les nouvelles parties sont lues).")
+    parser.add_argument("--camembert", action="store_true", help="Trace les camemberts de la vue.")
+    args = parser.parse_args()
+
+    with GameStore(args.path, args.summary) as store:
+        view = store.summary()
+        if args.summary:
+            store.save_summary()
+    for name, b in view.items():
+        print(f"{name} : {b['games']} parties, {b['wins']} victoires, {b['draws']} nulles, "
+              f"{b['tours_total'] / b['games']:.2f} tours en moyenne")
+    if args.camembert:
+        from camembert import tracer_camembert
+        tracer_camembert(view)
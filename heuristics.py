@@ -1,5 +1,7 @@
-from copy import deepcopy
 import math
+import numpy as np
+
+from bitboard import BitQuarto, line_common, line_count
 
 INF = float('inf')
 WIN = 10000  # score terminal >> somme des scores des heuristiques. Le signe sera appliqué par negamax.
@@ -80,18 +82,38 @@ def line_best_coherence(vals):
     return best  # 0..3 (4 serait déjà gagné)
 
 
+# Mêmes notions lues dans le suivi incrémental des lignes (game.line_state), sans relire le plateau
+
+def line_state_alive(state):
+    """Équivalent de line_alive : les pièces posées partagent au moins un attribut."""
+    return line_common(state) != 0
+
+def line_state_coherence(state):
+    """Équivalent de line_best_coherence."""
+    return line_count(state) if line_common(state) else 0
+
+def ready_lines(game):
+    """Nombre de lignes "prêtes à gagner" : 3 pièces avec un attribut commun et une case vide."""
+    return sum(1 for state in game.line_state if line_count(state) == 3 and line_common(state))
+
+
 # Magnitudes positives côté PLACEMENT
 
+def win_matrix(game):
+    """
+    Matrice pièce x case des placements gagnants (wins[p] = masque des cases), calculée une fois par position
+    et partagée par toutes les heuristiques et l'ordonnancement des coups.
+    Maintenue incrémentalement par BitQuarto ; pour un Quarto, passe par le cache LRU de bitboard.
+    """
+    if not isinstance(game, BitQuarto):
+        game = BitQuarto.from_game(game)
+    return game.wins
+
 def immediate_wins_with_piece_mag(game, piece):
     """Nombre de placements (x,y) qui gagnent immédiatement avec 'piece' (>=0)."""
-    count = 0
-    for (x, y) in get_all_possible_moves(game):
-        g = deepcopy(game)
-        g.select(piece)
-        g.place(x, y)
-        if g.check_winner() != -1:
-            count += 1
-    return count  # 0..(cases vides)
+    if piece in game.get_board_status():
+        return 0  # pièce déjà posée : on ne peut pas la sélectionner
+    return win_matrix(game)[piece].bit_count()  # 0..(cases vides)
 
 def mobility_mag(game):
     """Nombre de cases jouables (>=0)."""
@@ -102,25 +124,19 @@ def immediate_blocks_possible_mag(game, piece):
     Nombre de placements qui permettent de bloquer une menace immédiate de l’adversaire :
     c.-à-d. réduire le nombre de lignes "prêtes à gagner" de l’adversaire.
     """
-    before_t1 = 0
-    for line in LINES:
-        vals = line_values(game, line)
-        if line_alive(vals) and line_best_coherence(vals) == 3 and vals.count(-1) == 1:
-            before_t1 += 1
+    before_t1 = ready_lines(game)
     if before_t1 == 0:
         return 0
     blocks = 0
+    if not game.push_select(piece):
+        return 0
     for (x, y) in get_all_possible_moves(game):
-        g = deepcopy(game)
-        g.select(piece)
-        g.place(x, y)
-        after_t1 = 0
-        for line in LINES:
-            vals = line_values(g, line)
-            if line_alive(vals) and line_best_coherence(vals) == 3 and vals.count(-1) == 1:
-                after_t1 += 1
+        game.push_place(x, y)
+        after_t1 = ready_lines(game)
+        game.pop()
         if after_t1 < before_t1:
             blocks += 1
+    game.pop()
     return blocks
 
 # Magnitudes positives côté SELECTION
@@ -144,7 +160,8 @@ def selection_magnitudes(game):
     if not avail:
         return 0, 0.0, 0.0
 
-    tox_list = [toxicity_of_piece(game, p) for p in avail]
+    wins = win_matrix(game)
+    tox_list = [wins[p].bit_count() for p in avail]  # = toxicity_of_piece, sans recalcul par pièce
     tox_max = max(tox_list)
     tox_avg = sum(tox_list) / len(tox_list)
 
@@ -181,7 +198,8 @@ def state_eval_abs(game, phase, piece_to_place, depth):
         * Phase placement : victoires immédiates, forks, cohérence, mobilité, blocages.
         * Phase sélection : sécurité (faible toxicité) + diversité des pièces.
     """
-    g = deepcopy(game)
+    # Les heuristiques jouent/annulent sur la partie elle-même (push/pop) : plus besoin de copie
+    g = game
     if g.check_winner() != -1:
         return WIN + depth
     if g.check_finished():
@@ -204,3 +222,78 @@ def state_eval_abs(game, phase, piece_to_place, depth):
                   + W_DIV * Hdiv)
 
     return max(0.0, float(score))
+
+
+# Version vectorisée de state_eval_abs : mêmes scores, mais toutes les magnitudes
+# (victoires immédiates, blocages, toxicités) sont calculées en une passe NumPy
+# sur un tenseur pièce x ligne x case, sans jouer/annuler de coups.
+
+LINE_IDX = np.array([[y * 4 + x for (x, y) in line] for line in LINES])  # (10, 4)
+LINE_HAS_CELL = np.zeros((len(LINES), 16), dtype=bool)  # (10, 16) : la case c est sur la ligne l
+LINE_HAS_CELL[np.arange(len(LINES))[:, None], LINE_IDX] = True
+PIECE_IDX = np.arange(16)
+PIECE_BITS = (PIECE_IDX[:, None] >> np.arange(4)) & 1  # (16, 4)
+
+
+def state_eval_abs_vec(game, phase, piece_to_place, depth):
+    """Équivalent exact de state_eval_abs (même règles, mêmes poids, même résultat)."""
+    if game.check_winner() != -1:
+        return WIN + depth
+    if game.check_finished():
+        return 0
+
+    board = np.asarray(game.get_board_status()).ravel()
+    empty = board < 0  # (16,)
+    # Suivi des lignes : nombre de pièces posées, bits à 1 communs et bits à 0 communs
+    states = np.array(game.line_state)
+    n_filled = states >> 8  # (10,)
+    common1 = (states >> 4) & 0xF
+    common0 = states & 0xF
+    # shares[p, l] : la pièce p partage un attribut avec toutes les pièces de la ligne l
+    shares = ((common1[None, :] & PIECE_IDX[:, None]) | (common0[None, :] & ~PIECE_IDX[:, None])) & 0xF != 0
+    empty_on_line = LINE_HAS_CELL & empty[None, :]  # (10, 16)
+
+    # Nombre de cases gagnantes pour chaque pièce, lu dans la matrice partagée
+    n_wins = np.array([m.bit_count() for m in win_matrix(game)])  # (16,)
+    empties = int(empty.sum())
+
+    score = 0.0
+
+    if piece_to_place is not None:
+        iw = int(n_wins[piece_to_place]) if piece_to_place not in board else 0
+        # Lignes "prêtes à gagner" (3 pièces avec un attribut commun) avant le coup
+        t1 = (n_filled == 3) & ((common1 | common0) != 0)
+        before_t1 = int(t1.sum())
+        blk = 0
+        if before_t1 and piece_to_place not in board:
+            # Poser en c retire les lignes prêtes passant par c et en crée sur les lignes
+            # à 2 pièces passant par c qui partagent un attribut avec la pièce posée
+            removed = (t1[:, None] & empty_on_line).sum(axis=0)
+            created = ((shares[piece_to_place] & (n_filled == 2))[:, None] & empty_on_line).sum(axis=0)
+            blk = int(((created - removed < 0) & empty).sum())
+
+        score += (W_IW * iw
+                + W_MOB * empties
+                + W_BLK * blk)
+
+    avail = [p for p in range(16) if p not in board]
+    if avail:
+        tox_list = n_wins[avail]
+        tox_max = int(tox_list.max())
+        tox_avg = int(tox_list.sum()) / len(avail)
+        safe_max = max(0, empties - tox_max)
+        safe_avg = max(0.0, empties - tox_avg)
+        H = 0.0
+        ones_by_bit = PIECE_BITS[avail].sum(axis=0)
+        for k in range(4):
+            ones = int(ones_by_bit[k])
+            zeros = len(avail) - ones
+            for n in (zeros, ones):
+                if n > 0:
+                    p = n / len(avail)
+                    H -= p * math.log2(p)
+        score += (W_SAFE_MAX * safe_max
+                    + W_SAFE_AVG * safe_avg
+                      + W_DIV * H)
+
+    return max(0.0, float(score))
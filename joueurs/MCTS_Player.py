@@ -0,0 +1,19 @@
+import partie
+from mcts import MCTS, UCT_C
+# Joueur Monte-Carlo (UCT) : la force se règle avec le nombre de simulations ou le temps par coup,
+# au lieu de passer d'une profondeur de minimax à la suivante.
+
+class MCTSPlayer(partie.Player):
+    """MCTS agent"""
+
+    def __init__(self, partie: partie.Quarto, iterations: int = 2000, time_budget: float = None,
+                 c: float = UCT_C, reuse: bool = True) -> None:
+        super().__init__(partie)
+        # time_budget (secondes par coup) est prioritaire sur iterations s'il est donné
+        self.engine = MCTS(iterations, time_budget, c, reuse)
+
+    def place_piece(self) -> tuple[int, int]:
+        return self.engine.best_move(self.get_game())
+
+    def choose_piece(self) -> int:
+        return self.engine.best_piece(self.get_game())
@@ -1,18 +1,53 @@
 import partie 
 import numpy as np
 import copy
-from minmax import play_move, play_piece
+from minmax import play_move, play_piece, iterative_deepening, SearchContext
+from transposition import TranspositionTable
+from ordering import MoveOrdering
+from parallel_search import ParallelRootSearch
+from endgame import EndgameSolver
+from opening_book import open_book
 import random
+import time
+from search_stats import SearchStats
 # On crée trois joueurs minmax : un spécialisé aussi bien dans le placement de pièces que dans le choix des pièces, un seulement dans le placement et un seulement dans le choix
 # Voyons voir lequel est le meilleur
 
 class MinMax(partie.Player):
     """MinMax agent"""
 
-    def __init__(self, partie: partie.Quarto, joueur: int) -> None:
+    def __init__(self, partie: partie.Quarto, joueur: int, tt_mb: int = 64,
+                 time_budget: float = None, max_depth: int = None, ordering: bool = True,
+                 workers: int = None, stop_on_win: bool = False, endgame_cells: int = 8,
+                 book: str = None, instrument: bool = False) -> None:
         super().__init__(partie)
         self.joueur = joueur
-        self.depth = self.get_depth()
+        # Sans budget de temps : recherche à profondeur fixe (get_depth ou max_depth).
+        # Avec un budget (secondes par coup) : approfondissement itératif jusqu'à self.depth au plus.
+        self.time_budget = time_budget
+        self.depth = max_depth if max_depth is not None else self.get_depth()
+        # Table de transposition des negamax (joueurs 1 à 3), conservée d'un coup à l'autre.
+        # tt_mb = 0 pour la désactiver.
+        self.tt = TranspositionTable(tt_mb * 2**20) if tt_mb and joueur <= 3 else None
+        # Ordonnancement des coups (placements gagnants, pièces sûres, killers, history) des negamax.
+        # negamax_complete ne change pas de signe après une sélection : donner d'abord les pièces
+        # non toxiques y retarde les coupures (mesuré), on ne le garde donc que pour les autres.
+        self.ordering = MoveOrdering(safe_pieces_first=(joueur != 1)) if ordering and joueur <= 3 else None
+        # Recherche parallèle à la racine sur 'workers' processus (0 = tous les coeurs), pour une partie
+        # interactive (GUI) ou une analyse. À laisser à None dans run_multiple_games : les processus
+        # du pool de parties ne peuvent pas créer leur propre pool.
+        self.parallel = ParallelRootSearch(workers or None, tt_mb) if workers is not None else None
+        # Joue le premier coup gagnant prouvé trouvé à la racine, sans chercher le plus rapide
+        self.stop_on_win = stop_on_win
+        # Solveur exact quand il reste au plus endgame_cells cases vides (negamax, joueurs 1 à 3) ; 0 pour le désactiver
+        self.endgame = EndgameSolver(endgame_cells) if endgame_cells and joueur <= 3 else None
+        # Livre d'ouvertures (fichier construit par opening_book.py, lu par mmap), utilisé seulement
+        # s'il a été calculé avec le même joueur
+        self.book = open_book(book) if book else None
+        if self.book is not None and self.book.joueur != joueur:
+            self.book = None
+        # Compteurs de recherche (noeuds, coupures, feuilles, caches), cumulés sur la partie
+        self.stats = SearchStats() if instrument else None
 
     
     def get_depth(self):
@@ -25,12 +60,61 @@ class MinMax(partie.Player):
 # En effet, comme les deux autres joueurs ne calculent que le placement ou la sélection 
 # et donc à l'autre phase, le programme tourne plus rapidement bien que l'on perde un de profondeur. 
 
+    def enable_stats(self) -> None:
+        """Active l'instrumentation (utilisé par run_matchup, qui ne passe que des arguments positionnels)."""
+        if self.stats is None:
+            self.stats = SearchStats()
+
+    def share_tables(self, cache: dict) -> None:
+        """
+        Reprend la table de transposition et le solveur de fin de partie d'un joueur précédent de même
+        configuration (cache propre à un processus de game_pool.GamePool) : les tables restent chaudes
+        d'une partie à l'autre. Les valeurs stockées ne dépendent que de la position et du joueur : les
+        victoires sont rapportées au noeud (minmax.tt_score), et le solveur stocke des distances au mat.
+        """
+        key = (self.joueur, self.tt.capacity if self.tt is not None else 0,
+               self.endgame.threshold if self.endgame is not None else 0)
+        if key in cache:
+            self.tt, self.endgame = cache[key]
+        else:
+            cache[key] = (self.tt, self.endgame)
+
+    def search(self, play):
+        """Lance play_move ou play_piece, avec les compteurs du coup si l'instrumentation est active."""
+        if self.stats is None:
+            return self._search(play)
+        self.stats.begin_move(self.tt, self.endgame)
+        start = time.perf_counter()
+        move = self._search(play)
+        self.stats.end_move(time.perf_counter() - start, self.tt, self.endgame)
+        return move
+
+    def _search(self, play):
+        """Lance play_move ou play_piece, à profondeur fixe ou sous budget de temps."""
+        game = self.get_game()
+        if self.book is not None:
+            move = self.book.best_move(game) if play is play_move else self.book.best_piece(game)
+            if move is not None:
+                return move
+        if self.ordering is not None:
+            self.ordering.new_search()
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.parallel is not None:
+            self.parallel.new_search()
+            play = self.parallel.play_move if play is play_move else self.parallel.play_piece
+        if self.time_budget is None:
+            ctx = SearchContext(self.tt, ordering=self.ordering, stop_on_win=self.stop_on_win,
+                                endgame=self.endgame, stats=self.stats)
+            return play(game, self.depth, self.joueur, ctx=ctx)
+        return iterative_deepening(play, game, self.depth, self.joueur, self.time_budget,
+                                   self.tt, self.ordering, self.stop_on_win, self.endgame, self.stats)
+
     def place_piece(self) -> tuple[int, int]:
         '''place_piece en utilisant minmax'''
         game = self.get_game()
-        move = play_move(game, self.depth, self.joueur)
+        move = self.search(play_move)
         if move != None:
-            print("La pièce a été positionné à la position :", move)
             return move
         else:
             move_ok = False
@@ -39,15 +123,13 @@ class MinMax(partie.Player):
                 y = random.randint(0,3)
                 move_ok = (game._board[y, x] >= 0)
             move =(x,y)
-            print("La pièce a été positionné à la position : ", move)
             return move
 
     
     def choose_piece(self):
         game = self.get_game()
-        piece = play_piece(game, self.depth, self.joueur)
+        piece = self.search(play_piece)
         if piece != None:
-            print("La pièce choisie est la numéro : ", piece)
             return piece
         else:
             piece = random.randint(0,15)
@@ -55,5 +137,10 @@ class MinMax(partie.Player):
             while not piece_ok:
                 piece = random.randint(0,15)
                 piece_ok = game.select(piece)
-                print("La pièce choisie est la numéro : ", piece)
-            return piece
\ No newline at end of file
+            return piece
+
+    def close(self):
+        """Arrête le pool de la recherche parallèle s'il y en a un."""
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
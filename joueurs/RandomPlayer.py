@@ -9,11 +9,7 @@ class RandomPlayer(partie.Player):
         super().__init__(partie)
 
     def choose_piece(self) -> int:
-        piece_choisie = random.randint(0, 15)
-        print("La pièce choisie est la pièce numéro : ", piece_choisie)
-        return piece_choisie
+        return random.randint(0, 15)
 
     def place_piece(self) -> tuple[int, int]:
-        position = (random.randint(0, 3), random.randint(0, 3))
-        print("La position choisie est la suivante : ", position)
-        return position
\ No newline at end of file
+        return (random.randint(0, 3), random.randint(0, 3))
\ No newline at end of file
@@ -1,9 +1,10 @@
 # main.py
-import time
 import os
 import json
 import argparse
 import math
+import itertools
+import queue
 import multiprocessing as mp
 from tqdm import tqdm
 
@@ -12,6 +13,11 @@ from joueurs.RandomPlayer import RandomPlayer
 from joueurs.HumanPlayer import HumanPlayer
 from joueurs.MinMax_Player import MinMax
 from quarto_gui import QuartoGUI
+from events import make_sink
+from search_stats import new_totals, merge, summarize
+from game_pool import GamePool, TaskPool, play_game
+from broker import BrokerPool
+from game_store import GameStore, GAMES_PATH, summary_path_for
 
 BATCH_SIZE = 16
 RESULTS_PATH = "resultats.json"
@@ -51,6 +57,65 @@ def estimate_ci(wins: int, draws: int, games: int, conf_level: float, exclude_dr
         denom_used = games
     return p_hat, half, denom_used
 
+# Test séquentiel du rapport de vraisemblance (SPRT) : plutôt que d'attendre un IC étroit, on décide entre
+# H0 : p = p0 et H1 : p = p1 dès que les parties accumulées le permettent (risques alpha et beta).
+# Les appariements déséquilibrés (15/16 victoires) sont tranchés en quelques dizaines de parties.
+# - exclude_draws=True : test binomial exact sur les parties décisives.
+# - exclude_draws=False : p est le score moyen (victoire 1, nulle 1/2, défaite 0) et le rapport de
+#   vraisemblance est l'approximation du GSPRT (trinomial) : n (p1 - p0) (2 ŝ - p0 - p1) / (2 σ²),
+#   avec ŝ le score moyen observé et σ² la variance du score entre H0 et H1 compte tenu du taux de nulles
+#   observé d : p̄ (1 - p̄) - d / 4, p̄ = (p0 + p1) / 2. Sans nulle, c'est le test binomial au premier ordre.
+#   (La variance observée rendrait le test trop rapide sur 5 défaites sur 5 : elle y est presque nulle.)
+SPRT_ALPHA = 0.05
+SPRT_BETA = 0.05
+SPRT_MIN_VAR = 1e-3  # garde-fou si presque toutes les parties sont nulles
+
+def sprt_bounds(alpha: float, beta: float) -> tuple:
+    """Bornes de Wald du log-rapport de vraisemblance : (accepter H0 en dessous, accepter H1 au-dessus)."""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def sprt_llr(wins: int, draws: int, games: int, p0: float, p1: float, exclude_draws: bool) -> tuple:
+    """(log-rapport de vraisemblance de H1 contre H0, son espérance par partie au p̂ actuel)."""
+    losses = games - wins - draws
+    if exclude_draws:
+        decisives = wins + losses
+        if decisives == 0:
+            return 0.0, 0.0
+        win_step, loss_step = math.log(p1 / p0), math.log((1 - p1) / (1 - p0))
+        p_hat = wins / decisives
+        return wins * win_step + losses * loss_step, p_hat * win_step + (1 - p_hat) * loss_step
+    if games == 0:
+        return 0.0, 0.0
+    score = (wins + draws / 2) / games
+    p_mid = (p0 + p1) / 2
+    var = max(p_mid * (1 - p_mid) - draws / games / 4, SPRT_MIN_VAR)
+    step = (p1 - p0) * (2 * score - p0 - p1) / (2 * var)
+    return games * step, step
+
+def sprt_status(wins: int, draws: int, games: int, sprt: tuple, exclude_draws: bool) -> dict:
+    """
+    État du SPRT sprt = (p0, p1, alpha, beta) : log-rapport, bornes, décision ("H0", "H1" ou None)
+    et nombre de parties restantes attendu (dérive moyenne du log-rapport au p̂ actuel ; None si nulle).
+    """
+    p0, p1, alpha, beta = sprt
+    llr, step = sprt_llr(wins, draws, games, p0, p1, exclude_draws)
+    lower, upper = sprt_bounds(alpha, beta)
+    decision = "H1" if llr >= upper else "H0" if llr <= lower else None
+    if decision is not None:
+        remaining = 0
+    elif step > 0:
+        remaining = math.ceil((upper - llr) / step)
+    elif step < 0:
+        remaining = math.ceil((lower - llr) / step)
+    else:
+        remaining = None
+    return {
+        "p0": p0, "p1": p1, "alpha": alpha, "beta": beta,
+        "llr": llr, "llr_lower": lower, "llr_upper": upper,
+        "decision": decision,
+        "expected_remaining_games": remaining,
+    }
+
 # Etape de la gestion des JSONs
 def load_results(path: str) -> dict:
     if os.path.exists(path):
@@ -62,6 +127,10 @@ def load_results(path: str) -> dict:
             return {}
     return {}
 
+def save_results(path: str, results: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
 def accumulate(results: dict, key: str, add_games: int, add_wins: int, add_draws: int,
                add_tours_total: float, add_time_total_sec: float) -> dict:
     """Cumule des totaux pour un matchup donné."""
@@ -75,64 +144,136 @@ def accumulate(results: dict, key: str, add_games: int, add_wins: int, add_draws
     bucket["games"] += add_games
     bucket["wins"] += add_wins
     bucket["draws"] += add_draws
-    bucket["tours_total"] += add_tours_total/add_games
+    bucket["tours_total"] += add_tours_total  # total des tours (tours_moyens = tours_total / games)
     bucket["total_time_sec"] += add_time_total_sec
     return results
 
+def accumulate_search_stats(results: dict, key: str, search_stats) -> dict:
+    """Cumule les compteurs de recherche (search_stats.py) de chaque joueur et recalcule les taux."""
+    if search_stats is None:
+        return results
+    bucket = results[key].setdefault("search_stats", {})
+    for name, totals in zip(("player1", "player2"), search_stats):
+        if totals is not None:
+            bucket[name] = summarize(merge(bucket.get(name, new_totals()), totals))
+    return results
+
+def ci_meta(b: dict, conf_level: float, target_halfwidth: float, exclude_draws: bool,
+            p_hat: float, half: float, denom_used: int, sprt: dict = None) -> dict:
+    """Section 'meta' d'une série en mode IC : état de l'intervalle de confiance (et du SPRT) et moyennes."""
+    meta = {
+        "confidence_level": conf_level,
+        "target_halfwidth": target_halfwidth,
+        "exclude_draws": exclude_draws,
+        "p_win_estimate": p_hat,
+        "halfwidth": half,
+        "denominator_used": denom_used,
+        "games_total": int(b["games"]),
+        "wins_total": int(b["wins"]),
+        "draws_total": int(b["draws"]),
+        "losses_total": int(b["games"] - b["wins"] - b["draws"]),
+        "tours_moyens": (b["tours_total"] / b["games"]) if b["games"] else 0.0,
+        "temps_moyen_sec": (b["total_time_sec"] / b["games"]) if b["games"] else 0.0
+    }
+    if sprt is not None:
+        meta["sprt"] = sprt
+    return meta
+
+def seed_store(store, results: dict, name: str) -> None:
+    """
+    Série déjà jouée avant le journal (store) : ses totaux du fichier de résultats y sont repris une fois,
+    sans quoi le premier checkpoint les remplacerait par les seules parties du journal.
+    """
+    if store is not None and results.get(name, {}).get("games") and not store.bucket(name)["games"]:
+        store.seed(name, results[name])
+
+def checkpoint_results(results: dict, name: str, batch, instrument: bool, store=None) -> dict:
+    """
+    Ajoute un batch de parties à la série 'name' et renvoie ses totaux à jour (results[name]).
+    Avec un journal (store), les parties y sont écrites et les totaux en sont relus : le journal fait foi
+    et 'results' ne garde en plus que les compteurs de recherche. Sans journal, tout est cumulé dans 'results'.
+    """
+    wr, dr, tours_total, time_total, search_stats = game_totals(batch, instrument)
+    if store is not None:
+        store.append_results(name, batch)
+        results.setdefault(name, {}).update(store.bucket(name))
+    else:
+        accumulate(results, name, len(batch), wr, dr, tours_total, time_total)
+    accumulate_search_stats(results, name, search_stats)
+    return results[name]
+
 # Passage aux matchs
 
 def run_matchup(args):
-    """Exécute une partie et retourne le résultat."""
-    player1_cls, player1_args, player2_cls, player2_args = args
-    game = partie.Quarto()
-    game.set_players(
-        (player1_cls(game, *player1_args), player2_cls(game, *player2_args))
-    )
-    time_start = time.time()
-    winner = game.run()
-    time_end = time.time()
-    time_taken = time_end - time_start
-    tour = game.check_tour() # On a fait une erreur ici, le run devrait renvoyer le numéro du dernier tour si on veut avoir le numéro, je me suis rendu compte de l'erreur en rédigeant le rapport final après avoir fait tourné pendant plusieurs heures les parties, donc je ne me relancerai pas là-dedans.
-    return winner, tour, time_taken
-
-def run_multiple_games(n_games, player1_cls, player1_args, player2_cls, player2_args, n_jobs=mp.cpu_count()):
-    """Exécute n_games en parallèle avec multiprocessing, retourne des TOTAUX (pas des moyennes)."""
-    tasks = [(player1_cls, player1_args, player2_cls, player2_args)] * n_games
-    with mp.Pool(processes=n_jobs) as pool:
-        results = list(
-            tqdm(pool.imap_unordered(run_matchup, tasks), total=n_games)
-        )
-
-    wins = sum(1 for r, _, _ in results if r == 1)
-    draws = sum(1 for r, _, _ in results if r == -1)
-    tours_total = sum(t for _, t, _ in results)
-    time_total = sum(t for _, _, t in results)
-    return wins, draws, tours_total, time_total
+    """Exécute une partie et retourne le résultat (avec les compteurs de recherche si instrument)."""
+    return play_game(args)
+
+def game_totals(results, instrument: bool = False):
+    """TOTAUX d'une liste de résultats de run_matchup : wins, draws, tours_total, time_total, search_stats.
+    Avec instrument, search_stats contient les compteurs de recherche cumulés de chaque joueur (sinon None)."""
+    wins = sum(1 for r in results if r[0] == 1)
+    draws = sum(1 for r in results if r[0] == -1)
+    tours_total = sum(r[1] for r in results)
+    time_total = sum(r[2] for r in results)
+    search_stats = None
+    if instrument:
+        search_stats = [None, None]
+        for _, _, _, stats, _ in results:
+            for i, totals in enumerate(stats):
+                if totals is not None:
+                    search_stats[i] = merge(search_stats[i] or new_totals(), totals)
+    return wins, draws, tours_total, time_total, search_stats
+
+def run_multiple_games(n_games, player1_cls, player1_args, player2_cls, player2_args, n_jobs=mp.cpu_count(),
+                       instrument: bool = False, pool: TaskPool = None):
+    """Exécute n_games en parallèle avec multiprocessing, retourne des TOTAUX (pas des moyennes).
+    pool : pool persistant à réutiliser (GamePool, broker.BrokerPool) (sinon un pool est créé pour ces parties)."""
+    task = (player1_cls, player1_args, player2_cls, player2_args, instrument)
+    if pool is None:
+        with GamePool(n_jobs) as pool:
+            results = list(tqdm(pool.stream(task, n_games), total=n_games))
+    else:
+        results = list(tqdm(pool.stream(task, n_games), total=n_games))
+    return game_totals(results, instrument)
 
 # Checkpoint toutes les 100 parties pour garder des informations si l'ordinateur s'éteint ainsi que pour suivre les résultats des parties en direct
 
 def play_series_with_checkpoints(series_name: str, n_games: int,
                                  player1_cls, player1_args,
                                  player2_cls, player2_args,
-                                 batch_size: int = BATCH_SIZE):
-    """Joue n_games en batchs, met à jour le JSON à chaque batch (cumul)."""
-    remaining = n_games
-    while remaining > 0:
-        cur = min(batch_size, remaining)
-        wr, dr, tours_total, time_total = run_multiple_games(
-            cur, player1_cls, player1_args, player2_cls, player2_args
-        )
-
-        # Charger, cumuler, écrire immédiatement (checkpoint)
-        results = load_results(RESULTS_PATH)
-        results = accumulate(results, series_name, cur, wr, dr, tours_total, time_total)
-        with open(RESULTS_PATH, "w") as f:
-            json.dump(results,f, indent=4)
-
-        # Affichage d’un petit récap en direct
-        print(f"[{series_name}] Batch fini : +{cur} games, +{wr} wins, +{dr} draws")
-
-        remaining -= cur
+                                 batch_size: int = BATCH_SIZE,
+                                 instrument: bool = False,
+                                 pool: TaskPool = None,
+                                 store: GameStore = None):
+    """Joue n_games au fil de l'eau sur un pool persistant, met à jour le JSON toutes les batch_size parties (cumul).
+    store : journal où ajouter chaque partie (game_store.py), ou None."""
+    task = (player1_cls, player1_args, player2_cls, player2_args, instrument, store is not None)
+    own_pool = pool is None
+    pool = pool or GamePool()
+    try:
+        batch = []
+        for i, result in enumerate(pool.stream(task, n_games), 1):
+            batch.append(result)
+            if len(batch) < batch_size and i < n_games:
+                continue
+            cur = len(batch)
+            wr, dr, tours_total, time_total, search_stats = game_totals(batch, instrument)
+            if store is not None:
+                store.append_results(series_name, batch)
+            batch = []
+
+            # Charger, cumuler, écrire immédiatement (checkpoint)
+            results = load_results(RESULTS_PATH)
+            results = accumulate(results, series_name, cur, wr, dr, tours_total, time_total)
+            results = accumulate_search_stats(results, series_name, search_stats)
+            with open(RESULTS_PATH, "w") as f:
+                json.dump(results,f, indent=4)
+
+            # Affichage d’un petit récap en direct
+            print(f"[{series_name}] Batch fini : +{cur} games, +{wr} wins, +{dr} draws")
+    finally:
+        if own_pool:
+            pool.close()
 
 # Variante avec des intervalles de confiance :
 def play_until_ci_with_checkpoints(series_name: str,
@@ -142,77 +283,254 @@ def play_until_ci_with_checkpoints(series_name: str,
                                    player2_cls, player2_args,
                                    batch_size: int = BATCH_SIZE,
                                    exclude_draws: bool = False,
-                                   max_games: int = 200000):
+                                   max_games: int = 200000,
+                                   instrument: bool = False,
+                                   pool: TaskPool = None,
+                                   sprt: tuple = None,
+                                   store: GameStore = None):
     """
     Joue par batchs et s'arrête quand la demi-largeur de l'IC de Wilson
     sur p(P1 gagne) <= target_halfwidth au niveau conf_level.
+    Avec sprt = (p0, p1, alpha, beta) : s'arrête à la place dès que le SPRT accepte H0 ou H1,
+    testé après chaque partie terminée (voir sprt_status).
+    store : journal où ajouter chaque partie (game_store.py), ou None.
     - exclude_draws=False : p = P(victoire) sur toutes les parties (les nulles comptent comme 'non-gagnées').
     - exclude_draws=True  : p = P(victoire | partie décisive), nulles exclues du dénominateur.
-    Checkpoint JSON après chaque batch (accumulation des totaux).
+    Checkpoint après chaque batch : les parties vont au journal (store), dont les totaux font foi ; le fichier
+    de résultats (méta de l'IC, compteurs de recherche) n'est alors écrit qu'en fin de série. Sans journal,
+    le fichier de résultats est le checkpoint et il est réécrit après chaque batch.
+    Les parties sont jouées au fil de l'eau sur un pool persistant (pool, ou un pool créé pour la série) :
+    un batch est simplement les batch_size parties suivantes à se terminer.
     """
-    total_games_before = 0
     # Charger l'état existant si on relance (reprise sur accident/arrêt)
-    results = load_results(RESULTS_PATH)
-    if series_name in results:
-        b = results[series_name]
-        total_games_before = int(b.get("games", 0))
+    results = load_results(RESULTS_CI_PATH)
+    seed_store(store, results, series_name)
+    b = store.bucket(series_name) if store is not None else results.get(series_name, {})
+    total_games_before = int(b.get("games", 0))
+    if total_games_before:
         print(f"[{series_name}] Reprise : déjà {total_games_before} parties cumulées.")
 
-    while True:
-        results = load_results(RESULTS_CI_PATH)
-        bucket = results.get(series_name, {"games": 0, "wins": 0, "draws": 0, "tours_total": 0.0, "time_total_sec": 0.0})
-        games_so_far = int(bucket["games"])
-        wins_so_far = int(bucket["wins"])
-        draws_so_far = int(bucket["draws"])
-
-        if games_so_far >= max_games:
-            print(f"[{series_name}] Arrêt (max_games atteint : {max_games}).")
-            break
-
-        cur = min(batch_size, max_games - games_so_far)
-        wr, dr, tours_total, time_total = run_multiple_games(cur, player1_cls, player1_args, player2_cls, player2_args)
-
-        # Checkpoint (cumuler et écrire)
-        results = accumulate(results, series_name, cur, wr, dr, tours_total, time_total)
-        # On calcule l'IC sur le bucket à jour avant d’écrire la méta
-        b = results[series_name]
-        p_hat, half, denom_used = estimate_ci(
-            wins=int(b["wins"]),
-            draws=int(b["draws"]),
-            games=int(b["games"]),
-            conf_level=conf_level,
-            exclude_draws=exclude_draws
-        )
-
-        # On ajoute une section 'meta' pour visualiser l’état de l’IC
-        results[series_name + " (meta)"] = {
-            "confidence_level": conf_level,
-            "target_halfwidth": target_halfwidth,
-            "exclude_draws": exclude_draws,
-            "p_win_estimate": p_hat,
-            "halfwidth": half,
-            "denominator_used": denom_used,
-            "games_total": int(b["games"]),
-            "wins_total": int(b["wins"]),
-            "draws_total": int(b["draws"]),
-            "losses_total": int(b["games"] - b["wins"] - b["draws"]),
-            "tours_moyens": (b["tours_total"] / b["games"]) if b["games"] else 0.0,
-            "temps_moyen_sec": (b["total_time_sec"] / b["games"]) if b["games"] else 0.0
+    own_pool = pool is None
+    pool = pool or GamePool()
+    games = pool.stream((player1_cls, player1_args, player2_cls, player2_args, instrument, store is not None))
+    try:
+        play_ci_batches(series_name, games, target_halfwidth, conf_level, batch_size, exclude_draws,
+                        max_games, instrument, sprt, store)
+    finally:
+        games.close()
+        if own_pool:
+            pool.close()
+
+def play_ci_batches(series_name, games, target_halfwidth, conf_level, batch_size, exclude_draws,
+                    max_games, instrument, sprt=None, store=None):
+    """Boucle de play_until_ci_with_checkpoints : 'games' est le flux des résultats de parties."""
+    results = load_results(RESULTS_CI_PATH)
+    try:
+        while True:
+            bucket = store.bucket(series_name) if store is not None else results.get(series_name, {"games": 0, "wins": 0, "draws": 0})
+            games_so_far = int(bucket["games"])
+            wins_so_far = int(bucket["wins"])
+            draws_so_far = int(bucket["draws"])
+
+            if games_so_far >= max_games:
+                print(f"[{series_name}] Arrêt (max_games atteint : {max_games}).")
+                break
+
+            cur = min(batch_size, max_games - games_so_far)
+            batch = []
+            status = None
+            for result in itertools.islice(games, cur):
+                batch.append(result)
+                if sprt is not None:
+                    # SPRT : décision possible après chaque partie, sans attendre la fin du batch
+                    status = sprt_status(wins_so_far + sum(r[0] == 1 for r in batch),
+                                         draws_so_far + sum(r[0] == -1 for r in batch),
+                                         games_so_far + len(batch), sprt, exclude_draws)
+                    if status["decision"] is not None:
+                        break
+            cur = len(batch)
+
+            # Checkpoint (journal des parties, ou cumul dans le fichier de résultats)
+            b = checkpoint_results(results, series_name, batch, instrument, store)
+            # On calcule l'IC sur le bucket à jour avant d’écrire la méta
+            p_hat, half, denom_used = estimate_ci(
+                wins=int(b["wins"]),
+                draws=int(b["draws"]),
+                games=int(b["games"]),
+                conf_level=conf_level,
+                exclude_draws=exclude_draws
+            )
+
+            # On ajoute une section 'meta' pour visualiser l’état de l’IC
+            results[series_name + " (meta)"] = ci_meta(b, conf_level, target_halfwidth, exclude_draws,
+                                                       p_hat, half, denom_used, status)
+
+            print(f"[{series_name}] Batch +{cur} => games={b['games']}, wins={b['wins']}, draws={b['draws']}, "
+                  f"p̂={'{:.4f}'.format(p_hat) if isinstance(p_hat, float) else p_hat} ± {half:.4f} (niveau {int(conf_level*100)}%, denom={denom_used})")
+
+            if store is None:
+                save_results(RESULTS_CI_PATH, results)
+            # Critère d'arrêt
+            if sprt is not None:
+                if status is not None and status["decision"] is not None:
+                    print(f"[{series_name}] SPRT : {status['decision']} acceptée (LLR {status['llr']:.3f}).")
+                    break
+            elif denom_used > 0 and half <= target_halfwidth:
+                print(f"[{series_name}] Critère atteint : demi-largeur {half:.4f} ≤ {target_halfwidth:.4f}.")
+                break
+    finally:
+        if store is not None:
+            save_results(RESULTS_CI_PATH, results)
+
+# Tournoi : toutes les séries en même temps sur un seul pool, au lieu de les jouer l'une après l'autre.
+# Chaque nouvelle partie va à la série dont l'IC est le plus large par rapport à la cible ;
+# une série s'arrête seule quand elle a convergé (ou atteint max_games).
+
+# Affrontements du mode --ci : (nom du joueur A, (classe, args), nom du joueur B, (classe, args)),
+# joués dans les deux sens (A commence, puis B commence)
+TOURNAMENT = [
+    ("minmax1", (MinMax, (4,)), "negamax_placement_specialized", (MinMax, (2,))),
+    ("minmax1", (MinMax, (4,)), "negamax_complete", (MinMax, (1,))),
+]
+
+def tournament_series(matchups, both_colours: bool = True) -> list:
+    """Séries (nom, player1_cls, player1_args, player2_cls, player2_args) d'une liste d'affrontements."""
+    series = []
+    for name_a, (cls_a, args_a), name_b, (cls_b, args_b) in matchups:
+        series.append((f"{name_a} vs {name_b}", cls_a, args_a, cls_b, args_b))
+        if both_colours:
+            series.append((f"{name_b} vs {name_a}", cls_b, args_b, cls_a, args_a))
+    return series
+
+def series_priority(wins: int, draws: int, games: int, in_flight: int, conf_level: float,
+                    target_halfwidth: float, exclude_draws: bool) -> float:
+    """
+    Demi-largeur de l'IC rapportée à la cible, en comptant les parties en cours comme déjà jouées
+    (au p̂ actuel) : sans cela, toutes les parties libres iraient à la même série avant son prochain résultat.
+    """
+    if games == 0:
+        return float('inf')
+    z = z_from_conf(conf_level)
+    trials = (games - draws if exclude_draws else games)
+    if trials <= 0:
+        return float('inf')
+    p_hat = wins / trials
+    projected = trials + in_flight
+    return wilson_half_width(p_hat * projected, projected, z) / target_halfwidth
+
+def play_tournament(series, target_halfwidth: float, conf_level: float,
+                    batch_size: int = BATCH_SIZE,
+                    exclude_draws: bool = False,
+                    max_games: int = 200000,
+                    instrument: bool = False,
+                    pool: TaskPool = None,
+                    sprt: tuple = None,
+                    store: GameStore = None):
+    """
+    Joue toutes les séries (voir tournament_series) en mode IC sur un même pool, qui reste plein :
+    chaque place libérée reçoit une partie de la série de plus forte priorité (series_priority).
+    Mêmes fichiers, checkpoints (toutes les batch_size parties d'une série), reprise et mode SPRT
+    que play_until_ci_with_checkpoints ; l'arrêt d'une série est testé après chacune de ses parties.
+    Avec un journal (store), les totaux en sont relus et le fichier de résultats n'est écrit qu'à la fin.
+    """
+    own_pool = pool is None
+    pool = pool or GamePool()
+    window = 2 * pool.workers
+    done_queue = queue.Queue()
+    results = load_results(RESULTS_CI_PATH)
+    state = {}
+    for name, player1_cls, player1_args, player2_cls, player2_args in series:
+        seed_store(store, results, name)
+        b = store.bucket(name) if store is not None else results.get(name, {})
+        state[name] = {
+            "task": (player1_cls, player1_args, player2_cls, player2_args, instrument, store is not None),
+            "games": int(b.get("games", 0)), "wins": int(b.get("wins", 0)), "draws": int(b.get("draws", 0)),
+            "in_flight": 0, "pending": [], "active": True,
         }
+        if state[name]["games"]:
+            print(f"[{name}] Reprise : déjà {state[name]['games']} parties cumulées.")
 
-        print(f"[{series_name}] Batch +{cur} => games={b['games']}, wins={b['wins']}, draws={b['draws']}, "
+    def checkpoint(name):
+        s = state[name]
+        cur = len(s["pending"])
+        b = checkpoint_results(results, name, s["pending"], instrument, store)
+        s["pending"] = []
+        p_hat, half, denom_used = estimate_ci(int(b["wins"]), int(b["draws"]), int(b["games"]),
+                                              conf_level, exclude_draws)
+        status = sprt_status(int(b["wins"]), int(b["draws"]), int(b["games"]), sprt,
+                             exclude_draws) if sprt is not None else None
+        results[name + " (meta)"] = ci_meta(b, conf_level, target_halfwidth, exclude_draws,
+                                            p_hat, half, denom_used, status)
+        if store is None:
+            save_results(RESULTS_CI_PATH, results)
+        print(f"[{name}] Batch +{cur} => games={b['games']}, wins={b['wins']}, draws={b['draws']}, "
               f"p̂={'{:.4f}'.format(p_hat) if isinstance(p_hat, float) else p_hat} ± {half:.4f} (niveau {int(conf_level*100)}%, denom={denom_used})")
 
-        with open(RESULTS_CI_PATH, "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-        # Critère d'arrêt
-        if denom_used > 0 and half <= target_halfwidth:
-            print(f"[{series_name}] Critère atteint : demi-largeur {half:.4f} ≤ {target_halfwidth:.4f}.")
-            break
+    def update_active(name):
+        s = state[name]
+        if not s["active"]:
+            return
+        _, half, denom_used = estimate_ci(s["wins"], s["draws"], s["games"], conf_level, exclude_draws)
+        if sprt is not None:
+            status = sprt_status(s["wins"], s["draws"], s["games"], sprt, exclude_draws)
+            if status["decision"] is not None:
+                print(f"[{name}] SPRT : {status['decision']} acceptée (LLR {status['llr']:.3f}).")
+                s["active"] = False
+        elif denom_used > 0 and half <= target_halfwidth:
+            print(f"[{name}] Critère atteint : demi-largeur {half:.4f} ≤ {target_halfwidth:.4f}.")
+            s["active"] = False
+        if s["active"] and s["games"] >= max_games:
+            print(f"[{name}] Arrêt (max_games atteint : {max_games}).")
+            s["active"] = False
+
+    for name in state:
+        update_active(name)
+    in_flight = 0
+    try:
+        while True:
+            # Remplir le pool : chaque place libre va à la série la plus loin de sa cible
+            while in_flight < window:
+                candidates = [n for n, s in state.items()
+                              if s["active"] and s["games"] + s["in_flight"] < max_games]
+                if not candidates:
+                    break
+                name = max(candidates, key=lambda n: series_priority(
+                    state[n]["wins"], state[n]["draws"], state[n]["games"], state[n]["in_flight"],
+                    conf_level, target_halfwidth, exclude_draws))
+                pool.submit(state[name]["task"], 1, done_queue, tag=name)
+                state[name]["in_flight"] += 1
+                in_flight += 1
+            if in_flight == 0:
+                break
+
+            name, batch = done_queue.get()
+            in_flight -= 1
+            if isinstance(batch, BaseException):
+                raise batch
+            s = state[name]
+            s["in_flight"] -= 1
+            for result in batch:
+                s["games"] += 1
+                s["wins"] += result[0] == 1
+                s["draws"] += result[0] == -1
+            s["pending"].extend(batch)
+            update_active(name)
+            # Les parties d'une série arrêtée encore en cours sont comptées à leur retour
+            if len(s["pending"]) >= batch_size or (not s["active"] and s["in_flight"] == 0):
+                checkpoint(name)
+    finally:
+        for name, s in state.items():
+            if s["pending"]:
+                checkpoint(name)
+        if store is not None:
+            save_results(RESULTS_CI_PATH, results)
+        if own_pool:
+            pool.close()
 
 # main et GUI
  
-def main():
+def main(pool: TaskPool = None, store: GameStore = None):
+    """Toutes les séries du tournoi, sur le même pool de parties persistant (et le même journal des parties)."""
     if args.ci:
         # --- MODE ARRÊT ADAPTATIF ---
         # Série 1 : Random vs MinMax(1)
@@ -223,7 +541,10 @@ def main():
                                        MinMax, (2,), MinMax, (1,),
                                        batch_size=BATCH_SIZE,
                                        exclude_draws=args.exclude_draws,
-                                       max_games=args.max_games)
+                                       max_games=args.max_games,
+                                       instrument=args.instrument,
+                                       pool=pool,
+                                       store=store)
         
         series_2 = "negamax_placement_specialized vs minmax2"
         print(f"Lancement (CI) : {series_2}")
@@ -231,7 +552,10 @@ def main():
                                        MinMax, (2,), MinMax, (5,),
                                        batch_size=BATCH_SIZE,
                                        exclude_draws=args.exclude_draws,
-                                       max_games=args.max_games)
+                                       max_games=args.max_games,
+                                       instrument=args.instrument,
+                                       pool=pool,
+                                       store=store)
 
         # Série 3 : MinMax(1) vs MinMax(3)
         series_3 = "minmax2 vs negamax_placement_complete"
@@ -240,64 +564,59 @@ def main():
                                        MinMax, (5,), MinMax, (2,),
                                        batch_size=BATCH_SIZE,
                                        exclude_draws=args.exclude_draws,
-                                       max_games=args.max_games)'''
+                                       max_games=args.max_games,
+                                       instrument=args.instrument,
+                                       pool=pool,
+                                       store=store)'''
+
+        sprt = (*args.sprt, args.sprt_alpha, args.sprt_beta) if args.sprt else None
+        # Séries 4, 4a, 5 et 5a (TOURNAMENT, dans les deux sens) jouées en même temps sur le pool
+        series = tournament_series(TOURNAMENT)
+        print("Lancement (CI) : " + ", ".join(name for name, *_ in series))
+        play_tournament(series, args.ci_halfwidth, args.ci_level,
+                        batch_size=BATCH_SIZE,
+                        exclude_draws=args.exclude_draws,
+                        max_games=args.max_games,
+                        instrument=args.instrument,
+                        pool=pool,
+                        sprt=sprt,
+                        store=store)
 
-         # Série 5 : MinMax(3) vs MinMax(3)
-        series_4= "minmax1 vs negamax_placement_specialized"
-        print(f"Lancement (CI) : {series_4}")
-        play_until_ci_with_checkpoints(series_4, args.ci_halfwidth, args.ci_level,
-                                       MinMax, (4,), MinMax, (2,),
-                                       batch_size=BATCH_SIZE,
-                                       exclude_draws=args.exclude_draws,
-                                       max_games=args.max_games)
-        series_4a="negamax_placement_specialized vs minmax1"
-        print("Lancement (CI) ",series_4a )
-        play_until_ci_with_checkpoints(series_4a, args.ci_halfwidth, args.ci_level,
-                                       MinMax, (2,), MinMax, (4,),
-                                       batch_size=BATCH_SIZE,
-                                       exclude_draws=args.exclude_draws,
-                                       max_games=args.max_games)
-        
-        # Série 5 : MinMax(3) vs MinMax(3)
-        series_5= "minmax1 vs negamax_complete"
-        print(f"Lancement (CI) : {series_5}")
-        play_until_ci_with_checkpoints(series_5, args.ci_halfwidth, args.ci_level,
-                                       MinMax, (4,), MinMax, (1,),
-                                       batch_size=BATCH_SIZE,
-                                       exclude_draws=args.exclude_draws,
-                                       max_games=args.max_games)
-        series_5a="negamax_complete vs minmax1"
-        print(f"Lancement (CI) : {series_5a}")
-        play_until_ci_with_checkpoints(series_5a, args.ci_halfwidth, args.ci_level,
-                                       MinMax, (1,), MinMax, (4,),
-                                       batch_size=BATCH_SIZE,
-                                       exclude_draws=args.exclude_draws,
-                                       max_games=args.max_games)
-        
     else:
         # Mode 
         n_games = 1000  # total (sera joué en batchs BATCH_SIZE)
         # Série 1
         series_1 = "Random vs negamax_selection_specialized"
         print(f"Lancement de la série : {series_1}")
-        play_series_with_checkpoints(series_1, n_games, MinMax, (1,), MinMax, (3,))
+        play_series_with_checkpoints(series_1, n_games, MinMax, (1,), MinMax, (3,), instrument=args.instrument, pool=pool, store=store)
         # Série 2
         series_2 = "negamax_complete vs negamax_placement_specialized"
         print(f"Lancement de la série : {series_2}")
-        play_series_with_checkpoints(series_2, n_games, MinMax, (1,), MinMax, (2,))
+        play_series_with_checkpoints(series_2, n_games, MinMax, (1,), MinMax, (2,), instrument=args.instrument, pool=pool, store=store)
         # Série 3
         series_3 = "negamax_placement_specialized vs negamax_selection_specialized"
         print(f"Lancement de la série : {series_3}")
-        play_series_with_checkpoints(series_3, n_games, MinMax, (2,), MinMax, (3,))
+        play_series_with_checkpoints(series_3, n_games, MinMax, (2,), MinMax, (3,), instrument=args.instrument, pool=pool, store=store)
 
 
-def main_gui():
-    """Mode graphique : une seule partie affichée en temps réel"""
-    game = partie.Quarto()
-    game.set_players((RandomPlayer(game), RandomPlayer(game)))
+def main_gui(workers: int = None, events: str = "console"):
+    """Mode graphique : une seule partie affichée en temps réel.
+    Avec workers, le second joueur est MinMax1 avec la recherche parallèle à la racine.
+    events : sink des événements en plus de la gui (voir events.make_sink)."""
+    game = partie.Quarto(make_sink(events))
+    if workers is None:
+        ia = RandomPlayer(game)
+    else:
+        ia = MinMax(game, 1, workers=workers)
+    game.set_players((RandomPlayer(game), ia))
     gui = QuartoGUI(game, image_folder="images_pieces")
     game.add_observer(gui.on_update)
-    game.run()
+    try:
+        game.run()
+    finally:
+        if workers is not None:
+            ia.close()
+        game.events.close()
     gui.start()
 
 if __name__ == '__main__':
@@ -312,10 +631,41 @@ if __name__ == '__main__':
                         help="Estimer p = P(win | décisif) en excluant les nulles du dénominateur.")
     parser.add_argument("--max-games", type=int, default=1200,
                         help="Garde-fou : nombre maximum de parties.")
+    parser.add_argument("--sprt", type=float, nargs=2, metavar=("P0", "P1"), default=None,
+                        help="Avec --ci : arrêt par SPRT entre H0 p=P0 et H1 p=P1 (score moyen, nulle = 1/2) au lieu de l'IC.")
+    parser.add_argument("--sprt-alpha", type=float, default=SPRT_ALPHA, help="Risque de première espèce du SPRT.")
+    parser.add_argument("--sprt-beta", type=float, default=SPRT_BETA, help="Risque de seconde espèce du SPRT.")
+    parser.add_argument("--store", default=GAMES_PATH,
+                        help="Journal append-only des parties (une ligne JSON par partie, vue agrégée dans *.summary.json) ; "
+                             "\"\" pour ne pas l'écrire.")
+    parser.add_argument("--broker", default=None, metavar="ADRESSE",
+                        help="Coordinateur : parties jouées par les workers connectés à hôte:port ou à une socket Unix "
+                             "(python broker.py ADRESSE sur chaque machine) au lieu du pool local.")
+    parser.add_argument("--broker-workers", type=int, default=None,
+                        help="Avec --broker : nombre de workers attendus (taille des paquets et parties en cours).")
+    parser.add_argument("--authkey", default=None,
+                        help="Avec --broker : clé partagée avec les workers (par défaut : clé publique sur une adresse "
+                             "locale, sinon une clé tirée et affichée au lancement).")
     parser.add_argument("--gui", action="store_true", help="Run the graphical interface")
+    parser.add_argument("--instrument", action="store_true",
+                        help="Compteurs de recherche (noeuds, coupures, feuilles, caches) ajoutés au fichier de résultats.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Avec --gui : MinMax1 cherche chaque coup sur N processus (0 = tous les coeurs).")
+    parser.add_argument("--events", default="console",
+                        help="Avec --gui : none, console, ring[:taille] ou jsonl:chemin pour enregistrer les événements.")
     args = parser.parse_args()
 
     if args.gui:
-        main_gui()
+        main_gui(args.workers, args.events)
     else:
-        main()
+        store = GameStore(args.store, summary_path_for(args.store)) if args.store else None
+        try:
+            if args.broker:
+                pool = BrokerPool(args.broker, args.broker_workers, args.authkey.encode() if args.authkey else None)
+            else:
+                pool = GamePool()
+            with pool:
+                main(pool, store)
+        finally:
+            if store is not None:
+                store.close()
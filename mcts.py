@@ -0,0 +1,221 @@
+import math
+import random
+import time
+
+from bitboard import BitQuarto, FULL_MASK, N_CELLS
+
+# Recherche arborescente Monte-Carlo (UCT), anytime : plus on lui donne d'itérations ou de temps,
+# plus elle est forte, sans le saut de coût d'une profondeur de minimax à la suivante.
+# Les deux phases d'un tour sont deux niveaux distincts de l'arbre :
+#   noeud "placement" (une pièce est en attente) -> fils = cases vides
+#   noeud "selection" (aucune pièce en attente)  -> fils = pièces disponibles
+# Le joueur qui place est aussi celui qui choisit ensuite la pièce de l'adversaire.
+# Les parties simulées (playouts) jouent directement sur bitboard.BitQuarto, sans Quarto.run ni affichage.
+
+UCT_C = math.sqrt(2)
+REUSE_DEPTH = 4  # niveaux explorés pour retrouver la nouvelle position dans l'arbre précédent
+
+
+def _pending(game) -> int:
+    """Pièce en attente de placement, -1 en phase de sélection."""
+    selected = game.selected
+    return selected if selected >= 0 and not (game.used >> selected) & 1 else -1
+
+
+def _key(game):
+    return game.occupied, game.pieces, _pending(game)
+
+
+def _moves(game):
+    """Coups possibles : cases vides (placement) ou pièces disponibles (sélection)."""
+    if _pending(game) >= 0:
+        return [c for c in range(N_CELLS) if not (game.occupied >> c) & 1]
+    return [p for p in range(16) if not (game.used >> p) & 1]
+
+
+def _play(game, move, placement: bool) -> None:
+    if placement:
+        game.push_place(move % 4, move // 4)
+    else:
+        game.push_select(move)
+
+
+class Node:
+    """Noeud de l'arbre : 'player' doit jouer ici (0 ou 1), 'wins' est compté pour le joueur qui y a mené."""
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "player", "placement",
+                 "terminal", "key")
+
+    def __init__(self, game, player: int, move=None, parent=None, terminal: int = None) -> None:
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.player = player
+        self.placement = _pending(game) >= 0
+        # terminal : None si la partie continue, sinon vainqueur (0 / 1) ou -1 pour une nulle
+        self.terminal = terminal
+        self.untried = [] if terminal is not None else _moves(game)
+        random.shuffle(self.untried)
+        self.visits = 0
+        self.wins = 0.0
+        self.key = _key(game)
+
+    def uct_child(self, c: float) -> "Node":
+        log_n = math.log(self.visits)
+        return max(self.children,
+                   key=lambda ch: ch.wins / ch.visits + c * math.sqrt(log_n / ch.visits))
+
+
+def playout(game, player: int, smart: bool = True) -> int:
+    """
+    Termine la partie au hasard à partir de 'game' (modifié puis remis en état) et renvoie le vainqueur
+    (0 / 1) ou -1 pour une nulle. 'player' doit jouer.
+    Avec smart : on gagne dès que c'est possible et on évite de donner une pièce gagnante
+    (lus tous les deux dans la matrice des placements gagnants).
+    """
+    pushed = 0
+    winner = -1
+    while True:
+        pending = _pending(game)
+        empty = ~game.occupied & FULL_MASK
+        if pending >= 0:
+            wins = game.wins[pending] & empty if smart else 0
+            if wins:
+                winner = player
+                break
+            cells = [c for c in range(N_CELLS) if (empty >> c) & 1]
+            c = random.choice(cells)
+            game.push_place(c % 4, c // 4)
+            pushed += 1
+            if not smart and game.check_winner() != -1:
+                winner = player
+                break
+            if game.occupied == FULL_MASK:
+                break
+        else:
+            pieces = [p for p in range(16) if not (game.used >> p) & 1]
+            if smart:
+                safe = [p for p in pieces if not game.wins[p] & empty]
+                pieces = safe or pieces
+            game.push_select(random.choice(pieces))
+            pushed += 1
+            player ^= 1
+    for _ in range(pushed):
+        game.pop()
+    return winner
+
+
+class MCTS:
+    """
+    Moteur UCT. Budget par coup : 'iterations' simulations, ou 'time_budget' secondes si donné.
+    Avec reuse, le sous-arbre de la position atteinte est gardé d'un coup à l'autre.
+    """
+
+    def __init__(self, iterations: int = 2000, time_budget: float = None, c: float = UCT_C,
+                 reuse: bool = True, smart_playouts: bool = True) -> None:
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.c = c
+        self.reuse = reuse
+        self.smart_playouts = smart_playouts
+        self.root = None
+        self.last_iterations = 0
+        self.reused_visits = 0
+
+    def _find_root(self, game):
+        """Noeud de l'arbre précédent correspondant à la position, ou None."""
+        if not self.reuse or self.root is None:
+            return None
+        key = _key(game)
+        frontier = [self.root]
+        for _ in range(REUSE_DEPTH + 1):
+            for node in frontier:
+                if node.key == key:
+                    node.parent = None
+                    return node
+            frontier = [ch for node in frontier for ch in node.children]
+        return None
+
+    def _expand(self, game, node) -> Node:
+        move = node.untried.pop()
+        _play(game, move, node.placement)
+        if node.placement:
+            # le joueur qui vient de placer choisit ensuite la pièce de l'adversaire
+            player = node.player
+            if game.check_winner() != -1:
+                terminal = node.player
+            elif game.occupied == FULL_MASK:
+                terminal = -1
+            else:
+                terminal = None
+        else:
+            player, terminal = node.player ^ 1, None
+        child = Node(game, player, move, node, terminal)
+        node.children.append(child)
+        return child
+
+    def search(self, game) -> Node:
+        """Lance les simulations depuis la position et renvoie la racine."""
+        game = BitQuarto.from_game(game)
+        root = self._find_root(game)
+        if root is None:
+            root = Node(game, 0)
+        self.reused_visits = root.visits
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        n = 0
+        # au moins une simulation, même avec un budget déjà écoulé : la racine a alors un fils à jouer
+        while n == 0 or ((n < self.iterations) if deadline is None else (time.perf_counter() < deadline)):
+            node, depth = root, 0
+            # 1) descente UCT tant que le noeud est entièrement développé
+            while not node.untried and node.children:
+                node = node.uct_child(self.c)
+                _play(game, node.move, node.parent.placement)
+                depth += 1
+            # 2) développement d'un fils
+            if node.untried:
+                node = self._expand(game, node)
+                depth += 1
+            # 3) simulation
+            if node.terminal is not None:
+                winner = node.terminal
+            else:
+                winner = playout(game, node.player, self.smart_playouts)
+            for _ in range(depth):
+                game.pop()
+            # 4) remontée : chaque noeud est compté pour le joueur qui y a mené (celui qui jouait au parent)
+            while node is not None:
+                node.visits += 1
+                if node.parent is not None:
+                    if winner == -1:
+                        node.wins += 0.5
+                    elif winner == node.parent.player:
+                        node.wins += 1
+                node = node.parent
+            n += 1
+        self.last_iterations = n
+        self.root = root
+        return root
+
+    def _best(self, game):
+        root = self.search(game)
+        if not root.children:
+            return None
+        return max(root.children, key=lambda ch: ch.visits).move
+
+    def best_move(self, game):
+        """Placement (x, y) de la pièce sélectionnée."""
+        c = self._best(game)
+        return None if c is None else (c % 4, c // 4)
+
+    def best_piece(self, game):
+        """Pièce à donner à l'adversaire."""
+        return self._best(game)
+
+    def stats(self) -> dict:
+        root = self.root
+        return {
+            "iterations": self.last_iterations,
+            "reused_visits": self.reused_visits,
+            "root_visits": root.visits if root is not None else 0,
+            "root_children": len(root.children) if root is not None else 0,
+        }
@@ -1,122 +1,283 @@
-from copy import deepcopy
 import random
 import itertools
+import time
 import numpy
 
 from heuristics import get_all_possible_moves, state_eval_abs
+from bitboard import BitQuarto
+from transposition import EXACT, LOWER, UPPER, position_key
 
 INF = float('inf')
-        
+
+
+class SearchTimeout(Exception):
+    """Levée dans l'arbre quand le budget de temps du coup est épuisé."""
+
+
+class SearchContext:
+    """
+    État partagé par tous les noeuds d'une recherche :
+    - tt : table de transposition (ou None)
+    - deadline : instant (time.perf_counter) au-delà duquel on abandonne la recherche (ou None)
+    - ordering : ordonnancement des coups, ordering.MoveOrdering (ou None : ordre brut)
+    - root_window : la racine passe le meilleur score déjà trouvé comme alpha aux fils suivants
+    - stop_on_win : la racine s'arrête au premier coup gagnant prouvé (pas forcément le plus rapide)
+    - nodes : nombre de noeuds visités (compté par enter, appelé à chaque noeud)
+    - endgame : solveur exact endgame.EndgameSolver (ou None) ; sous son seuil de cases vides,
+      la racine joue le coup prouvé au lieu de lancer la recherche heuristique
+    - stats : compteurs détaillés search_stats.SearchStats (ou None : pas d'instrumentation)
+    """
+
+    def __init__(self, tt=None, deadline=None, ordering=None,
+                 root_window=True, stop_on_win=False, endgame=None, stats=None) -> None:
+        self.tt = tt
+        self.deadline = deadline
+        self.ordering = ordering
+        self.root_window = root_window
+        self.stop_on_win = stop_on_win
+        self.endgame = endgame
+        self.stats = stats
+        self.nodes = 0
+
+    def enter(self, game, phase) -> None:
+        """Appelé à l'entrée de chaque noeud : compteurs, puis contrôle du temps."""
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.node(game.ply, phase)
+        self.check_time()
+
+    def check_time(self) -> None:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+
 def eval_for_current_player(game, depth, phase):
     """
     Cette fonction doit renvoyer un score positif si la position est bonne pour le joueur considéré"""
     piece_to_place = game.get_selected_piece() if phase == "placement" else None
     # state_eval_abs doit renvoyer une magnitude >=0 ; le signe est géré par negamax.
+    # Avec la matrice des gains et le suivi des lignes, la version scalaire est plus rapide que state_eval_abs_vec sur BitQuarto
     return state_eval_abs(game, phase, piece_to_place, depth)
 
 
-def negamax_complete(game, depth, phase, alpha=-INF, beta=INF):
+def leaf(ctx, evaluator, *args):
+    """Évaluation d'une feuille, comptée et chronométrée si la recherche est instrumentée."""
+    if ctx is None or ctx.stats is None:
+        return evaluator(*args)
+    start = time.perf_counter()
+    value = evaluator(*args)
+    ctx.stats.leaf(time.perf_counter() - start)
+    return value
+
+
+# Table de transposition (optionnelle) : les feuilles y sont aussi stockées, l'évaluation étant le plus coûteux.
+# Une victoire vaut WIN + profondeur restante à la feuille : elle dépend de la profondeur de la racine qui l'a
+# trouvée. Dans la table, elle est rapportée au noeud (WIN - distance), pour rester juste quand l'entrée est
+# relue à une autre profondeur (coup suivant, autre partie avec MinMax.share_tables).
+def tt_score(value, depth):
+    """Score à stocker : une victoire est comptée depuis le noeud et non depuis la racine."""
+    if value >= PROVEN_WIN:
+        return value - depth
+    if value <= -PROVEN_WIN:
+        return value + depth
+    return value
+
+def node_score(value, depth):
+    """Inverse de tt_score pour un noeud de profondeur restante 'depth'."""
+    if value >= PROVEN_WIN:
+        return value + depth
+    if value <= -PROVEN_WIN:
+        return value - depth
+    return value
+
+def tt_probe(tt, key, depth, alpha, beta):
+    """
+    Cherche la position dans la table. Renvoie (valeur, alpha, beta) :
+    la valeur n'est pas None si l'entrée suffit à conclure, sinon la fenêtre est éventuellement resserrée."""
+    entry = tt.probe(key)
+    if entry is not None:
+        value, entry_depth, bound = entry
+        value = node_score(value, depth)
+        if entry_depth >= depth:
+            if bound == EXACT:
+                return value, alpha, beta
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value, alpha, beta
+    return None, alpha, beta
+
+def tt_store(tt, key, best, depth, alpha_orig, beta):
+    """Enregistre le résultat d'un noeud avec le type de borne correspondant, et le renvoie."""
+    if tt is not None:
+        if best <= alpha_orig:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        tt.store(key, tt_score(best, depth), depth, bound)
+    return best
+
+
+# Ordonnancement (optionnel) des coups dans les noeuds à plusieurs fils
+def ordered_moves(game, ctx):
+    moves = get_all_possible_moves(game)  # liste de (x, y)
+    if ctx is not None and ctx.ordering is not None:
+        moves = ctx.ordering.order_placements(game, moves, game.ply)
+    return moves
+
+def ordered_pieces(game, ctx):
+    pieces = list(set(range(16)) - set(game._board.ravel()))
+    if ctx is not None and ctx.ordering is not None:
+        pieces = ctx.ordering.order_pieces(game, pieces, game.ply)
+    return pieces
+
+def note_cutoff(ctx, phase, move, game, depth, index):
+    """Met à jour killers / history et les compteurs de coupures."""
+    if ctx is not None:
+        if ctx.ordering is not None:
+            ctx.ordering.record_cutoff(phase, move, game.ply, depth, index)
+        if ctx.stats is not None:
+            ctx.stats.cutoff(index)
+
+
+def negamax_complete(game, depth, phase, alpha=-INF, beta=INF, ctx=None):
     # On ne considère piece et move qu'au premier tour
+    tt = key = alpha_orig = None
+    if ctx is not None:
+        ctx.enter(game, phase)
+        tt = ctx.tt
+        if tt is not None:
+            key, alpha_orig = position_key(game, phase), alpha
+            hit, alpha, beta = tt_probe(tt, key, depth, alpha, beta)
+            if hit is not None:
+                return hit
     # Arrêt (terminal ou horizon)
     if depth == 0 or game.check_winner() != -1 or game.check_finished():
-        return eval_for_current_player(game, depth, phase)
+        return tt_store(tt, key, leaf(ctx, eval_for_current_player, game, depth, phase), depth, -INF, INF)
+
     best = -INF
     if phase == "placement":
         # On place la pièce déjà sélectionnée
-        moves = get_all_possible_moves(game)  # liste de (x, y)
-        for (x, y) in moves:
-            g = deepcopy(game)
-            g.place(x, y)
+        moves = ordered_moves(game, ctx)
+        for i, (x, y) in enumerate(moves):
+            game.push_place(x, y)
             # après un placement on passe à la phase "selection"
-            val = -negamax_complete(g, depth-1, "selection", -beta, -alpha)
+            val = -negamax_complete(game, depth-1, "selection", -beta, -alpha, ctx)
+            game.pop()
             
             if val > best:
                 best = val
             if best > alpha:
                 alpha = best
             if alpha >= beta:
+                note_cutoff(ctx, "placement", (x, y), game, depth, i)
                 break  # élagage α–β
-        return best
+        return tt_store(tt, key, best, depth, alpha_orig, beta)
 
     elif phase == "selection":
         # Ici, le joueur choisit une pièce pour l’autre
-        available_pieces = list(set(range(16)) - set(game._board.ravel()))
-        for piece in available_pieces:
-            g = deepcopy(game)
-            g.select(piece)
+        available_pieces = ordered_pieces(game, ctx)
+        for i, piece in enumerate(available_pieces):
+            game.push_select(piece)
             # Après la sélection, on change de joueur, et donc on veut minimiser le score du joueur adverse
             # après la sélection on passe à la phase "placement"
-            val = negamax_complete(g, depth-1, "placement", alpha, beta)
+            val = negamax_complete(game, depth-1, "placement", alpha, beta, ctx)
+            game.pop()
             if val > best:
                 best = val
             if best > alpha:
                 alpha = best
             if alpha >= beta:
+                note_cutoff(ctx, "selection", piece, game, depth, i)
                 break  # élagage α–β
-        return best
+        return tt_store(tt, key, best, depth, alpha_orig, beta)
 
-def negamax_placement_specialized(game, depth, phase, alpha=-INF, beta=INF):
+def negamax_placement_specialized(game, depth, phase, alpha=-INF, beta=INF, ctx=None):
     """Négamax avec α–β, spécialisé sur la phase 'placement'.
        Phase 'selection' = un seul tirage aléatoire d'une pièce disponible.
     """
+    tt = key = alpha_orig = None
+    if ctx is not None:
+        ctx.enter(game, phase)
+        tt = ctx.tt
+        if tt is not None:
+            key, alpha_orig = position_key(game, phase), alpha
+            hit, alpha, beta = tt_probe(tt, key, depth, alpha, beta)
+            if hit is not None:
+                return hit
     # Terminal / horizon
     if depth == 0 or game.check_winner() != -1 or game.check_finished():
-        return eval_for_current_player(game, depth, phase)
-
+        return tt_store(tt, key, leaf(ctx, eval_for_current_player, game, depth, phase), depth, -INF, INF)
 
     if phase == "placement":
         best = -INF
         # On doit placer la pièce déjà sélectionnée
-        moves = get_all_possible_moves(game)
+        moves = ordered_moves(game, ctx)
 
-        for (x, y) in moves:
-            g = deepcopy(game)
-            g.place(x, y)
+        for i, (x, y) in enumerate(moves):
+            game.push_place(x, y)
             # après un placement on passe à la phase "selection"
-            val = -negamax_placement_specialized(g, depth-1, "selection", -beta, -alpha)
+            val = -negamax_placement_specialized(game, depth-1, "selection", -beta, -alpha, ctx)
+            game.pop()
             if val > best:
                 best = val
             if best > alpha:
                 alpha = best
             if alpha >= beta:
+                note_cutoff(ctx, "placement", (x, y), game, depth, i)
                 break  # élagage alpha-beta
-        return best
+        return tt_store(tt, key, best, depth, alpha_orig, beta)
 
     elif phase == "selection":
         # Choix aléatoire d'une seule pièce 
         available_pieces = list(set(range(16)) - set(game._board.ravel()))
 
         piece = random.choice(available_pieces)
-        g = deepcopy(game)
-        g.select(piece)
-        return negamax_placement_specialized(g, depth-1, "placement", alpha, beta)
-
-def negamax_selection_specialized(game, depth, phase, alpha=-INF, beta=INF):
+        game.push_select(piece)
+        val = negamax_placement_specialized(game, depth-1, "placement", alpha, beta, ctx)
+        game.pop()
+        return tt_store(tt, key, val, depth, alpha_orig, beta)
+
+def negamax_selection_specialized(game, depth, phase, alpha=-INF, beta=INF, ctx=None):
+    tt = key = alpha_orig = None
+    if ctx is not None:
+        ctx.enter(game, phase)
+        tt = ctx.tt
+        if tt is not None:
+            key, alpha_orig = position_key(game, phase), alpha
+            hit, alpha, beta = tt_probe(tt, key, depth, alpha, beta)
+            if hit is not None:
+                return hit
     if depth == 0 or game.check_winner() != -1 or game.check_finished():
-        return eval_for_current_player(game, depth, phase)
-
+        return tt_store(tt, key, leaf(ctx, eval_for_current_player, game, depth, phase), depth, -INF, INF)
     if phase == "selection":
         best = -INF
-        available_pieces = list(set(range(16)) - set(game._board.ravel()))
-        for piece in available_pieces:
-            g = deepcopy(game)
-            g.select(piece)
-            val = -negamax_selection_specialized(g, depth-1, "placement", -beta, -alpha)
+        available_pieces = ordered_pieces(game, ctx)
+        for i, piece in enumerate(available_pieces):
+            game.push_select(piece)
+            val = -negamax_selection_specialized(game, depth-1, "placement", -beta, -alpha, ctx)
+            game.pop()
             if val > best:
                 best = val
             if best > alpha:
                 alpha = best
             if alpha >= beta:
+                note_cutoff(ctx, "selection", piece, game, depth, i)
                 break
-        return best
+        return tt_store(tt, key, best, depth, alpha_orig, beta)
     
     elif phase == "placement":
         best = -INF
         moves = get_all_possible_moves(game)
         choice = random.choice(moves)
-        g = deepcopy(game)
-        g.place(choice[0], choice[1])
-        return negamax_selection_specialized(g, depth-1, "selection", alpha, beta)
+        game.push_place(choice[0], choice[1])
+        val = negamax_selection_specialized(game, depth-1, "selection", alpha, beta, ctx)
+        game.pop()
+        return tt_store(tt, key, val, depth, alpha_orig, beta)
 
 # On garde des fonctions montrant comment étaient notre fonction d'évaluation et notre algorithme avant les negamax
 
@@ -137,36 +298,40 @@ def state_eval(game_state, depth, is_maximizing, joueur):
         return -1
 
 # Les lignes suivantes sont inspirées du pseudo-code du alphabeta pruning sur le wikipedia d'alpha-beta pruning
-def minmax1(game, depth, maximizingPlayer, phase, alpha=-INF, beta=INF):
+def minmax1(game, depth, maximizingPlayer, phase, alpha=-INF, beta=INF, ctx=None):
     # phase = "placement" ou "selection"
     
+    if ctx is not None:
+        ctx.enter(game, phase)
     if depth == 0 or game.check_winner() != -1:
-        return state_eval(game, depth, maximizingPlayer, 4)
+        return leaf(ctx, state_eval, game, depth, maximizingPlayer, 4)
 
     if phase == "placement":
         # On doit placer la pièce donnée
         moves = get_all_possible_moves(game)
         if maximizingPlayer:
             best = -INF
-            for move in moves:
-                g = deepcopy(game) # C'est crucial ici : permet de ne pas modifier l'état véritable du jeu
-                g.place(move[0], move[1])
+            for i, move in enumerate(moves):
+                game.push_place(move[0], move[1])  # make/unmake : on modifie la partie sur place puis on annule avec pop()
                 # après un placement, on passe à la phase "selection"
-                val = minmax1(g, depth-1, not maximizingPlayer, "selection")
+                val = minmax1(game, depth-1, not maximizingPlayer, "selection", ctx=ctx)
+                game.pop()
                 best = max(best, val)
                 alpha = max(alpha, best)
                 if beta <= alpha:
+                    note_cutoff(ctx, "placement", move, game, depth, i)
                     break
             return best
         else:
             best = INF
-            for move in moves:
-                g = deepcopy(game)
-                g.place(move[0], move[1])
-                val = minmax1(g, depth-1, not maximizingPlayer, "selection")
+            for i, move in enumerate(moves):
+                game.push_place(move[0], move[1])
+                val = minmax1(game, depth-1, not maximizingPlayer, "selection", ctx=ctx)
+                game.pop()
                 best = min(best, val)
                 beta = min(beta, best)
                 if beta <= alpha:
+                    note_cutoff(ctx, "placement", move, game, depth, i)
                     break
             return best
     
@@ -175,179 +340,234 @@ def minmax1(game, depth, maximizingPlayer, phase, alpha=-INF, beta=INF):
         available_pieces = list(set(range(16)) - set(game._board.ravel()))
         if maximizingPlayer:
             best = -INF
-            for piece in available_pieces:
-                g = deepcopy(game)
-                g.select(piece)
+            for i, piece in enumerate(available_pieces):
+                game.push_select(piece)
                 # On prend la contraposée de maximizingPlayer car on change de joueur après la sélection
-                val = minmax1(g, depth-1, maximizingPlayer, "placement")
+                val = minmax1(game, depth-1, maximizingPlayer, "placement", ctx=ctx)
+                game.pop()
                 best = max(best, val)
                 alpha = max(alpha, best)
                 if beta <= alpha:
+                    note_cutoff(ctx, "selection", piece, game, depth, i)
                     break
             return best
         else:
             best = INF
-            for piece in available_pieces:
-                g = deepcopy(game)
-                g.select(piece)
-                val = minmax1(g, depth-1, maximizingPlayer, "placement")
+            for i, piece in enumerate(available_pieces):
+                game.push_select(piece)
+                val = minmax1(game, depth-1, maximizingPlayer, "placement", ctx=ctx)
+                game.pop()
                 best = min(best, val)
                 beta = min(beta, best)
                 if beta <= alpha:
+                    note_cutoff(ctx, "selection", piece, game, depth, i)
                     break
             return best
 
 
-def minmax2(game, depth, maximizingPlayer,phase, alpha:float=-INF, beta:float=INF):
+def minmax2(game, depth, maximizingPlayer,phase, alpha:float=-INF, beta:float=INF, ctx=None):
+    if ctx is not None:
+        ctx.enter(game, phase)
     if depth == 0 or game.check_winner() != -1:
-        return state_eval(game, depth, maximizingPlayer, 5)
+        return leaf(ctx, state_eval, game, depth, maximizingPlayer, 5)
     
     # On doit placer la pièce donnée
     moves = get_all_possible_moves(game)
     if phase == "placement":
         if maximizingPlayer:
             best = -INF
-            for move in moves:
-                g = deepcopy(game) # C'est crucial ici : permet de ne pas modifier l'état véritable du jeu
-                g.place(move[0], move[1])
+            for i, move in enumerate(moves):
+                game.push_place(move[0], move[1])  # make/unmake : on modifie la partie sur place puis on annule avec pop()
                 # après un placement, on passe à la phase "selection" de la pièce
-                val = minmax2(g, depth-1, "selection", not maximizingPlayer)
+                val = minmax2(game, depth-1, not maximizingPlayer, "selection", ctx=ctx)
+                game.pop()
                 best = max(best, val)
                 alpha = max(alpha, best)
                 if beta <= alpha:
+                    note_cutoff(ctx, "placement", move, game, depth, i)
                     break
             return best
         else:
             best = INF
-            for move in moves:
-                g = deepcopy(game)
-                g.place(move[0], move[1])
-                val = minmax2(g, depth-1, "selection", not maximizingPlayer)
+            for i, move in enumerate(moves):
+                game.push_place(move[0], move[1])
+                val = minmax2(game, depth-1, not maximizingPlayer, "selection", ctx=ctx)
+                game.pop()
                 best = min(best, val)
                 beta = min(beta, best)
                 if beta <= alpha:
+                    note_cutoff(ctx, "placement", move, game, depth, i)
                     break
             return best
     elif phase == "selection":
         if maximizingPlayer:
             best = -INF
             available_pieces = list(set(range(16)) - set(game._board.ravel()))
-            g = deepcopy(game)
             piece_ok = False
             while not piece_ok:
                 piece = random.randint(0,16)
                 if piece in available_pieces:
                     piece_ok = True
-            g.select(piece)
-            val = minmax2(g, depth-1, "placement", maximizingPlayer)
+            game.push_select(piece)
+            val = minmax2(game, depth-1, maximizingPlayer, "placement", ctx=ctx)
+            game.pop()
             best = max(best, val)
             return best
         else:
             best = INF
             available_pieces = list(set(range(16)) - set(game._board.ravel()))
-            g = deepcopy(game)
             piece_ok = False
             while not piece_ok:
                 piece = random.randint(0,16)
                 if piece in available_pieces:
                     piece_ok = True
-            g.select(piece)
-            val = minmax2(g, depth-1, "placement", maximizingPlayer)
+            game.push_select(piece)
+            val = minmax2(game, depth-1, maximizingPlayer, "placement", ctx=ctx)
+            game.pop()
             best = min(best, val)
             return best
 
 
-def play_move(game, depth, joueur):
+def search_child(game, depth, joueur, phase, alpha=-INF, ctx=None):
+    """
+    Valeur d'un fils de la racine pour le joueur 'joueur' (1 à 5) :
+    phase "selection" après un placement à la racine, "placement" après une sélection.
+    """
+    if joueur == 1:
+        return negamax_complete(game, depth, phase, alpha, INF, ctx)
+    elif joueur == 2:
+        return negamax_placement_specialized(game, depth, phase, alpha, INF, ctx)
+    elif joueur == 3:
+        return negamax_selection_specialized(game, depth, phase, alpha, INF, ctx)
+    elif joueur == 4:
+        return minmax1(game, depth, phase == "placement", phase, alpha=alpha, beta=INF, ctx=ctx)
+    else:
+        return minmax2(game, depth, phase == "placement", phase, alpha=alpha, beta=INF, ctx=ctx)
+
+
+PROVEN_WIN = EVAL_WIN // 2  # au-delà, le score d'un fils de la racine est une fin de partie gagnée
+
+def root_alpha(ctx, best):
+    """Alpha passé au fils suivant de la racine : le meilleur score déjà trouvé (fenêtre partagée)."""
+    return best if ctx is None or ctx.root_window else -INF
+
+def solved_endgame(ctx, game):
+    """Vrai si la position est sous le seuil du solveur exact de fin de partie."""
+    return ctx is not None and ctx.endgame is not None and ctx.endgame.applies(game)
+
+def root_done(ctx, best):
+    """Coupure « suffisant » : une victoire prouvée a été trouvée, inutile de chercher mieux."""
+    return ctx is not None and ctx.stop_on_win and best >= PROVEN_WIN
+
+
+def play_move(game, depth, joueur, ctx=None, first=None):
     scored_moves = []
+    # La recherche se fait sur l'état compact : les copies de l'arbre ne coûtent presque rien
+    game = BitQuarto.from_game(game)
+    moves = get_all_possible_moves(game)
+    if first in moves:  # meilleur coup de l'itération précédente en premier (approfondissement itératif)
+        moves.remove(first)
+        moves.insert(0, first)
 
     tour = game.check_tour()
     if tour == 1:
         scored_moves.append(((0,0),10))
-    
-    else:
-        if joueur==1:
-            for move in get_all_possible_moves(game):
-                game_t = deepcopy(game)
-                game_t.place(move[0], move[1])
-                scored_moves.append((move, negamax_complete(game_t, depth,"selection")))
-            scored_moves.sort(key=lambda x: x[1], reverse=True) # On trie dans l'ordre décroissant des scores
-
-        elif joueur==2:
-            for move in get_all_possible_moves(game):
-                game_t = deepcopy(game)
-                game_t.place(move[0], move[1])
-                # On a placé notre pièce, reste plus qu'à voir les possibilités qui suivent dans les sélections
-                scored_moves.append((move,negamax_placement_specialized(game_t, depth, "selection")))
-            scored_moves.sort(key=lambda x: x[1], reverse=True) # On trie dans l'ordre décroissant des scores
-
-
-        elif joueur==3:
-            for move in get_all_possible_moves(game):
-                game_t = deepcopy(game)
-                game_t.place(move[0], move[1])
-                scored_moves.append((move,negamax_selection_specialized(game_t, depth, "selection")))
-            scored_moves.sort(key=lambda x: x[1], reverse=True) # On trie dans l'ordre décroissant des scores
-        elif joueur==4:
-            for move in get_all_possible_moves(game):
-                game_t = deepcopy(game)
-                game_t.place(move[0], move[1])
-                scored_moves.append((move, minmax1(game_t, depth, False, "selection", alpha=-INF, beta=INF)))
-            scored_moves.sort(key=lambda x: x[1], reverse=True) # On trie dans l'ordre décroissant des scores
-        else:
-            for move in get_all_possible_moves(game):
-                game_t = deepcopy(game)
-                game_t.place(move[0], move[1])
-                scored_moves.append((move, minmax2(game_t, depth, False, "selection", alpha=-INF, beta=INF)))
-            scored_moves.sort(key=lambda x: x[1], reverse=True) # On trie dans l'ordre décroissant des scores
-
 
+    elif solved_endgame(ctx, game):
+        # Fin de partie : coup exact (victoire la plus rapide, ou défaite la plus lointaine)
+        scored_moves.append((ctx.endgame.best_move(game)[0], 0))
 
+    else:
+        # Un fils qui ne bat pas alpha renvoie une valeur <= alpha : le tri stable garde alors
+        # le premier coup de meilleur score, comme sans fenêtre
+        best = -INF
+        for move in moves:
+            game.push_place(move[0], move[1])
+            # On a placé notre pièce, reste plus qu'à voir les possibilités qui suivent dans les sélections
+            val = search_child(game, depth, joueur, "selection", root_alpha(ctx, best), ctx)
+            game.pop()
+            scored_moves.append((move, val))
+            best = max(best, val)
+            if root_done(ctx, best):
+                break
+        scored_moves.sort(key=lambda x: x[1], reverse=True) # On trie dans l'ordre décroissant des scores
 
     return scored_moves[0][0] if scored_moves[0][1] != float('-inf') or  scored_moves[0][1] != -1 else None 
 
-def play_piece(game,depth, joueur):
+def play_piece(game,depth, joueur, ctx=None, first=None):
     scored_pieces = []
+    game = BitQuarto.from_game(game)
+    pieces = list(set(range(16)) - set(game._board.ravel()))
+    if first in pieces:
+        pieces.remove(first)
+        pieces.insert(0, first)
     # Il serait sûrement préférable de supprimer cette ligne si j'affronte une IA qui enregistre les parties et fait du reinforcement learning
     # Car cette dernière serait avantagée en n'ayant pas à calculer les patterns du premier coup, bien qu'il faut noter que le premiier coup est clairement
     # Le moins important des coups, bien que l'algorithme va calculer très longtemps pour trouver la solution optimale au début.
     tour = game.check_tour()
     if tour == 1:
         scored_pieces.append((0, 10))
-    
+
+    elif solved_endgame(ctx, game):
+        scored_pieces.append((ctx.endgame.best_piece(game)[0], 0))
+
     else:
-        if joueur==1:
-            for piece in list(set(range(16)) - set(game._board.ravel())):
-                game_t = deepcopy(game)
-                game_t.select(piece)
-                scored_pieces.append((piece,negamax_complete(game_t, depth, "placement")))
-                # On a selectionné notre pièce, reste plus qu'à voir les possibilités qui suivent dans les placements
-            scored_pieces.sort(key=lambda x: x[1], reverse=True)
-        
-        elif joueur==2:
-            for piece in list(set(range(16)) - set(game._board.ravel())):
-                game_t = deepcopy(game)
-                game_t.select(piece)
-                scored_pieces.append((piece,negamax_placement_specialized(game_t, depth, "placement")))
-            scored_pieces.sort(key=lambda x: x[1], reverse=True)
-        
-        elif joueur==3:
-            for piece in list(set(range(16)) - set(game._board.ravel())):
-                game_t = deepcopy(game)
-                game_t.select(piece)
-                scored_pieces.append((piece,negamax_selection_specialized(game_t, depth, "placement")))
-            scored_pieces.sort(key=lambda x: x[1], reverse=True)
-        elif joueur==4:
-            for piece in list(set(range(16)) - set(game._board.ravel())):
-                game_t = deepcopy(game)
-                game_t.select(piece)
-                scored_pieces.append((piece,minmax1(game_t, depth, True, "placement", alpha=-INF, beta=INF)))
-            scored_pieces.sort(key=lambda x: x[1], reverse=True)
-        else:
-            for piece in list(set(range(16)) - set(game._board.ravel())):
-                game_t = deepcopy(game)
-                game_t.select(piece)
-                scored_pieces.append((piece,minmax2(game_t, depth, True, "placement", alpha=-INF, beta=INF)))
-            scored_pieces.sort(key=lambda x: x[1], reverse=True)
+        best = -INF
+        for piece in pieces:
+            game.push_select(piece)
+            # On a selectionné notre pièce, reste plus qu'à voir les possibilités qui suivent dans les placements
+            val = search_child(game, depth, joueur, "placement", root_alpha(ctx, best), ctx)
+            game.pop()
+            scored_pieces.append((piece, val))
+            best = max(best, val)
+            if root_done(ctx, best):
+                break
+        scored_pieces.sort(key=lambda x: x[1], reverse=True)
+
+    return scored_pieces[0][0] if scored_pieces[0][1] != float('-inf') or  scored_pieces[0][1] != -1 else None
 
 
-    return scored_pieces[0][0] if scored_pieces[0][1] != float('-inf') or  scored_pieces[0][1] != -1 else None 
+def iterative_deepening(play, game, max_depth, joueur, time_budget, tt=None, ordering=None,
+                        stop_on_win=False, endgame=None, stats=None):
+    """
+    Approfondissement itératif autour de play_move / play_piece :
+    on cherche à profondeur 1, 2, ... max_depth tant que le budget (en secondes) n'est pas épuisé.
+    Si le temps manque au milieu d'une itération, on renvoie le meilleur coup de la dernière itération terminée.
+    Le meilleur coup d'une itération est joué en premier à l'itération suivante.
+    La première itération n'est jamais interrompue, pour toujours avoir un coup à jouer.
+    """
+    deadline = time.perf_counter() + time_budget
+    best = None
+    for depth in range(1, max_depth + 1):
+        ctx = SearchContext(tt, deadline if depth > 1 else None, ordering,
+                            stop_on_win=stop_on_win, endgame=endgame, stats=stats)
+        try:
+            best = play(game, depth, joueur, ctx=ctx, first=best)
+        except SearchTimeout:
+            break
+        if ctx.endgame is not None and ctx.endgame.applies(game):
+            break  # coup prouvé : approfondir ne changerait rien
+        if time.perf_counter() >= deadline:
+            break
+    return best
+
+
+def root_window_stats(play, game, depth, joueur, stop_on_win=False):
+    """
+    Compare le nombre de noeuds de play_move / play_piece sans fenêtre à la racine (comportement initial)
+    et avec la fenêtre partagée (plus éventuellement la coupure sur victoire prouvée).
+    Sans table de transposition ni ordonnancement, pour ne mesurer que l'effet de la racine.
+    """
+    base = SearchContext(root_window=False)
+    random.seed(0)
+    base_move = play(game, depth, joueur, ctx=base)
+    windowed = SearchContext(stop_on_win=stop_on_win)
+    random.seed(0)
+    move = play(game, depth, joueur, ctx=windowed)
+    return {
+        "nodes_full_window": base.nodes,
+        "nodes_root_window": windowed.nodes,
+        "reduction": 1 - windowed.nodes / base.nodes if base.nodes else 0.0,
+        "move_full_window": base_move,
+        "move_root_window": move,
+    }
@@ -0,0 +1,157 @@
+import argparse
+import mmap
+import multiprocessing as mp
+import os
+import random
+import struct
+
+from tqdm import tqdm
+
+from bitboard import BitQuarto, N_CELLS
+from minmax import play_move, play_piece
+from symmetries import apply_symmetry, canonicalize, inverse_cell, inverse_piece
+
+# Livre d'ouvertures : meilleurs coups précalculés pour les premiers demi-coups de la partie.
+# Les positions sont dédupliquées par symétrie (symmetries.canonicalize) et le coup est stocké
+# dans le repère de la forme canonique ; à la lecture on le ramène dans le repère de la partie.
+#
+# Fichier binaire :
+#   en-tête  : magic, joueur, profondeur de recherche, nombre de demi-coups couverts, nombre d'entrées
+#   entrées  : clé canonique (12 octets, gros-boutiste) + coup (1 octet : case 4*y + x, ou pièce),
+#              triées par clé pour une recherche dichotomique directement dans le fichier mappé (mmap)
+
+MAGIC = b"QBK1"
+HEADER = struct.Struct("<4sBBBI")
+KEY_BYTES = 12
+RECORD_BYTES = KEY_BYTES + 1
+DEFAULT_PATH = "opening_book.bin"
+
+# Le tour 1 (plateau vide) est joué directement par play_move / play_piece : le livre commence au tour 2
+FIRST_PLY = 2
+
+
+def _ply_positions(plies: int):
+    """
+    Formes canoniques des positions atteignables en moins de 'plies' demi-coups, à partir du tour 2.
+    Renvoie une liste de (clé, position canonique, phase).
+    """
+    level = {canonicalize(BitQuarto())[0]: BitQuarto()}
+    positions = []
+    for ply in range(plies):
+        if ply >= FIRST_PLY:
+            for key, game in level.items():
+                phase = "selection" if ply % 2 == 0 else "placement"
+                positions.append((key, game, phase))
+        next_level = {}
+        for game in level.values():
+            if ply % 2 == 0:
+                moves = [(game.push_select, (p,)) for p in range(16) if not (game.used >> p) & 1]
+            else:
+                moves = [(game.push_place, (c % 4, c // 4)) for c in range(N_CELLS)
+                         if not (game.occupied >> c) & 1]
+            for push, move in moves:
+                push(*move)
+                key, sym = canonicalize(game)
+                if key not in next_level:
+                    next_level[key] = apply_symmetry(game, sym)
+                game.pop()
+        level = next_level
+    return positions
+
+
+def _search_position(args):
+    """Meilleur coup (dans le repère canonique) d'une position du livre."""
+    key, game, phase, joueur, depth = args
+    random.seed(key)  # les joueurs 2, 3 et 5 tirent des coups au hasard : livre reproductible
+    if phase == "placement":
+        x, y = play_move(game, depth, joueur)
+        return key, y * 4 + x
+    return key, play_piece(game, depth, joueur)
+
+
+def build_book(path: str, plies: int, joueur: int, depth: int, n_jobs: int = mp.cpu_count()) -> int:
+    """Calcule le livre en parallèle et l'écrit dans 'path'. Renvoie le nombre d'entrées."""
+    positions = _ply_positions(plies)
+    tasks = [(key, game, phase, joueur, depth) for key, game, phase in positions]
+    with mp.Pool(processes=n_jobs) as pool:
+        entries = list(tqdm(pool.imap_unordered(_search_position, tasks, chunksize=4), total=len(tasks)))
+    entries.sort()
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, joueur, depth, plies, len(entries)))
+        for key, move in entries:
+            f.write(key.to_bytes(KEY_BYTES, "big") + bytes((move,)))
+    return len(entries)
+
+
+class OpeningBook:
+    """
+    Lecture du livre par mmap : rien n'est chargé au démarrage et les processus qui lisent
+    le même fichier partagent les pages en mémoire.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.joueur, self.depth, self.plies, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} n'est pas un livre d'ouvertures")
+
+    def _find(self, key: int):
+        """Recherche dichotomique de la clé, renvoie le coup stocké ou None."""
+        target = key.to_bytes(KEY_BYTES, "big")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * RECORD_BYTES
+            found = self.data[offset:offset + KEY_BYTES]
+            if found < target:
+                lo = mid + 1
+            elif found > target:
+                hi = mid
+            else:
+                return self.data[offset + KEY_BYTES]
+        return None
+
+    def best_move(self, game):
+        """Placement (x, y) du livre pour la pièce sélectionnée, ou None si la position n'y est pas."""
+        key, sym = canonicalize(game)
+        c = self._find(key)
+        if c is None:
+            return None
+        c = inverse_cell(sym, c)
+        return c % 4, c // 4
+
+    def best_piece(self, game):
+        """Pièce à donner selon le livre, ou None si la position n'y est pas."""
+        key, sym = canonicalize(game)
+        piece = self._find(key)
+        return None if piece is None else inverse_piece(sym, piece)
+
+    def close(self) -> None:
+        self.data.close()
+
+
+_OPEN_BOOKS = {}
+
+
+def open_book(path: str):
+    """Livre partagé par tous les joueurs du processus (None si le fichier n'existe pas)."""
+    if path not in _OPEN_BOOKS:
+        _OPEN_BOOKS[path] = OpeningBook(path) if os.path.exists(path) else None
+    return _OPEN_BOOKS[path]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Précalcule le livre d'ouvertures de MinMax.")
+    parser.add_argument("--plies", type=int, default=8,
+                        help="Nombre de demi-coups couverts depuis le plateau vide (8 = tours 2 à 4).")
+    parser.add_argument("--joueur", type=int, default=1, help="Joueur MinMax (1 à 5) utilisé pour la recherche.")
+    parser.add_argument("--depth", type=int, default=None,
+                        help="Profondeur de recherche (par défaut celle de MinMax.get_depth).")
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    parser.add_argument("--jobs", type=int, default=mp.cpu_count())
+    args = parser.parse_args()
+    depth = args.depth if args.depth is not None else (3 if args.joueur == 1 else 4)
+    n = build_book(args.out, args.plies, args.joueur, depth, args.jobs)
+    print(f"{n} positions écrites dans {args.out}")
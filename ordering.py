@@ -0,0 +1,84 @@
+from collections import defaultdict
+
+# Ordonnancement des coups pour l'élagage alpha-beta : plus le meilleur coup est essayé tôt,
+# plus les coupures arrivent tôt. Chaque heuristique peut être désactivée séparément.
+# Les états passés ici sont des bitboard.BitQuarto (winning_cells, ply).
+
+WIN_BONUS = 1 << 30     # placement gagnant immédiat
+TOXIC_MALUS = 1 << 30   # pièce qui offre une victoire immédiate à l'adversaire
+KILLER_BONUS = 1 << 20  # coup ayant provoqué une coupure au même ply
+
+
+class MoveOrdering:
+    """
+    Tables killer (2 coups par ply et par phase) et history (par phase), plus les compteurs
+    de coupures permettant de mesurer la qualité de l'ordre (taux de coupure au premier coup).
+    """
+
+    def __init__(self, winning_first: bool = True, safe_pieces_first: bool = True,
+                 killers: bool = True, history: bool = True) -> None:
+        self.winning_first = winning_first
+        self.safe_pieces_first = safe_pieces_first
+        self.use_killers = killers
+        self.use_history = history
+        self.killers = defaultdict(list)   # (phase, ply) -> [coup le plus récent, précédent]
+        self.history = defaultdict(int)    # (phase, coup) -> score
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self) -> None:
+        """À appeler avant chaque coup : les killers ne valent plus, l'historique est vieilli."""
+        self.killers.clear()
+        for k in self.history:
+            self.history[k] //= 2
+
+    def _bonus(self, phase, move, ply) -> int:
+        score = 0
+        if self.use_killers and move in self.killers.get((phase, ply), ()):
+            score += KILLER_BONUS
+        if self.use_history:
+            score += self.history.get((phase, move), 0)
+        return score
+
+    def order_placements(self, game, moves, ply):
+        """Placements gagnants d'abord, puis killers, puis history (tri stable : ordre initial sinon)."""
+        winning = game.winning_cells(game.selected) if self.winning_first else 0
+
+        def score(move):
+            s = self._bonus("placement", move, ply)
+            if (winning >> (move[1] * 4 + move[0])) & 1:
+                s += WIN_BONUS
+            return s
+        return sorted(moves, key=score, reverse=True)
+
+    def order_pieces(self, game, pieces, ply):
+        """Pièces non toxiques d'abord (l'adversaire ne peut pas gagner avec), puis killers, puis history."""
+        def score(piece):
+            s = self._bonus("selection", piece, ply)
+            if self.safe_pieces_first and game.winning_cells(piece):
+                s -= TOXIC_MALUS
+            return s
+        return sorted(pieces, key=score, reverse=True)
+
+    def record_cutoff(self, phase, move, ply, depth, index) -> None:
+        """Coupure beta provoquée par le coup numéro 'index' (0 = premier essayé)."""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if self.use_killers:
+            slot = self.killers[(phase, ply)]
+            if move not in slot:
+                slot.insert(0, move)
+                del slot[2:]
+        if self.use_history:
+            self.history[(phase, move)] += depth * depth
+
+    def first_cutoff_rate(self) -> float:
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_cutoff_rate": self.first_cutoff_rate(),
+        }
@@ -0,0 +1,148 @@
+import math
+import multiprocessing as mp
+import os
+
+from bitboard import BitQuarto
+from heuristics import get_all_possible_moves
+from minmax import PROVEN_WIN, SearchContext, SearchTimeout, search_child, solved_endgame
+from ordering import MoveOrdering
+from transposition import TranspositionTable
+
+# Recherche parallèle à la racine : les placements (ou les pièces) de la racine sont répartis
+# entre les processus d'un pool, pour utiliser tous les coeurs sur UN seul coup
+# (partie contre un humain dans la GUI, analyse), et pas seulement sur plusieurs parties.
+# Le meilleur score déjà trouvé est partagé entre les processus : chaque fils de la racine
+# est cherché avec ce score comme alpha, ce qui permet de couper les coups suivants.
+# À score égal, c'est le premier coup dans l'ordre qui est joué (comme en séquentiel) : on retient
+# aussi l'indice du coup qui a fixé le score, et un coup qui le précède est cherché avec alpha juste
+# en dessous, pour qu'une égalité ne soit pas prise pour un échec bas.
+
+# État propre à chaque processus du pool (initialisé par _init_worker)
+_bound = None          # mp.Value partagé : meilleur score de la racine en cours
+_owner = None          # mp.Value partagé : indice du coup qui a fixé _bound (sous le verrou de _bound)
+_tables = {}           # joueur -> (TranspositionTable, MoveOrdering), conservés d'un coup à l'autre
+_generation = None     # numéro du coup en cours, pour vieillir l'ordonnancement une fois par coup
+_tt_bytes = 0
+
+
+def _init_worker(bound, owner, tt_bytes):
+    global _bound, _owner, _tt_bytes
+    _bound, _owner, _tt_bytes = bound, owner, tt_bytes
+
+
+def _worker_context(joueur, generation, deadline):
+    """SearchContext du processus : table de transposition et ordonnancement des negamax (joueurs 1 à 3)."""
+    global _generation
+    if joueur > 3:
+        return SearchContext(deadline=deadline)
+    if joueur not in _tables:
+        tt = TranspositionTable(_tt_bytes) if _tt_bytes else None
+        _tables[joueur] = (tt, MoveOrdering(safe_pieces_first=(joueur != 1)))
+    tt, ordering = _tables[joueur]
+    if generation != _generation:
+        _generation = generation
+        for t, o in _tables.values():
+            o.new_search()
+            if t is not None:
+                t.new_search()
+    return SearchContext(tt, deadline, ordering)
+
+
+def _search_root_child(task):
+    """Joue un coup de la racine et cherche le fils avec le meilleur score partagé comme alpha."""
+    index, game, move, phase, depth, joueur, deadline, generation, stop_on_win = task
+    ctx = _worker_context(joueur, generation, deadline)
+    with _bound.get_lock():
+        alpha, owner = _bound.value, _owner.value
+    if stop_on_win and alpha >= PROVEN_WIN:
+        return index, -math.inf  # une victoire prouvée a déjà été trouvée
+    if owner > index and alpha > -math.inf:
+        alpha = math.nextafter(alpha, -math.inf)  # une égalité avec un coup suivant doit compter
+    if phase == "selection":
+        game.push_place(move[0], move[1])
+    else:
+        game.push_select(move)
+    try:
+        value = search_child(game, depth, joueur, phase, alpha, ctx)
+    except SearchTimeout:
+        return index, None
+    if value <= alpha and alpha > -math.inf:
+        return index, -math.inf  # échec bas : le coup ne vaut pas mieux que le meilleur déjà trouvé
+    with _bound.get_lock():
+        if value > _bound.value or (value == _bound.value and index < _owner.value):
+            _bound.value, _owner.value = value, index
+    return index, value
+
+
+class ParallelRootSearch:
+    """
+    Pool de processus pour chercher les coups de la racine en parallèle.
+    play_move / play_piece ont la même signature que ceux de minmax (utilisables avec iterative_deepening).
+    Le coup renvoyé a la même valeur que celui de la recherche séquentielle ; à valeur égale,
+    on garde le premier dans l'ordre des coups.
+    """
+
+    def __init__(self, workers: int = None, tt_mb: int = 64) -> None:
+        self.workers = workers or os.cpu_count()
+        self.bound = mp.Value('d', -math.inf)
+        self.owner = mp.Value('i', -1, lock=False)  # protégé par le verrou de self.bound
+        self.pool = mp.Pool(self.workers, initializer=_init_worker,
+                            initargs=(self.bound, self.owner, tt_mb * 2**20))
+        self.generation = 0
+
+    def new_search(self) -> None:
+        """À appeler avant chaque coup (comme MoveOrdering.new_search)."""
+        self.generation += 1
+
+    def _run(self, game, moves, phase, depth, joueur, ctx):
+        deadline = ctx.deadline if ctx is not None else None
+        stop_on_win = ctx is not None and ctx.stop_on_win
+        self.bound.value = -math.inf
+        self.owner.value = -1
+        tasks = [(i, game, move, phase, depth, joueur, deadline, self.generation, stop_on_win)
+                 for i, move in enumerate(moves)]
+        scores = [None] * len(moves)
+        timeout = False
+        # On vide toujours le pool : une tâche restante modifierait la borne du coup suivant
+        for i, value in self.pool.imap_unordered(_search_root_child, tasks, chunksize=1):
+            if value is None:
+                timeout = True
+            scores[i] = value
+        if timeout:
+            raise SearchTimeout()
+        best = max(range(len(moves)), key=lambda i: (scores[i], -i))
+        return moves[best]
+
+    def play_move(self, game, depth, joueur, ctx=None, first=None):
+        game = BitQuarto.from_game(game)
+        if game.check_tour() == 1:
+            return (0, 0)
+        if solved_endgame(ctx, game):
+            return ctx.endgame.best_move(game)[0]
+        moves = get_all_possible_moves(game)
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return self._run(game, moves, "selection", depth, joueur, ctx)
+
+    def play_piece(self, game, depth, joueur, ctx=None, first=None):
+        game = BitQuarto.from_game(game)
+        if game.check_tour() == 1:
+            return 0
+        if solved_endgame(ctx, game):
+            return ctx.endgame.best_piece(game)[0]
+        pieces = list(set(range(16)) - set(game._board.ravel()))
+        if first in pieces:
+            pieces.remove(first)
+            pieces.insert(0, first)
+        return self._run(game, pieces, "placement", depth, joueur, ctx)
+
+    def close(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -2,6 +2,8 @@ import numpy as np
 from abc import ABC, abstractmethod
 import copy
 from model import generer_pieces, Piece
+from bitboard import CELL_LINES, LINE_CELLS, EMPTY_LINES, cell_index, is_quarto_pieces, place_in_lines
+from events import EventSink, ConsoleSink, ObserverSink, NULL_SINK, combine
 
 class Player(ABC):
     def __init__(self, quarto) -> None:
@@ -24,33 +26,37 @@ class Quarto(object):
     MAX_PLAYERS = 2
     BOARD_SIDE = 4
 
-    def __init__(self) -> None:
+    def __init__(self, events: EventSink = None) -> None:
         self.__players = ()
         self.reset()
-        self.__observers = []  # liste des callbacks, utiles pour le giu
+        # Destination des événements de la partie (voir events.py) : console par défaut,
+        # NULL_SINK pour les parties en lot (aucun coût), observateurs de la gui en plus
+        self.events = events if events is not None else ConsoleSink()
         self.current_tour = 1
         
 
     def add_observer(self, callback):
         """Ajoute une fonction de rappel qui sera appelée sur chaque mise à jour."""
-        self.__observers.append(callback)
+        self.events = combine(self.events, ObserverSink(callback))
 
     def notify(self, event_type: str, data: dict = None):
-        """Notifie tous les observateurs avec un événement."""
-        for cb in self.__observers:
-            cb(event_type, data or {})
+        """Envoie un événement au sink de la partie."""
+        if self.events.enabled:
+            self.events.emit(event_type, data or {})
     
     def __deepcopy__(self, memo):
             """Copie profonde sans les observateurs"""
-            new_game = Quarto()
+            new_game = Quarto(NULL_SINK)
             new_game._board = copy.deepcopy(self._board, memo)
             new_game.__binary_board = copy.deepcopy(self.__binary_board, memo)
             new_game.__pieces = copy.deepcopy(self.__pieces, memo)
             new_game._current_player = self._current_player
             new_game.__selected_piece_index = self.__selected_piece_index
             new_game.__players = self.__players
+            new_game.__undo_stack = list(self.__undo_stack)
+            new_game.__last_cell = self.__last_cell
+            new_game.line_state = self.line_state
             # Ne pas copier les observateurs (les objets tkinter ne sont pas copiables)
-            new_game.__observers = []
             return new_game
 
         # Une deepcopy est une copie indépendante, récursive et complète de notre objet
@@ -66,6 +72,10 @@ class Quarto(object):
         self.__pieces = generer_pieces()
         self._current_player = 0
         self.__selected_piece_index = -1
+        self.__undo_stack = []
+        self.__last_cell = -1  # dernière case jouée, seule case à vérifier pour une victoire
+        # Pour chaque ligne : nombre de pièces et attributs communs (ET / NOR), voir bitboard.place_in_lines
+        self.line_state = EMPTY_LINES
 
     def set_players(self, players: tuple[Player, Player]) -> None:
         self.__players = players
@@ -82,7 +92,8 @@ class Quarto(object):
         '''
         if pieceIndex not in self._board:
             self.__selected_piece_index = pieceIndex
-            self.notify("select", {"player": self._current_player, "piece": pieceIndex})
+            if self.events.enabled:
+                self.notify("select", {"player": self._current_player, "piece": pieceIndex})
             return True
         return False
 
@@ -94,10 +105,49 @@ class Quarto(object):
             self._board[y, x] = self.__selected_piece_index
             self.__binary_board[y,
                                 x][:] = self.__pieces[self.__selected_piece_index].binary
-            self.notify("place", {"player": self._current_player, "x": x, "y": y, "piece": self.__selected_piece_index})
+            self.__last_cell = cell_index(x, y)
+            self.line_state = place_in_lines(self.line_state, self.__last_cell, self.__selected_piece_index)
+            if self.events.enabled:
+                self.notify("place", {"player": self._current_player, "x": x, "y": y, "piece": self.__selected_piece_index})
             return True
         return False
 
+    # API make/unmake pour la recherche : on modifie la partie sur place en ne gardant que le delta,
+    # au lieu de faire une deepcopy par noeud. Pas de notification aux observateurs ici.
+    def push_select(self, pieceIndex: int) -> bool:
+        '''
+        Select a piece and remember the previous selection. Returns True on success
+        '''
+        if pieceIndex not in self._board:
+            self.__undo_stack.append((-1, self.__selected_piece_index, self.__last_cell, self.line_state))
+            self.__selected_piece_index = pieceIndex
+            return True
+        return False
+
+    def push_place(self, x: int, y: int) -> bool:
+        '''
+        Place the selected piece in (x, y) and remember the cell. Returns True on success
+        '''
+        if self.__placeable(x, y):
+            self._board[y, x] = self.__selected_piece_index
+            self.__binary_board[y, x][:] = self.__pieces[self.__selected_piece_index].binary
+            self.__undo_stack.append((x, y, self.__last_cell, self.line_state))
+            self.__last_cell = cell_index(x, y)
+            self.line_state = place_in_lines(self.line_state, self.__last_cell, self.__selected_piece_index)
+            return True
+        return False
+
+    def pop(self) -> None:
+        '''
+        Undo the last push_select / push_place
+        '''
+        x, y, self.__last_cell, self.line_state = self.__undo_stack.pop()
+        if x < 0:
+            self.__selected_piece_index = y
+        else:
+            self._board[y, x] = -1
+            self.__binary_board[y, x][:] = np.nan
+
     def __placeable(self, x: int, y: int) -> bool:
         return not (y < 0 or x < 0 or x > 3 or y > 3 or self._board[y, x] >= 0)
 
@@ -144,7 +194,21 @@ class Quarto(object):
 
     def check_winner(self) -> int:
         '''
-        Check who is the winner
+        Check who is the winner (only the lines through the last placed cell)
+        '''
+        c = self.__last_cell
+        if c < 0:
+            return self.check_winner_full()
+        board = self._board
+        for line in CELL_LINES[c]:
+            vals = [board.item(k) for k in LINE_CELLS[line]]
+            if -1 not in vals and is_quarto_pieces(*vals):
+                return self._current_player
+        return -1
+
+    def check_winner_full(self) -> int:
+        '''
+        Check who is the winner by scanning the whole board (reference implementation)
         '''
         l = [self.__check_horizontal(), self.__check_vertical(),
              self.__check_diagonal()]
@@ -177,16 +241,16 @@ class Quarto(object):
             piece_ok = False
             self._current_player = (
                 self._current_player + 1) % self.MAX_PLAYERS
-            print(f'Joueur actuel: {self._current_player}')
-            self.notify("next_player", {"player": self._current_player, "piece": self.__selected_piece_index})
+            if self.events.enabled:
+                self.notify("next_player", {"player": self._current_player, "piece": self.__selected_piece_index})
             while not piece_ok:
                 x, y = self.__players[self._current_player].place_piece()
                 piece_ok = self.place(x, y)
-                print("Nous avons terminé le tour numéro : ", self.current_tour)
+            if self.events.enabled:
+                self.notify("tour", {"tour": self.current_tour})
             self.current_tour += 1
             winner = self.check_winner()
         #self.print()
-        self.notify("end", {"winner": winner})
-        print(winner)
+        self.notify("end", {"winner": winner, "tour": self.current_tour})
         return winner
 
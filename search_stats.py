@@ -0,0 +1,133 @@
+from collections import Counter
+
+from bitboard import WIN_MATRIX_CACHE
+
+# Instrumentation (optionnelle) des recherches de minmax.py : pourquoi un coup prend 30 s et un autre 3 s ?
+# Les searchers appellent node / cutoff / leaf via le SearchContext (ctx.stats), le joueur appelle
+# begin_move / end_move autour de chaque coup. Les compteurs sont des totaux (additionnables) :
+# ils se cumulent par coup, puis par partie, puis par série dans le fichier de résultats ;
+# les taux (branchement effectif, part de l'évaluation, taux de hit des caches) sont recalculés
+# à partir des totaux par summarize.
+
+
+def new_totals() -> dict:
+    return {
+        "moves": 0,
+        "nodes": 0,
+        "nodes_by_ply": {},        # "ply" -> {"placement": n, "selection": n}
+        "cutoffs": 0,
+        "first_move_cutoffs": 0,
+        "leaf_evals": 0,
+        "eval_time_sec": 0.0,
+        "search_time_sec": 0.0,
+        "tt_hits": 0,
+        "tt_probes": 0,
+        "win_cache_hits": 0,
+        "win_cache_probes": 0,
+        "endgame_hits": 0,
+    }
+
+
+COUNTERS = tuple(k for k in new_totals() if k != "nodes_by_ply")
+
+
+def merge(totals: dict, other: dict) -> dict:
+    """Ajoute les compteurs de 'other' à 'totals' (modifié et renvoyé). Les taux sont ignorés."""
+    for k in COUNTERS:
+        totals[k] = totals.get(k, 0) + other.get(k, 0)
+    by_ply = totals.setdefault("nodes_by_ply", {})
+    for ply, phases in other.get("nodes_by_ply", {}).items():
+        bucket = by_ply.setdefault(ply, {})
+        for phase, n in phases.items():
+            bucket[phase] = bucket.get(phase, 0) + n
+    return totals
+
+
+def summarize(totals: dict) -> dict:
+    """Totaux + taux dérivés, prêts à être écrits en JSON."""
+    out = dict(totals)
+    by_ply = totals.get("nodes_by_ply", {})
+    per_ply = [sum(by_ply[p].values()) for p in sorted(by_ply, key=int)]
+    # facteur de branchement de chaque niveau et moyenne géométrique (branchement effectif)
+    out["branching_by_ply"] = [b / a if a else 0.0 for a, b in zip(per_ply, per_ply[1:])]
+    out["effective_branching"] = ((per_ply[-1] / per_ply[0]) ** (1 / (len(per_ply) - 1))
+                                  if len(per_ply) > 1 and per_ply[0] else 0.0)
+    out["nodes_per_move"] = totals["nodes"] / totals["moves"] if totals["moves"] else 0.0
+    out["first_cutoff_rate"] = totals["first_move_cutoffs"] / totals["cutoffs"] if totals["cutoffs"] else 0.0
+    out["eval_time_share"] = (totals["eval_time_sec"] / totals["search_time_sec"]
+                              if totals["search_time_sec"] else 0.0)
+    out["tt_hit_rate"] = totals["tt_hits"] / totals["tt_probes"] if totals["tt_probes"] else 0.0
+    out["win_cache_hit_rate"] = (totals["win_cache_hits"] / totals["win_cache_probes"]
+                                 if totals["win_cache_probes"] else 0.0)
+    return out
+
+
+class SearchStats:
+    """Compteurs d'un joueur : coup en cours (node / cutoff / leaf) et cumul de la partie."""
+
+    def __init__(self) -> None:
+        self.game = new_totals()
+        self.last_move = None
+        self.move_nodes = []       # noeuds de chaque coup de la partie, dans l'ordre (journal des parties)
+        self._reset_move()
+
+    def _reset_move(self) -> None:
+        self.nodes = Counter()     # (ply, phase) -> noeuds
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.leaf_evals = 0
+        self.eval_time = 0.0
+
+    # Appelés dans l'arbre
+    def node(self, ply, phase) -> None:
+        self.nodes[ply, phase] += 1
+
+    def cutoff(self, index) -> None:
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+
+    def leaf(self, seconds) -> None:
+        self.leaf_evals += 1
+        self.eval_time += seconds
+
+    # Appelés par le joueur autour de chaque coup
+    def begin_move(self, tt=None, endgame=None) -> None:
+        self._reset_move()
+        self._snapshot = (
+            (tt.hits, tt.hits + tt.misses) if tt is not None else (0, 0),
+            (WIN_MATRIX_CACHE.hits, WIN_MATRIX_CACHE.hits + WIN_MATRIX_CACHE.misses),
+            endgame.hits if endgame is not None else 0,
+        )
+
+    def end_move(self, seconds, tt=None, endgame=None) -> dict:
+        """Clôt le coup, l'ajoute au cumul de la partie et renvoie ses compteurs."""
+        (tt_hits, tt_probes), (win_hits, win_probes), endgame_hits = self._snapshot
+        by_ply = {}
+        for (ply, phase), n in self.nodes.items():
+            by_ply.setdefault(str(ply), {})[str(phase)] = n
+        move = new_totals()
+        move.update({
+            "moves": 1,
+            "nodes": sum(self.nodes.values()),
+            "nodes_by_ply": by_ply,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "leaf_evals": self.leaf_evals,
+            "eval_time_sec": self.eval_time,
+            "search_time_sec": seconds,
+            "win_cache_hits": WIN_MATRIX_CACHE.hits - win_hits,
+            "win_cache_probes": WIN_MATRIX_CACHE.hits + WIN_MATRIX_CACHE.misses - win_probes,
+        })
+        if tt is not None:
+            move["tt_hits"] = tt.hits - tt_hits
+            move["tt_probes"] = tt.hits + tt.misses - tt_probes
+        if endgame is not None:
+            move["endgame_hits"] = endgame.hits - endgame_hits
+        merge(self.game, move)
+        self.last_move = move
+        self.move_nodes.append(move["nodes"])
+        return move
+
+    def game_summary(self) -> dict:
+        return summarize(self.game)
@@ -0,0 +1,145 @@
+import numpy as np
+
+from bitboard import BitQuarto, LINE_CELLS, N_CELLS
+
+# Simulateur de parties par lots : N parties jouées en même temps sur un tableau de plateaux NumPy,
+# sans Quarto.run (ni affichage, ni tirages rejetés sur les pièces/cases déjà prises).
+# Sert aux estimations de taux de victoire de référence, aux playouts et à la génération de données.
+#
+# État d'un lot :
+#   boards  (N, 16) int8 : pièce posée sur chaque case (ordre 4*y + x), -1 si vide
+#   used    (N, 16) bool : pièces déjà posées
+#   pending (N,)    int8 : pièce en attente de placement, -1 en phase de sélection
+#   player  (N,)    int8 : joueur qui doit jouer (0 ou 1), comme Quarto.get_current_player
+# Comme dans Quarto.run, le joueur qui choisit passe la main et le vainqueur est celui qui a placé.
+
+LINES = np.array(LINE_CELLS)  # (10, 4)
+
+
+def _random_choice(mask, rng):
+    """Indice tiré uniformément parmi les True de chaque ligne de 'mask' (qui en a au moins un)."""
+    return np.where(mask, rng.random(mask.shape), -1.0).argmax(axis=1)
+
+
+def _ready_lines(boards):
+    """
+    Lignes à trois pièces : (ready (n, 10), case vide (n, 10), bits communs à 1, bits communs à 0).
+    """
+    lines = boards[:, LINES]                      # (n, 10, 4)
+    filled = lines >= 0
+    ready = filled.sum(axis=2) == 3
+    ones = np.where(filled, lines, 15)
+    zeros = np.where(filled, ~lines & 15, 15)
+    common1 = np.bitwise_and.reduce(ones, axis=2)
+    common0 = np.bitwise_and.reduce(zeros, axis=2)
+    empty_cell = LINES[np.arange(len(LINES)), filled.argmin(axis=2)]  # (n, 10)
+    return ready, empty_cell, common1, common0
+
+
+def _completes(pieces, common1, common0):
+    """pieces (..., 1) ou (n, 1) contre les lignes (n, 10) : la pièce complète-t-elle la ligne ?"""
+    return ((pieces & common1) | (~pieces & common0 & 15)) != 0
+
+
+def random_select(boards, used, rng):
+    return _random_choice(~used, rng)
+
+
+def random_place(boards, pending, rng):
+    return _random_choice(boards < 0, rng)
+
+
+def smart_select(boards, used, rng):
+    """Pièce au hasard parmi celles qui n'offrent pas de victoire immédiate (toutes si aucune)."""
+    ready, _, common1, common0 = _ready_lines(boards)
+    pieces = np.arange(16, dtype=np.int8)[None, :, None]              # (1, 16, 1)
+    toxic = (_completes(pieces, common1[:, None, :], common0[:, None, :])
+             & ready[:, None, :]).any(axis=2)                          # (n, 16)
+    safe = ~used & ~toxic
+    return _random_choice(np.where(safe.any(axis=1)[:, None], safe, ~used), rng)
+
+
+def smart_place(boards, pending, rng):
+    """Case gagnante pour la pièce en attente s'il y en a une, sinon case vide au hasard."""
+    ready, empty_cell, common1, common0 = _ready_lines(boards)
+    wins = ready & _completes(pending[:, None], common1, common0)     # (n, 10)
+    cells = random_place(boards, pending, rng)
+    has_win = wins.any(axis=1)
+    cells[has_win] = empty_cell[has_win, wins[has_win].argmax(axis=1)]
+    return cells
+
+
+POLICIES = {
+    "random": (random_select, random_place),
+    "smart": (smart_select, smart_place),
+}
+
+
+def _start_state(n_games, start):
+    boards = np.full((n_games, N_CELLS), -1, dtype=np.int8)
+    used = np.zeros((n_games, 16), dtype=bool)
+    pending = np.full(n_games, -1, dtype=np.int8)
+    player = np.zeros(n_games, dtype=np.int8)
+    if start is not None:
+        game = start if isinstance(start, BitQuarto) else BitQuarto.from_game(start)
+        board = game.get_board_status().ravel()
+        boards[:] = board
+        used[:, board[board >= 0]] = True
+        selected = game.selected
+        if selected >= 0 and not (game.used >> selected) & 1:
+            pending[:] = selected
+        player[:] = game.get_current_player()
+    return boards, used, pending, player
+
+
+def _winning(boards, rows):
+    """Parties (parmi 'rows') dont le plateau contient un quarto."""
+    lines = boards[rows][:, LINES]
+    full = (lines >= 0).all(axis=2)
+    common = np.bitwise_and.reduce(lines, axis=2) | np.bitwise_and.reduce(~lines & 15, axis=2)
+    return (full & ((common & 15) != 0)).any(axis=1)
+
+
+def simulate(n_games: int, policy="random", start=None, seed=None):
+    """
+    Joue n_games parties jusqu'au bout, à partir du plateau vide ou de la position 'start'
+    (Quarto ou BitQuarto). 'policy' : "random", "smart" ou un couple (select, place) de fonctions
+    de même signature que random_select / random_place.
+    Renvoie (winners, moves) : vainqueur de chaque partie (0 / 1, -1 pour une nulle)
+    et nombre de placements joués depuis le départ.
+    """
+    rng = np.random.default_rng(seed)
+    select, place = POLICIES[policy] if isinstance(policy, str) else policy
+    boards, used, pending, player = _start_state(n_games, start)
+    winners = np.full(n_games, -1, dtype=np.int8)
+    moves = np.zeros(n_games, dtype=np.int16)
+    active = (boards < 0).any(axis=1)
+    if start is not None and active.any():
+        active &= ~_winning(boards, np.arange(n_games))
+    rows = np.flatnonzero(active)
+    while rows.size:
+        # sélection (seulement pour les parties sans pièce en attente), puis on passe la main
+        to_select = rows[pending[rows] < 0]
+        if to_select.size:
+            pending[to_select] = select(boards[to_select], used[to_select], rng)
+            player[to_select] ^= 1
+        # placement
+        cells = place(boards[rows], pending[rows], rng)
+        boards[rows, cells] = pending[rows]
+        used[rows, pending[rows]] = True
+        pending[rows] = -1
+        moves[rows] += 1
+        won = _winning(boards, rows)
+        winners[rows[won]] = player[rows[won]]
+        rows = rows[~won & (boards[rows] < 0).any(axis=1)]
+    return winners, moves
+
+
+def win_rates(winners) -> dict:
+    """Proportions de victoires de chaque joueur et de nulles."""
+    n = len(winners)
+    return {
+        "player_0": float(np.count_nonzero(winners == 0)) / n,
+        "player_1": float(np.count_nonzero(winners == 1)) / n,
+        "draws": float(np.count_nonzero(winners == -1)) / n,
+    }
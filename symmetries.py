@@ -0,0 +1,189 @@
+import itertools
+from collections import namedtuple
+
+from bitboard import BitQuarto, LINE_CELLS, N_CELLS, piece_at
+
+# Symétries du Quarto : une position transformée a exactement la même valeur.
+# - 32 permutations du plateau qui conservent les 10 lignes :
+#   les 8 symétries du carré, l'échange intérieur/extérieur et l'échange des lignes/colonnes du milieu
+# - 24 permutations des 4 attributs des pièces
+# - 16 compléments d'attributs (XOR sur l'indice de la pièce)
+# soit 32 * 24 * 16 = 12288 transformations au total.
+
+# Une symétrie : cells[c] = case d'arrivée de la case c, attrs[i] = bit d'origine du nouveau bit i,
+# xor = complément appliqué après la permutation des attributs
+Symmetry = namedtuple("Symmetry", ["cells", "attrs", "xor"])
+
+
+def _axis_perm(perm):
+    """Permutation des cases obtenue en appliquant 'perm' aux lignes et aux colonnes."""
+    return tuple(perm[c // 4] * 4 + perm[c % 4] for c in range(N_CELLS))
+
+
+def _compose(p, q):
+    """Applique p puis q."""
+    return tuple(q[p[c]] for c in range(N_CELLS))
+
+
+def _board_symmetries():
+    rotation = tuple((c % 4) * 4 + (3 - c // 4) for c in range(N_CELLS))  # (x, y) -> (3 - y, x)
+    mirror = tuple((c // 4) * 4 + (3 - c % 4) for c in range(N_CELLS))  # (x, y) -> (3 - x, y)
+    inner_outer = _axis_perm((1, 0, 3, 2))
+    mid_flip = _axis_perm((0, 2, 1, 3))
+    group = {tuple(range(N_CELLS))}
+    frontier = list(group)
+    while frontier:
+        p = frontier.pop()
+        for gen in (rotation, mirror, inner_outer, mid_flip):
+            q = _compose(p, gen)
+            if q not in group:
+                group.add(q)
+                frontier.append(q)
+    return sorted(group)
+
+
+BOARD_SYMMETRIES = _board_symmetries()
+
+_LINE_SETS = {frozenset(line) for line in LINE_CELLS}
+assert len(BOARD_SYMMETRIES) == 32
+assert all({frozenset(p[c] for c in line) for line in LINE_CELLS} == _LINE_SETS for p in BOARD_SYMMETRIES)
+
+ATTR_PERMS = list(itertools.permutations(range(4)))
+
+# ATTR_TABLE[a][v] : pièce v après la permutation d'attributs numéro a
+ATTR_TABLE = [
+    [sum(((v >> perm[i]) & 1) << i for i in range(4)) for v in range(16)]
+    for perm in ATTR_PERMS
+]
+
+
+def _state(game):
+    """(occupied, pieces, pièce en attente ou -1) pour n'importe quel objet ayant l'API de Quarto."""
+    if not isinstance(game, BitQuarto):
+        game = BitQuarto.from_game(game)
+    pending = game.selected
+    if pending >= 0 and (game.used >> pending) & 1:
+        pending = -1  # pièce déjà posée : on est en phase de sélection
+    return game.occupied, game.pieces, pending
+
+
+def canonicalize(game):
+    """
+    Renvoie (clé canonique, symétrie) : la clé est la même pour toutes les positions équivalentes,
+    et la symétrie envoie la position donnée sur sa forme canonique.
+    Ordre de comparaison : occupation, puis pièces case par case, puis pièce en attente.
+    """
+    occupied, pieces, pending = _state(game)
+
+    # 1) on garde les permutations du plateau qui minimisent le masque d'occupation
+    best_occ, candidates = None, []
+    for perm in BOARD_SYMMETRIES:
+        occ = 0
+        for c in range(N_CELLS):
+            if (occupied >> c) & 1:
+                occ |= 1 << perm[c]
+        if best_occ is None or occ < best_occ:
+            best_occ, candidates = occ, [perm]
+        elif occ == best_occ:
+            candidates.append(perm)
+
+    # 2) séquence des pièces dans l'ordre des cases d'arrivée, pièce en attente à la fin
+    sequences = []
+    for perm in candidates:
+        inv = [0] * N_CELLS
+        for c in range(N_CELLS):
+            inv[perm[c]] = c
+        seq = [piece_at(pieces, inv[k]) for k in range(N_CELLS) if (best_occ >> k) & 1]
+        sequences.append((perm, seq + [pending]))
+
+    # 3) minimum lexicographique sur (permutation d'attributs, complément) ;
+    #    le complément est choisi pour que la première pièce devienne 0
+    states = []
+    for perm, seq in sequences:
+        first = seq[0]
+        for a, table in enumerate(ATTR_TABLE):
+            xor = table[first] if first >= 0 else 0
+            states.append((perm, a, xor, seq))
+    out = []
+    for k in range(len(sequences[0][1])):
+        vals = [(ATTR_TABLE[a][seq[k]] ^ xor) if seq[k] >= 0 else -1
+                for perm, a, xor, seq in states]
+        m = min(vals)
+        states = [s for s, v in zip(states, vals) if v == m]
+        out.append(m)
+
+    key = best_occ
+    for v in out[:-1]:
+        key = (key << 4) | v
+    key = (key << 5) | (out[-1] + 1)
+    perm, a, xor, _ = states[0]
+    return key, Symmetry(perm, ATTR_PERMS[a], xor)
+
+
+def canonical_key(game) -> int:
+    """Clé identique pour toutes les positions équivalentes par symétrie."""
+    return canonicalize(game)[0]
+
+
+# Passage d'un coup entre la position réelle et sa forme canonique
+
+def transform_cell(sym: Symmetry, c: int) -> int:
+    return sym.cells[c]
+
+
+def inverse_cell(sym: Symmetry, c: int) -> int:
+    return sym.cells.index(c)
+
+
+def transform_piece(sym: Symmetry, p: int) -> int:
+    return ATTR_TABLE[ATTR_PERMS.index(sym.attrs)][p] ^ sym.xor
+
+
+def inverse_piece(sym: Symmetry, p: int) -> int:
+    return ATTR_TABLE[ATTR_PERMS.index(sym.attrs)].index(p ^ sym.xor)
+
+
+def apply_symmetry(game, sym: Symmetry) -> BitQuarto:
+    """Position transformée par 'sym' (avec sym de canonicalize : la forme canonique de la position)."""
+    occupied, pieces, pending = _state(game)
+    new_game = BitQuarto()
+    placed = 0
+    for c in range(N_CELLS):
+        if (occupied >> c) & 1:
+            t = transform_cell(sym, c)
+            new_game.select(transform_piece(sym, piece_at(pieces, c)))
+            new_game.place(t % 4, t // 4)
+            placed += 1
+    if pending >= 0:
+        new_game.select(transform_piece(sym, pending))
+    new_game.current_tour = placed + 1
+    return new_game
+
+
+def count_positions(game, plies: int):
+    """
+    Nombre de positions distinctes atteignables en 'plies' demi-coups (sélection ou placement),
+    brutes et à symétrie près. Sert à mesurer le gain d'un cache partagé par symétrie.
+    """
+    game = BitQuarto.from_game(game) if not isinstance(game, BitQuarto) else game
+    raw, canonical = set(), set()
+
+    def walk(depth):
+        raw.add((game.occupied, game.pieces, _state(game)[2]))
+        canonical.add(canonical_key(game))
+        if depth == 0 or game.check_winner() != -1 or game.check_finished():
+            return
+        if _state(game)[2] >= 0:
+            for c in range(N_CELLS):
+                if not (game.occupied >> c) & 1:
+                    game.push_place(c % 4, c // 4)
+                    walk(depth - 1)
+                    game.pop()
+        else:
+            for p in range(16):
+                if game.push_select(p):
+                    walk(depth - 1)
+                    game.pop()
+
+    walk(plies)
+    return len(raw), len(canonical)
@@ -0,0 +1,89 @@
+import multiprocessing as mp
+import queue
+from multiprocessing.connection import Client
+
+import pytest
+
+from broker import AUTHKEY, BrokerPool, run_worker
+from joueurs.RandomPlayer import RandomPlayer
+
+# Coordinateur et workers sur la même machine (socket Unix) : parties jouées par de vrais workers,
+# puis le protocole vu d'un worker simulé (paquet perdu redonné, résultat d'une autre session ignoré).
+
+TASK = (RandomPlayer, (), RandomPlayer, (), False, False)
+
+
+def start_workers(address: str, n: int) -> list:
+    # lancés avant le coordinateur : un worker forké après lui hériterait de sa socket d'écoute
+    workers = [mp.Process(target=run_worker, args=(address, None, False, 30.0), daemon=True) for _ in range(n)]
+    for w in workers:
+        w.start()
+    return workers
+
+
+def connect(address: str):
+    """Worker simulé : connexion et poignée de main ; renvoie (connexion, session du coordinateur)."""
+    conn = Client(address, "AF_UNIX", authkey=AUTHKEY)
+    conn.send(("hello", "test"))
+    _, _, session = conn.recv()
+    return conn, session
+
+
+def test_workers_play_streamed_games(tmp_path):
+    address = str(tmp_path / "broker.sock")
+    workers = start_workers(address, 2)
+    try:
+        with BrokerPool(address, workers=2) as pool:
+            games = pool.stream(TASK)
+            assert next(games)[0] in (-1, 0, 1)
+            games.close()  # flux arrêté : paquets retirés ou attendus, le pool reste utilisable
+            results = list(pool.stream(TASK, 40))
+        assert len(results) == 40
+        assert all(r[0] in (-1, 0, 1) for r in results)
+    finally:
+        for w in workers:
+            w.terminate()
+            w.join()
+
+
+def test_lost_task_is_reissued(tmp_path):
+    address = str(tmp_path / "broker.sock")
+    with BrokerPool(address, workers=1) as pool:
+        results = queue.Queue()
+        pool.submit(TASK, 3, results, tag="a")
+        conn, _ = connect(address)
+        conn.send(("get",))
+        _, task_id, _, _ = conn.recv()
+        conn.close()  # worker perdu avec son paquet
+        conn, _ = connect(address)
+        conn.send(("get",))
+        assert conn.recv()[:2] == ("task", task_id)
+        conn.send(("done", task_id, ["ok"]))
+        assert results.get(timeout=5) == ("a", ["ok"])
+        conn.close()
+
+
+def test_results_of_another_session_are_ignored(tmp_path):
+    address = str(tmp_path / "broker.sock")
+    with BrokerPool(address, workers=1) as pool:
+        results = queue.Queue()
+        pool.submit(TASK, 3, results, tag="a")
+        conn, session = connect(address)
+        assert session == pool.session
+        conn.send(("get",))
+        _, task_id, _, _ = conn.recv()
+        assert task_id[0] == session
+        # même numéro de paquet, mais rendu par un worker d'un coordinateur précédent
+        conn.send(("done", ("ancienne", task_id[1]), ["périmé"]))
+        conn.send(("done", task_id, ["ok"]))
+        assert results.get(timeout=5) == ("a", ["ok"])
+        conn.close()
+
+
+def test_network_address_needs_a_key():
+    with pytest.raises(ValueError):
+        BrokerPool("0.0.0.0:0", authkey=AUTHKEY)
+    with pytest.raises(ValueError):
+        run_worker("192.0.2.1:5000")
+    with BrokerPool("0.0.0.0:0") as pool:
+        assert pool.authkey != AUTHKEY
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from bitboard import BitQuarto, FULL_MASK, N_CELLS
+from endgame import MATE, EndgameSolver, result_of
+
+# Le solveur de fin de partie (alpha-beta, table, coupures sur le meilleur score possible) doit donner
+# le résultat et la distance au mat d'un negamax sans aucune coupure, sur des positions aléatoires
+# à 6 cases vides ou moins ; best_move et best_piece doivent jouer un coup de ce score.
+
+N_POSITIONS = 20
+
+
+def _ply(score: int) -> int:
+    return score - 1 if score > 0 else score + 1 if score < 0 else 0
+
+
+def pending(game) -> int:
+    """Pièce choisie et pas encore posée (phase de placement), ou -1 (phase de sélection)."""
+    return game.selected if game.selected >= 0 and not (game.used >> game.selected) & 1 else -1
+
+
+def brute(game, memo: dict) -> int:
+    """Score negamax exact (MATE - d pour une victoire en d demi-coups) du joueur qui doit jouer."""
+    key = (game.pieces, game.occupied, pending(game))
+    if key not in memo:
+        if key[2] >= 0:
+            memo[key] = max(placement_score(game, c, memo) for c in range(N_CELLS) if not (game.occupied >> c) & 1)
+        else:
+            memo[key] = max(selection_score(game, p, memo) for p in range(16) if not (game.used >> p) & 1)
+    return memo[key]
+
+
+def placement_score(game, c: int, memo: dict) -> int:
+    game.push_place(c % 4, c // 4)
+    if game.check_winner() != -1:
+        score = MATE - 1
+    elif game.occupied == FULL_MASK:
+        score = 0
+    else:
+        score = _ply(brute(game, memo))  # le même joueur choisit ensuite
+    game.pop()
+    return score
+
+
+def selection_score(game, piece: int, memo: dict) -> int:
+    game.push_select(piece)
+    score = -_ply(brute(game, memo))
+    game.pop()
+    return score
+
+
+def random_positions(n: int, seed: int = 0):
+    """Positions sans vainqueur à 3 à 6 cases vides : (partie, phase), la pièce choisie en phase de placement."""
+    rng = random.Random(seed)
+    while n > 0:
+        game = BitQuarto()
+        pieces, cells = list(range(16)), list(range(16))
+        rng.shuffle(pieces)
+        rng.shuffle(cells)
+        placed = rng.randint(10, 13)
+        for piece, cell in zip(pieces[:placed], cells[:placed]):
+            game.push_select(piece)
+            game.push_place(cell % 4, cell // 4)
+        if game.check_winner() != -1:
+            continue
+        n -= 1
+        if rng.random() < 0.5:
+            yield game, "selection"
+        else:
+            game.push_select(pieces[placed])
+            yield game, "placement"
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_solver_matches_brute_force(seed):
+    solver, memo = EndgameSolver(), {}
+    for game, phase in random_positions(N_POSITIONS, seed):
+        assert solver.applies(game)
+        expected = brute(game, memo)
+        assert solver.solve(game, phase) == result_of(expected)
+        if phase == "placement":
+            (x, y), *result = solver.best_move(game)
+            assert tuple(result) == result_of(expected)
+            assert placement_score(game, 4 * y + x, memo) == expected
+        else:
+            piece, *result = solver.best_piece(game)
+            assert tuple(result) == result_of(expected)
+            assert selection_score(game, piece, memo) == expected
@@ -0,0 +1,22 @@
+from game_store import GameStore, read_games, summary_path_for
+
+# Vue agrégée du journal : totaux repris d'un fichier de résultats (seed), puis vue sauvegardée
+# relue à la relance sans repasser sur le début du journal.
+
+GAME = (1, 9, 0.5, None, {"plies": 17, "moves": []})
+
+
+def test_seeded_totals_survive_restart(tmp_path):
+    path = str(tmp_path / "parties.jsonl")
+    with GameStore(path, summary_path_for(path)) as store:
+        store.seed("a vs b", {"games": 16, "wins": 15, "draws": 0, "tours_total": 160.0, "total_time_sec": 2.0})
+        store.append_results("a vs b", [GAME])
+        assert store.bucket("a vs b")["games"] == 17
+        assert store.bucket("a vs b")["wins"] == 16
+    assert [r["winner"] for r in read_games(path)] == [1]  # les totaux repris ne sont pas des parties
+
+    with GameStore(path, summary_path_for(path)) as store:
+        assert store.offset > 0  # vue sauvegardée : le journal n'est pas relu depuis le début
+        store.append_results("a vs b", [GAME])
+        assert store.bucket("a vs b")["games"] == 18
+        assert store.bucket("a vs b")["tours_total"] == 178.0
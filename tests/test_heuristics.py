@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from bitboard import BitQuarto
+from heuristics import state_eval_abs, state_eval_abs_vec
+
+# state_eval_abs_vec doit donner exactement les scores de state_eval_abs,
+# sur des positions atteignables des deux phases (pièce à placer ou non).
+
+N_GAMES = 200
+
+
+def random_positions(n: int, seed: int = 0):
+    """Positions de parties aléatoires : (partie, phase, pièce à placer), avant chaque sélection et chaque placement."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        game = BitQuarto()
+        pieces, cells = list(range(16)), list(range(16))
+        rng.shuffle(pieces)
+        rng.shuffle(cells)
+        for piece, cell in zip(pieces, cells):
+            yield game, "selection", None
+            game.push_select(piece)
+            yield game, "placement", piece
+            game.push_place(cell % 4, cell // 4)
+            if game.check_winner() != -1:
+                yield game, "selection", None  # position gagnée : WIN + depth
+                break
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_eval_matches_scalar(seed):
+    rng = random.Random(seed)
+    for game, phase, piece in random_positions(N_GAMES, seed):
+        depth = rng.randint(0, 4)
+        assert state_eval_abs_vec(game, phase, piece, depth) == pytest.approx(
+            state_eval_abs(game, phase, piece, depth), rel=1e-12, abs=1e-12)
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+import partie
+from events import NULL_SINK
+from joueurs.MCTS_Player import MCTSPlayer
+
+# Avec un budget de temps déjà écoulé avant la première simulation, MCTS doit quand même jouer :
+# une partie complète où chaque coup est vérifié avant d'être joué (Quarto.run redemande sinon sans fin).
+
+
+class CheckedMCTSPlayer(MCTSPlayer):
+    def choose_piece(self) -> int:
+        piece = super().choose_piece()
+        game = self.get_game()
+        assert piece in range(16) and piece not in game.get_board_status()
+        return piece
+
+    def place_piece(self) -> tuple[int, int]:
+        x, y = super().place_piece()
+        assert self.get_game().get_board_status()[y, x] == -1
+        return x, y
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_tiny_time_budget_plays_legal_game(seed):
+    random.seed(seed)
+    game = partie.Quarto(NULL_SINK)
+    game.set_players((CheckedMCTSPlayer(game, time_budget=1e-9), CheckedMCTSPlayer(game, time_budget=1e-9)))
+    winner = game.run()
+    assert winner in (-1, 0, 1)
+    assert winner != -1 or game.check_finished()
@@ -0,0 +1,92 @@
+import math
+import random
+
+import pytest
+
+from bitboard import BitQuarto
+from heuristics import get_all_possible_moves
+from minmax import SearchContext, play_move, play_piece, search_child
+from parallel_search import ParallelRootSearch
+
+# La recherche parallèle à la racine doit jouer le coup de la recherche séquentielle : le premier,
+# dans l'ordre des coups, parmi ceux de meilleur score (calculé ici sans fenêtre, fils par fils).
+# Les graines retenues donnent des positions avec plusieurs coups ou pièces à égalité.
+
+DEPTH = 2
+JOUEUR = 1
+SEEDS = [0, 2, 4, 8, 10]
+
+
+def position(seed: int):
+    """Position de milieu de partie sans vainqueur : (partie, prochaine pièce à sélectionner)."""
+    rng = random.Random(seed)
+    game = BitQuarto()
+    pieces, cells = list(range(16)), list(range(16))
+    rng.shuffle(pieces)
+    rng.shuffle(cells)
+    n = 6 + seed % 4
+    for piece, cell in zip(pieces[:n], cells[:n]):
+        game.push_select(piece)
+        game.push_place(cell % 4, cell // 4)
+    assert game.check_winner() == -1
+    game.current_tour = n + 1  # push_* ne compte pas les tours ; au tour 1, la racine joue un coup fixe
+    return game, pieces[n]
+
+
+def exact_scores(game, moves, phase: str) -> list:
+    scores = []
+    for move in moves:
+        if phase == "selection":
+            game.push_place(move[0], move[1])
+        else:
+            game.push_select(move)
+        scores.append(search_child(game, DEPTH, JOUEUR, phase, -math.inf, SearchContext()))
+        game.pop()
+    return scores
+
+
+def expected(moves, scores):
+    """Premier coup de meilleur score, et le nombre de coups à égalité avec lui."""
+    best = max(scores)
+    return moves[scores.index(best)], scores.count(best)
+
+
+@pytest.fixture(scope="module")
+def parallel():
+    with ParallelRootSearch(2) as search:
+        yield search
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_parallel_piece_matches_sequential(parallel, seed):
+    game, _ = position(seed)
+    pieces = list(set(range(16)) - set(game._board.ravel()))
+    scores = exact_scores(game, pieces, "placement")
+    piece, _ = expected(pieces, scores)
+    parallel.new_search()
+    assert play_piece(game, DEPTH, JOUEUR) == piece
+    assert parallel.play_piece(game, DEPTH, JOUEUR) == piece
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_parallel_move_matches_sequential(parallel, seed):
+    game, piece = position(seed)
+    game.push_select(piece)
+    moves = get_all_possible_moves(game)
+    scores = exact_scores(game, moves, "selection")
+    move, _ = expected(moves, scores)
+    parallel.new_search()
+    assert play_move(game, DEPTH, JOUEUR) == move
+    assert parallel.play_move(game, DEPTH, JOUEUR) == move
+
+
+def test_positions_include_ties():
+    ties = 0
+    for seed in SEEDS:
+        game, piece = position(seed)
+        pieces = list(set(range(16)) - set(game._board.ravel()))
+        ties += expected(pieces, exact_scores(game, pieces, "placement"))[1] > 1
+        game.push_select(piece)
+        moves = get_all_possible_moves(game)
+        ties += expected(moves, exact_scores(game, moves, "selection"))[1] > 1
+    assert ties >= 3
@@ -0,0 +1,24 @@
+import math
+
+from heuristics import WIN
+from minmax import tt_probe, tt_store
+from transposition import EXACT, TranspositionTable
+
+# Une victoire vaut WIN + profondeur restante à la feuille : relue à une autre profondeur (coup suivant,
+# autre partie avec des tables partagées), elle doit garder la même distance au noeud.
+
+
+def test_win_scores_keep_their_distance_to_the_node():
+    tt = TranspositionTable(2**16)
+    tt_store(tt, 1, WIN + 3, 5, -math.inf, math.inf)  # victoire 2 niveaux sous un noeud de profondeur 5
+    assert tt.probe(1)[2] == EXACT
+    assert tt_probe(tt, 1, 4, -math.inf, math.inf)[0] == WIN + 2
+    assert tt_probe(tt, 1, 5, -math.inf, math.inf)[0] == WIN + 3
+    tt_store(tt, 2, -(WIN + 1), 4, -math.inf, math.inf)  # défaite 3 niveaux plus bas
+    assert tt_probe(tt, 2, 2, -math.inf, math.inf)[0] == -(WIN - 1)
+
+
+def test_heuristic_scores_are_stored_unchanged():
+    tt = TranspositionTable(2**16)
+    tt_store(tt, 3, -123.5, 4, -math.inf, math.inf)
+    assert tt_probe(tt, 3, 1, -math.inf, math.inf)[0] == -123.5
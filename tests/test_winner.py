@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+import partie
+from bitboard import BitQuarto
+from events import NULL_SINK
+
+# check_winner (lignes passant par la dernière case) et BitQuarto.check_winner (idem sur le bitboard)
+# comparés à check_winner_full, qui balaie tout le plateau, après chaque placement de parties aléatoires.
+
+N_GAMES = 300
+
+
+def random_games(n: int, seed: int = 0):
+    """Parties aléatoires jouées avec push_select / push_place : (Quarto, BitQuarto) après chaque placement."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        game, bit = partie.Quarto(NULL_SINK), BitQuarto()
+        pieces, cells = list(range(16)), list(range(16))
+        rng.shuffle(pieces)
+        rng.shuffle(cells)
+        for piece, cell in zip(pieces, cells):
+            for g in (game, bit):
+                g.push_select(piece)
+                g.push_place(cell % 4, cell // 4)
+            yield game, bit
+            if game.check_winner_full() != -1:
+                break
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_check_winner_matches_full_scan(seed):
+    for game, bit in random_games(N_GAMES, seed):
+        expected = game.check_winner_full()
+        assert game.check_winner() == expected
+        assert bit.check_winner() == expected
+        assert bit.check_winner_full() == expected
+        assert BitQuarto.from_game(game).check_winner() == expected
@@ -0,0 +1,85 @@
+import random
+
+# Table de transposition pour les negamax : une même position (mêmes pièces sur les mêmes cases,
+# même pièce à placer, même phase) est atteinte par de nombreux ordres de coups.
+# On la retrouve grâce à un hachage de Zobrist mis à jour incrémentalement par bitboard.BitQuarto.
+
+# Graine fixe : tous les processus (pool de parties) calculent les mêmes clés
+_rng = random.Random(0x51A7)
+
+ZOBRIST_CELL = tuple(tuple(_rng.getrandbits(64) for _ in range(16)) for _ in range(16))  # [case][pièce]
+ZOBRIST_SELECTED = tuple(_rng.getrandbits(64) for _ in range(16))  # pièce en attente de placement
+ZOBRIST_PHASE = {"placement": _rng.getrandbits(64), "selection": _rng.getrandbits(64)}
+
+# Type de borne stockée
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Estimation grossière de la place prise par une entrée (tuple + entiers Python + case de la liste)
+ENTRY_BYTES = 128
+
+
+def position_key(game, phase: str) -> int:
+    """Clé de la position : hash du plateau et de la pièce à placer, combiné avec la phase."""
+    return game.zobrist ^ ZOBRIST_PHASE[phase]
+
+
+class TranspositionTable:
+    """
+    Table à adressage direct de taille fixe (budget mémoire configurable).
+    Chaque case contient (clé, valeur, profondeur, borne, génération).
+    Remplacement : on garde l'entrée la plus profonde, sauf si c'est la même position ou si elle
+    date d'une recherche précédente. La génération avance à chaque recherche de la racine (new_search) :
+    la table est gardée d'un coup à l'autre (et d'une partie à l'autre, MinMax.share_tables), sans quoi
+    les entrées profondes de l'ouverture ne laisseraient jamais la place.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20) -> None:
+        self.capacity = max(1, max_bytes // ENTRY_BYTES)
+        self.clear()
+
+    def clear(self) -> None:
+        self.slots = [None] * self.capacity
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+        self.generation = 0
+
+    def new_search(self) -> None:
+        """À appeler avant chaque coup : les entrées déjà en place deviennent remplaçables."""
+        self.generation += 1
+
+    def probe(self, key: int):
+        """Renvoie (valeur, profondeur, borne) si la position est connue, sinon None."""
+        entry = self.slots[key % self.capacity]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1:4]
+        self.misses += 1
+        return None
+
+    def store(self, key: int, value: float, depth: int, bound: int) -> None:
+        i = key % self.capacity
+        entry = self.slots[i]
+        if entry is None:
+            self.size += 1
+        elif entry[0] != key:
+            if entry[2] > depth and entry[4] == self.generation:
+                return  # l'entrée en place, de cette recherche, a coûté plus cher à calculer
+            self.overwrites += 1
+        self.slots[i] = (key, value, depth, bound, self.generation)
+        self.stores += 1
+
+    def stats(self) -> dict:
+        """Compteurs pour dimensionner la table."""
+        probes = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+        }